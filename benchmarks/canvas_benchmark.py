@@ -0,0 +1,105 @@
+''' Frame time of the canvas backends ("plot" and "fixed").
+
+Moves --images image items and a tracked_item_group of --markers members every
+frame, then repaints the canvas synchronously. Reports update and paint time
+per frame (p50/p99) for each backend.
+
+With --tiles COLUMNS ROWS the "fixed" canvas is split into overlapping
+projector tiles (check Vicon_Canvas). Paint time is then reported per tile.
+
+Usage:
+    python canvas_benchmark.py --images 200 --markers 1000
+    python canvas_benchmark.py --images 2000 --markers 0 --backend fixed --bsp-threshold 500
+    python canvas_benchmark.py --images 2000 --markers 0 --backend fixed --tiles 2 2
+'''
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+from PyQt6 import QtWidgets
+
+from vicon_projector_server.vicon_canvas import Vicon_Canvas
+from vicon_projector_server.Projection_Item import image_item, tracked_item_group
+
+
+def tile_config(columns, rows, overlap) -> list:
+    ''' Grid of tiles over the 20x20 world, overlapping by ``overlap``.
+    '''
+    width, height = 20 / columns, 20 / rows
+    return [{"x": [max(0, c*width - overlap/2), min(20, (c+1)*width + overlap/2)],
+            "y": [max(0, r*height - overlap/2), min(20, (r+1)*height + overlap/2)]}
+            for r in range(rows) for c in range(columns)]
+
+
+def run(app, backend, args) -> dict:
+    config = {"x": [0, 20], "y": [0, 20], "canvas_backend": backend, "canvas_bsp_threshold": args.bsp_threshold}
+    if args.tiles:
+        config["tiles"] = tile_config(*args.tiles, args.overlap)
+    canvas = Vicon_Canvas(config_data=config)
+    canvas.resize(args.width, args.height)
+    canvas.show()
+    canvas.show_tiles(resolution=[args.width, args.height])
+
+    rng = np.random.default_rng(0)
+    spot = rng.integers(0, 256, (32, 32, 4), dtype=np.uint8)
+    items = [image_item(f"spot{i}", spot, rng.uniform(0, 20, 2), 0.5, 0.5) for i in range(args.images)]
+    if args.markers:
+        items.append(tracked_item_group("group", rng.uniform(0, 20, (args.markers, 2)), sizes=0.2))
+    for item in items:
+        canvas.window.addItem(item.handle)
+    app.processEvents()
+
+    update_times, paint_times = [], []
+    for frame in range(args.frames):
+        start = time.perf_counter()
+        for i, item in enumerate(items):
+            item.position = (item.position + 0.05 * np.sin(frame * 0.1 + i)) % 20
+            item.position_updater()
+        app.processEvents()
+        painted = time.perf_counter()
+        tile_times = []
+        for tile in canvas.tiles:
+            tile.viewport().repaint()
+            tile_times.append(time.perf_counter() - painted - sum(tile_times))
+        done = time.perf_counter()
+
+        update_times.append(painted - start)
+        paint_times.append(tile_times)
+
+    canvas.close_tiles()
+    canvas.close()
+    update_ms = np.array(update_times[5:]) * 1000
+    tile_ms = np.array(paint_times[5:]) * 1000
+    frame_ms = update_ms + tile_ms.sum(axis=1)
+    result = {"update_ms_p50": float(np.percentile(update_ms, 50)),
+            "paint_ms_p50": float(np.percentile(tile_ms.sum(axis=1), 50)),
+            "frame_ms_p50": float(np.percentile(frame_ms, 50)),
+            "frame_ms_p99": float(np.percentile(frame_ms, 99))}
+    if len(canvas.tiles) > 1:
+        result["tile_paint_ms_p50"] = np.percentile(tile_ms, 50, axis=0).tolist()
+        result["tile_items"] = [tile["items"] for tile in canvas.get_tiles()]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", nargs="+", default=["plot", "fixed"])
+    parser.add_argument("--images", type=int, default=200)
+    parser.add_argument("--markers", type=int, default=1000, help="Members of one tracked_item_group")
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=800)
+    parser.add_argument("--tiles", nargs=2, type=int, metavar=("COLUMNS", "ROWS"), help="Projector tiles (fixed backend)")
+    parser.add_argument("--overlap", type=float, default=1.0, help="Overlap of neighbouring tiles, in world units")
+    parser.add_argument("--bsp-threshold", type=int, default=2000, help="Items from which the fixed backend uses a BSP index")
+    args = parser.parse_args()
+
+    app = QtWidgets.QApplication([])
+    json.dump({backend: run(app, backend, args) for backend in args.backend}, sys.stdout, indent=4)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+''' Frame time of a headless Projection_Server.
+
+Builds scenes of N image items or N markers (one tracked_item_group) driven by
+simulated trackers (sim://circle), renders them on the Qt offscreen platform
+and reports, per scene:
+
+    * position_update time without paint, paint time and frame time (p50/p99)
+    * achieved fps, process CPU and RSS (GUI process)
+
+Trackers run in a thread of the GUI process or, with --ingest process, in a
+worker process (check Ingest_Process).
+
+Each scene runs in its own process. Results are JSON, to compare releases:
+
+    python frame_benchmark.py --scene images markers --count 10 100 1000 --output current.json
+    python frame_benchmark.py --count 100 --compare baseline.json --tolerance 0.2
+    python frame_benchmark.py --scene markers --count 1000 --rate 1000 --ingest thread process
+'''
+import argparse
+import json
+import os
+import platform
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from threading import Thread
+
+import numpy as np
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        return 0
+
+
+def scene_items(scene, count, rate) -> list:
+    tracker = f"sim://circle?bodies={count}&rate_hz={rate}&radius=0.8"
+    if scene == "markers":
+        return [{"type": "tracked_item_group", "name": "markers", "positions": np.zeros((count, 2)),
+                "sizes": 0.02, "vicon_tracker": tracker}]
+
+    spot = np.random.default_rng(0).integers(0, 256, (32, 32, 4), dtype=np.uint8)
+    return [{"type": "image_item", "name": f"spot{i}", "image": spot, "position": [0, 0],
+            "width": 0.05, "height": 0.05, "vicon_tracker": {"tracker_name": tracker, "sensor": i}}
+            for i in range(count)]
+
+
+def run_scene(params) -> dict:
+    ''' Run one scene. Called in a child process.
+    '''
+    from PyQt6 import QtCore
+    from vicon_projector_server import Projection_Server
+
+    config = {"x": [-1, 1], "y": [-1, 1], "hostname": "localhost", "port": free_port(),
+            "headless": True, "resolution": params["resolution"],
+            "canvas_backend": params["backend"], "frame_mode": "data", "max_fps": params["max_fps"],
+            "ingest_process": params["ingest"] == "process"}
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(config, f)
+    server = Projection_Server(f.name)
+    os.remove(f.name)
+
+    server.add_items(scene_items(params["scene"], params["count"], params["rate"]))
+
+    # Paints happen inside position_update (processEvents) or between frames
+    frames = []
+    paint = [0.0]
+    window = server.canvas.window
+    server.canvas.add_paint_callback(lambda: paint.__setitem__(0, paint[0] + window.paint_time))
+
+    frame_fn = server.frame_scheduler.frame_fn
+    def timed_frame():
+        paint[0] = 0.0
+        start = time.perf_counter()
+        frame_fn()
+        frames.append((time.perf_counter() - start, paint[0]))
+    server.frame_scheduler.frame_fn = timed_frame
+
+    measure = {}
+    def begin():
+        frames.clear()
+        measure.update(wall=time.perf_counter(), cpu=time.process_time())
+    def end():
+        measure.update(wall=time.perf_counter() - measure["wall"], cpu=time.process_time() - measure["cpu"],
+                    rss=rss_bytes())
+        server.frame_scheduler.stop()
+        server.app.quit()
+
+    Thread(target=server.vicon_loop, daemon=True).start()
+    QtCore.QTimer.singleShot(int(params["warmup"] * 1000), begin)
+    QtCore.QTimer.singleShot(int((params["warmup"] + params["duration"]) * 1000), end)
+    server.run_canvas()
+    server.vicon_ingest.stop()
+    if server.ingest_process is not None:
+        server.ingest_process.stop()
+        server.position_buffer.unlink()
+
+    times = np.array(frames) * 1000 if frames else np.zeros((1, 2))
+    frame_ms, paint_ms = times[:, 0], times[:, 1]
+    update_ms = frame_ms - paint_ms
+
+    def percentiles(values) -> dict:
+        return {"p50": float(np.percentile(values, 50)), "p99": float(np.percentile(values, 99))}
+
+    return {"scene": params["scene"], "count": params["count"], "backend": params["backend"],
+            "ingest": params["ingest"],
+            "frames": len(frames),
+            "fps": len(frames) / measure["wall"],
+            "update_ms": percentiles(update_ms),
+            "paint_ms": percentiles(paint_ms),
+            "frame_ms": percentiles(frame_ms),
+            "cpu_percent": 100 * measure["cpu"] / measure["wall"],
+            "rss_mb": measure["rss"] / 2**20,
+            "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}
+
+
+def metadata(args) -> dict:
+    from PyQt6 import QtCore
+    import pyqtgraph
+
+    try:
+        revision = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        revision = None
+
+    return {"time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "revision": revision,
+            "python": platform.python_version(),
+            "qt": QtCore.QT_VERSION_STR,
+            "pyqtgraph": pyqtgraph.__version__,
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "arguments": {k: v for k, v in vars(args).items() if k not in ("child", "output", "compare")}}
+
+
+def compare(results, baseline_file, tolerance) -> list:
+    ''' Scenes whose p99 frame time grew more than ``tolerance`` (fraction) over the baseline.
+    '''
+    with open(baseline_file) as f:
+        baseline = {(r["scene"], r["count"], r["backend"], r.get("ingest", "thread")): r for r in json.load(f)["results"]}
+
+    regressions = []
+    for result in results:
+        previous = baseline.get((result["scene"], result["count"], result["backend"], result["ingest"]))
+        if previous is None:
+            continue
+        ratio = result["frame_ms"]["p99"] / max(previous["frame_ms"]["p99"], 1e-9)
+        if ratio > 1 + tolerance:
+            regressions.append({"scene": result["scene"], "count": result["count"], "backend": result["backend"],
+                                "ingest": result["ingest"],
+                                "baseline_p99_ms": previous["frame_ms"]["p99"],
+                                "p99_ms": result["frame_ms"]["p99"], "ratio": ratio})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scene", nargs="+", default=["images", "markers"], choices=["images", "markers"])
+    parser.add_argument("--count", nargs="+", type=int, default=[10, 100, 1000])
+    parser.add_argument("--backend", nargs="+", default=["plot"], choices=["plot", "fixed"])
+    parser.add_argument("--ingest", nargs="+", default=["thread"], choices=["thread", "process"],
+                        help="Where the trackers run. Default: thread")
+    parser.add_argument("--rate", type=float, default=100, help="Simulated samples per body per second")
+    parser.add_argument("--max-fps", type=float, default=60)
+    parser.add_argument("--resolution", nargs=2, type=int, default=[1920, 1080])
+    parser.add_argument("--warmup", type=float, default=1.0, help="Seconds before measuring")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds measured per scene")
+    parser.add_argument("--output", help="JSON file. Default: stdout")
+    parser.add_argument("--compare", help="Baseline JSON file. Exit code 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed p99 frame time growth. Default: 0.1 (10%%)")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_scene(json.loads(args.child))))
+        sys.stdout.flush()
+        os._exit(0)        # Tracker and RPC threads are not joined
+
+    results = []
+    for ingest in args.ingest:
+        for backend in args.backend:
+            for scene in args.scene:
+                for count in args.count:
+                    params = {"scene": scene, "count": count, "backend": backend, "ingest": ingest, "rate": args.rate,
+                            "max_fps": args.max_fps, "resolution": args.resolution,
+                            "warmup": args.warmup, "duration": args.duration}
+                    child = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", json.dumps(params)],
+                                        capture_output=True, text=True)
+                    if child.returncode != 0:
+                        sys.stderr.write(child.stderr)
+                        raise RuntimeError(f"Scene failed: {params}")
+                    results.append(json.loads(child.stdout.strip().splitlines()[-1]))
+
+    report = {"meta": metadata(args), "results": results}
+    if args.compare:
+        report["regressions"] = compare(results, args.compare, args.tolerance)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+    else:
+        json.dump(report, sys.stdout, indent=4)
+        print()
+
+    if report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
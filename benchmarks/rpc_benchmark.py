@@ -0,0 +1,223 @@
+''' JSON-RPC throughput and latency.
+
+Starts a headless Projection_Server (Qt offscreen platform) with its JSON-RPC
+server on a local port, then drives it from client threads over persistent
+HTTP connections. Reports requests/sec and latency percentiles.
+
+Usage:
+    python rpc_benchmark.py --clients 4 --requests 2000
+    python rpc_benchmark.py --batch 50                  # 50 calls per HTTP request
+    python rpc_benchmark.py --backend werkzeug asyncio  # Compare RPC transports
+    python rpc_benchmark.py --backend asyncio --tcp     # Newline delimited JSON over TCP
+    python rpc_benchmark.py --backend asyncio --pipeline 16
+    python rpc_benchmark.py --url http://host:4000/      # Existing server
+'''
+import argparse
+import http.client
+import json
+import logging
+import os
+import socket
+import sys
+import tempfile
+import time
+from threading import Thread
+from urllib.parse import urlparse
+
+import numpy as np
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port):
+    for _ in range(100):
+        try:
+            socket.create_connection(("localhost", port), timeout=0.1).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+
+
+def start_local_server(backends = ("werkzeug",)) -> tuple:
+    ''' Start a Projection_Server in this process with one RPC endpoint per backend.
+
+    Returns:
+        tuple: ({backend: (http_url, tcp_url)}, server)
+    '''
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)     # Per request logging skews results
+    from vicon_projector_server import Projection_Server
+    from vicon_projector_server.rpc_server import JSON_RPC_Server
+    from vicon_projector_server.async_rpc_server import Async_JSON_RPC_Server
+
+    config = {"x": [0, 10], "y": [0, 10], "hostname": "localhost", "port": free_port()}
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(config, f)
+
+    server = Projection_Server(config_file=f.name)
+
+    urls = {}
+    for backend in backends:
+        port = free_port()
+        if backend == "asyncio":
+            tcp_port = free_port()
+            rpc = Async_JSON_RPC_Server(server, "localhost", port, tcp_port=tcp_port)
+            urls[backend] = (f"http://localhost:{port}/", f"tcp://localhost:{tcp_port}")
+        else:
+            rpc = JSON_RPC_Server(server, "localhost", port)
+            urls[backend] = (f"http://localhost:{port}/", None)
+
+        Thread(target=rpc.run, daemon=True).start()
+        wait_for_port(port)
+        if backend == "asyncio":
+            wait_for_port(tcp_port)
+
+    return urls, server
+
+
+def payload(method, batch, start_id):
+    calls = [{"jsonrpc": "2.0", "method": method, "params": {}, "id": start_id + i} for i in range(batch)]
+    return json.dumps(calls if batch > 1 else calls[0])
+
+
+def count_errors(data, errors):
+    result = json.loads(data)
+    results = result if isinstance(result, list) else [result]
+    errors[0] += sum(1 for r in results if "error" in r)
+
+
+def client(url, method, requests, batch, latencies, errors):
+    target = urlparse(url)
+    conn = http.client.HTTPConnection(target.hostname, target.port)
+    headers = {"Content-Type": "application/json"}
+
+    for i in range(requests):
+        body = payload(method, batch, i * batch)
+        start = time.perf_counter()
+        conn.request("POST", target.path or "/", body=body, headers=headers)
+        response = conn.getresponse()
+        data = response.read()
+        latencies.append(time.perf_counter() - start)
+        count_errors(data, errors)
+
+    conn.close()
+
+
+def pipelined_client(url, method, requests, batch, depth, latencies, errors):
+    ''' Keeps ``depth`` requests in flight on one connection. HTTP (pipelining) or tcp:// (one request per line).
+    '''
+    target = urlparse(url)
+    sock = socket.create_connection((target.hostname, target.port))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    stream = sock.makefile("rb")
+    tcp = target.scheme == "tcp"
+
+    def send(i):
+        body = payload(method, batch, i * batch).encode()
+        if tcp:
+            sock.sendall(body + b"\n")
+        else:
+            sock.sendall(b"POST %s HTTP/1.1\r\nHost: %s\r\nContent-Type: application/json\r\n"
+                        b"Content-Length: %d\r\n\r\n" % ((target.path or "/").encode(), target.hostname.encode(), len(body))
+                        + body)
+
+    def receive():
+        if tcp:
+            line = stream.readline()
+            if not line:
+                raise ConnectionError
+            return line
+        length = 0
+        status = stream.readline()
+        if not status:
+            raise ConnectionError
+        while True:
+            line = stream.readline()
+            if line in (b"\r\n", b""):
+                break
+            if line.lower().startswith(b"content-length:"):
+                length = int(line.split(b":")[1])
+        return stream.read(length)
+
+    in_flight = []
+    sent = 0
+    while sent < requests or in_flight:
+        while sent < requests and len(in_flight) < depth:
+            in_flight.append(time.perf_counter())
+            send(sent)
+            sent += 1
+        data = receive()
+        latencies.append(time.perf_counter() - in_flight.pop(0))
+        count_errors(data, errors)
+
+    sock.close()
+
+
+def run(url, method, clients, requests, batch, pipeline = 1) -> dict:
+    latencies = []
+    errors = [0]
+    if pipeline > 1 or url.startswith("tcp://"):
+        threads = [Thread(target=pipelined_client, args=(url, method, requests, batch, pipeline, latencies, errors))
+                    for _ in range(clients)]
+    else:
+        threads = [Thread(target=client, args=(url, method, requests, batch, latencies, errors))
+                    for _ in range(clients)]
+
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+
+    lat = np.array(latencies) * 1000
+    return {
+        "http_requests_per_s": len(lat) / wall,
+        "calls_per_s": len(lat) * batch / wall,
+        "p50_ms": float(np.percentile(lat, 50)),
+        "p99_ms": float(np.percentile(lat, 99)),
+        "max_ms": float(lat.max()),
+        "errors": errors[0],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="Existing server. Default: start one locally")
+    parser.add_argument("--method", default="test_connection")
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=1000, help="HTTP requests per client")
+    parser.add_argument("--batch", type=int, default=1, help="JSON-RPC calls per HTTP request")
+    parser.add_argument("--backend", nargs="+", default=["werkzeug"], choices=["werkzeug", "asyncio"],
+                        help="RPC transport(s) of the local server. Several = comparison")
+    parser.add_argument("--tcp", action="store_true", help="Use the newline delimited TCP endpoint (asyncio only)")
+    parser.add_argument("--pipeline", type=int, default=1, help="Requests in flight per connection")
+    args = parser.parse_args()
+
+    if args.url is not None:
+        targets = {"url": args.url}
+    else:
+        urls, _server = start_local_server(args.backend)
+        targets = {backend: tcp_url if args.tcp and tcp_url else http_url
+                    for backend, (http_url, tcp_url) in urls.items()}
+
+    results = {}
+    for name, url in targets.items():
+        # werkzeug stalls on pipelined requests. Measure it one request at a time
+        pipeline = 1 if name == "werkzeug" else args.pipeline
+
+        # Warm up
+        run(url, args.method, 1, 10, args.batch, pipeline)
+        results[name] = run(url, args.method, args.clients, args.requests, args.batch, pipeline)
+        results[name]["pipeline"] = pipeline
+
+    json.dump(results if len(results) > 1 else results.popitem()[1], sys.stdout, indent=4)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+''' Image item creation time and memory, with and without the shared texture cache.
+
+Creates N image items from --unique distinct images (like N "spot" markers
+from circle.png), renders them once and reports time per item, resident memory
+growth and cache counters.
+
+Usage:
+    python texture_cache_benchmark.py --items 200 --unique 1
+    python texture_cache_benchmark.py --items 200 --unique 1 --size 512 --no-cache
+'''
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+import pyqtgraph as pg
+from PyQt6 import QtWidgets
+
+from vicon_projector_server.Projection_Item import image_item
+from vicon_projector_server.texture_cache import default_texture_cache
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * 4096
+    except OSError:
+        return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--unique", type=int, default=1, help="Distinct images")
+    parser.add_argument("--size", type=int, default=256, help="Image side, in pixels")
+    parser.add_argument("--no-cache", action="store_true", help="One pg.ImageItem per item")
+    args = parser.parse_args()
+
+    app = QtWidgets.QApplication([])
+    window = pg.PlotWidget()
+    window.resize(800, 800)
+    window.setXRange(0, 20)
+    window.setYRange(0, 20)
+    window.show()
+
+    rng = np.random.default_rng(0)
+    images = [rng.integers(0, 256, (args.size, args.size, 4), dtype=np.uint8) for _ in range(args.unique)]
+
+    rss_start = rss_bytes()
+    start = time.perf_counter()
+    items = []
+    for i in range(args.items):
+        # Each item gets its own array, as when decoded from a file or sent over RPC
+        _image = images[i % args.unique].copy()
+        items.append(image_item(f"spot{i}", _image, [i % 20, i // 20 % 20], 1, 1, shared_texture=not args.no_cache))
+        window.addItem(items[-1].handle)
+    created = time.perf_counter() - start
+
+    start = time.perf_counter()
+    app.processEvents()
+    window.grab()
+    first_paint = time.perf_counter() - start
+
+    json.dump({
+        "items": args.items,
+        "unique": args.unique,
+        "shared": not args.no_cache,
+        "add_ms_per_item": created / args.items * 1000,
+        "first_paint_ms": first_paint * 1000,
+        "rss_growth_mb": (rss_bytes() - rss_start) / 2**20,
+        "cache": default_texture_cache.get_stats(),
+    }, sys.stdout, indent=4)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+''' Tracker record/replay overhead and throughput.
+
+Dispatches samples through a Tracker_Pool with and without a Tracker_Recorder
+and reports the cost per sample. Then records a simulated tracker for
+--duration seconds and replays the log at --speed and as fast as possible.
+
+Usage:
+    python tracker_log_benchmark.py --bodies 10 --rate 100
+    python tracker_log_benchmark.py --samples 1000000 --speed 4
+'''
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from vicon_projector_server.tracker_pool import Tracker_Pool
+from vicon_projector_server.tracker_log import Tracker_Recorder, Tracker_Replayer
+
+
+def noop(userdata, data):
+    pass
+
+
+def dispatch(pool, bodies, rate, samples) -> float:
+    ''' Seconds per sample dispatched through the pool (source excluded).
+    '''
+    tracker = pool.acquire(f"sim://circle?bodies={bodies}&rate_hz={rate}")
+    tracker.register_change_handler(None, noop, "position")
+
+    # Pregenerated samples so only dispatch + recording is measured
+    data = [("position", {"sensor": i % bodies, "position": (i, 1.0, 0.0), "quaternion": (0, 0, 0, 1),
+                        "time": 1.0e9 + i / rate}) for i in range(min(samples, 100000))]
+
+    start = time.perf_counter()
+    for i in range(samples):
+        tracker._dispatch(*data[i % len(data)])
+    elapsed = time.perf_counter() - start
+
+    pool.release(tracker)
+    return elapsed / samples
+
+
+def record(filename, tracker_name, duration) -> int:
+    ''' Record a simulated tracker in real time.
+    '''
+    pool = Tracker_Pool()
+    recorder = Tracker_Recorder(filename, capacity=1000000)
+    pool.set_recorder(recorder)
+
+    tracker = pool.acquire(tracker_name)
+    tracker.register_change_handler(None, noop, "position")
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        tracker.mainloop()
+        time.sleep(0.001)
+    pool.release(tracker)
+
+    recorder.close()
+    return recorder.count
+
+
+def replay(filename, speed, tracker_name) -> tuple:
+    pool = Tracker_Pool()
+    replayer = Tracker_Replayer(filename, speed=speed)
+    replayer.install(pool)
+
+    count = [0]
+    def counter(userdata, data):
+        count[0] += 1
+
+    tracker = pool.acquire(tracker_name)
+    tracker.register_change_handler(None, counter, "position")
+    start = time.perf_counter()
+    while not replayer.finished:
+        tracker.mainloop()
+        if speed:
+            time.sleep(0.001)
+    elapsed = time.perf_counter() - start
+    pool.release(tracker)
+    return count[0], elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bodies", type=int, default=10)
+    parser.add_argument("--rate", type=float, default=100, help="Samples per body per second")
+    parser.add_argument("--samples", type=int, default=200000, help="Samples dispatched per measurement")
+    parser.add_argument("--duration", type=float, default=4.0, help="Seconds recorded in real time")
+    parser.add_argument("--speed", type=float, default=4, help="Replay speed of the timed replay")
+    args = parser.parse_args()
+
+    filename = os.path.join(tempfile.mkdtemp(), "tracker.log")
+    tracker_name = f"sim://circle?bodies={args.bodies}&rate_hz={args.rate}"
+
+    baseline = dispatch(Tracker_Pool(), args.bodies, args.rate, args.samples)
+
+    pool = Tracker_Pool()
+    recorder = Tracker_Recorder(filename, capacity=args.samples)
+    pool.set_recorder(recorder)
+    recorded = dispatch(pool, args.bodies, args.rate, args.samples)
+    recorder.close()
+
+    recorded_live = record(filename, tracker_name, args.duration)
+    log_bytes = os.path.getsize(filename)
+    _, timed = replay(filename, args.speed, tracker_name)
+    replayed, fast = replay(filename, None, tracker_name)
+
+    json.dump({
+        "dispatch_us": baseline * 1e6,
+        "dispatch_recorded_us": recorded * 1e6,
+        "record_overhead_us": (recorded - baseline) * 1e6,
+        "cpu_percent_at_1khz": (recorded - baseline) * 1000 * 100,
+        "recorded": recorded_live,
+        "log_bytes": log_bytes,
+        "replay_s": timed,
+        "replay_expected_s": args.duration / args.speed,
+        "replayed": replayed,
+        "replay_fast_samples_per_s": replayed / fast,
+    }, sys.stdout, indent=4)
+    print()
+    os.remove(filename)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+''' UDP binary ingress throughput and latency.
+
+Runs a UDP_Ingress on a local port and a sender thread streaming N bodies at
+M Hz. Reports records written, dropped records, sender-to-buffer latency and
+process CPU usage.
+
+Usage:
+    python udp_ingress_benchmark.py --bodies 50 --rate 200
+    python udp_ingress_benchmark.py --bodies 500 --rate 200 --per-datagram 50
+'''
+import argparse
+import json
+import socket
+import sys
+import time
+from threading import Thread
+
+import numpy as np
+
+from vicon_projector_server.position_buffer import Position_Buffer
+from vicon_projector_server.udp_ingress import UDP_Ingress, pack_records
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+def sender(port, bodies, rate, per_datagram, duration, latencies, buffer, slots):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    ids = np.arange(bodies)
+    period = 1.0 / rate
+    start = time.perf_counter()
+    frame = 0
+    sent = 0
+
+    while time.perf_counter() - start < duration:
+        stamp = time.time()
+        positions = np.column_stack((np.cos(frame * period + ids), np.sin(frame * period + ids)))
+        for i in range(0, bodies, per_datagram):
+            sock.sendto(pack_records(ids[i:i + per_datagram], positions[i:i + per_datagram], frame, timestamp=stamp),
+                        ("localhost", port))
+            sent += min(per_datagram, bodies - i)
+        frame += 1
+
+        # Latency of the previous frame: time it reached the buffer - sample time
+        if frame > 1:
+            latencies.extend((buffer.receive_time[slots] - buffer.timestamp[slots])[buffer.timestamp[slots] > 0].tolist())
+
+        _wait = start + frame * period - time.perf_counter()
+        if _wait > 0:
+            time.sleep(_wait)
+
+    sock.close()
+    return sent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bodies", type=int, default=50)
+    parser.add_argument("--rate", type=float, default=200, help="Samples per body per second")
+    parser.add_argument("--per-datagram", type=int, default=1, help="Records per datagram")
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args()
+
+    buffer = Position_Buffer(capacity=max(args.bodies, 1))
+    slots = buffer.allocate(args.bodies)
+
+    ingress = UDP_Ingress(buffer, hostname="localhost", port=free_port())
+    ingress.register("bodies", np.arange(args.bodies), slots)
+    ingress.open()
+    Thread(target=ingress.run, daemon=True).start()
+
+    latencies = []
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    sent = sender(ingress.port, args.bodies, args.rate, args.per_datagram, args.duration, latencies, buffer, slots)
+    time.sleep(0.2)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    ingress.stop()
+
+    stats = ingress.get_stats()
+    lat = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    json.dump({
+        "records_sent": sent,
+        "records_per_s": stats["records"] / wall,
+        "datagrams_per_s": stats["datagrams"] / wall,
+        "written": stats["written"],
+        "stale": stats["stale"],
+        "lost": sent - stats["records"],
+        "latency_p50_ms": float(np.percentile(lat, 50)),
+        "latency_p99_ms": float(np.percentile(lat, 99)),
+        "cpu_percent": 100 * cpu / wall,     # Sender included
+    }, sys.stdout, indent=4)
+    print()
+
+
+if __name__ == "__main__":
+    main()
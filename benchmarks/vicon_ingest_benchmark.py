@@ -0,0 +1,132 @@
+''' CPU usage and callback rate of the VRPN ingest loop.
+
+Compares the legacy busy-spinning ``vicon_loop`` against :obj:`Vicon_Ingest`
+using local fake trackers. Each fake tracker is fed through a socket pair by a
+producer thread at a fixed rate, so no Vicon system or VRPN build is needed.
+
+Usage:
+    python vicon_ingest_benchmark.py --trackers 10 --rate 200 --duration 5
+    python vicon_ingest_benchmark.py --no-fileno      # Adaptive sleep path
+'''
+import argparse
+import socket
+import time
+from threading import Thread, Event
+
+from vicon_projector_server.vicon_ingest import Vicon_Ingest
+
+
+class Fake_Tracker:
+    '''Minimal stand-in for ``vrpn.receiver.Tracker``.
+
+    Every byte received on the socket is one position sample.
+    '''
+    def __init__(self, expose_fileno: bool = True):
+        self.rx, self.tx = socket.socketpair()
+        self.rx.setblocking(False)
+        self.handlers = []
+        self.callbacks = 0
+
+        if expose_fileno:
+            self.fileno = self.rx.fileno
+
+    def register_change_handler(self, userdata, callback, kind, sensor = None):
+        if kind == "position":
+            self.handlers.append((userdata, callback))
+
+    def mainloop(self):
+        try:
+            data = self.rx.recv(4096)
+        except BlockingIOError:
+            return
+
+        for _ in range(len(data)):
+            sample = {"sensor": 0, "position": (0.0, 0.0, 0.0), "time": time.time()}
+            for userdata, callback in self.handlers:
+                callback(userdata, sample)
+
+    def close(self):
+        self.rx.close()
+        self.tx.close()
+
+
+def producer(trackers, rate, stop):
+    ''' Send one sample per tracker at ``rate`` Hz.
+    '''
+    period = 1.0/rate
+    next_time = time.perf_counter()
+    while not stop.is_set():
+        for tracker in trackers:
+            tracker.tx.send(b"\x01")
+        next_time += period
+        time.sleep(max(0.0, next_time - time.perf_counter()))
+
+
+def legacy_loop(trackers, stop):
+    ''' Previous ``Projection_Server.vicon_loop`` behaviour.
+    '''
+    while not stop.is_set():
+        for tracker in trackers:
+            tracker.mainloop()
+
+
+def run_case(name, trackers, rate, duration, loop_fn):
+    for tracker in trackers:
+        tracker.callbacks = 0
+        tracker.handlers.append((None, lambda _u, _d, t = tracker: setattr(t, "callbacks", t.callbacks + 1)))
+
+    stop = Event()
+    feeder = Thread(target=producer, args=(trackers, rate, stop))
+    loop = Thread(target=loop_fn, args=(stop,))
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+
+    feeder.start()
+    loop.start()
+    time.sleep(duration)
+    stop.set()
+    feeder.join()
+    loop.join()
+
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    callbacks = sum(t.callbacks for t in trackers)
+
+    print(f"{name:<12} cpu: {100*cpu/wall:6.1f} %   "
+          f"callbacks: {callbacks/wall:9.1f} /s   "
+          f"expected: {rate*len(trackers):9.1f} /s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trackers", type=int, default=10)
+    parser.add_argument("--rate", type=float, default=200.0, help="Samples per second per tracker")
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--no-fileno", action="store_true", help="Hide the socket from the ingest engine")
+    args = parser.parse_args()
+
+    # Legacy busy loop
+    trackers = [Fake_Tracker(not args.no_fileno) for _ in range(args.trackers)]
+    run_case("legacy", trackers, args.rate, args.duration,
+            lambda stop: legacy_loop(trackers, stop))
+    for tracker in trackers:
+        tracker.close()
+
+    # Event driven ingest
+    trackers = [Fake_Tracker(not args.no_fileno) for _ in range(args.trackers)]
+    ingest = Vicon_Ingest()
+    for tracker in trackers:
+        ingest.add_tracker(tracker)
+
+    def ingest_loop(stop):
+        Thread(target=lambda: (stop.wait(), ingest.stop())).start()
+        ingest.run()
+
+    run_case("vicon_ingest", trackers, args.rate, args.duration, ingest_loop)
+    for tracker in trackers:
+        tracker.close()
+
+
+if __name__ == "__main__":
+    main()
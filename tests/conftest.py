@@ -0,0 +1,21 @@
+import json
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+@pytest.fixture
+def projection_server(tmp_path):
+    ''' Headless Projection_Server. Calls from the test thread run immediately (GUI thread).
+    '''
+    from vicon_projector_server import Projection_Server
+
+    def create(**config):
+        _config = {"x": [-2, 2], "y": [-2, 2], "headless": True, "canvas_backend": "fixed",
+                   "frame_mode": "data", **config}
+        _file = tmp_path / "config.json"
+        _file.write_text(json.dumps(_config))
+        return Projection_Server(str(_file))
+    return create
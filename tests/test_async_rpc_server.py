@@ -0,0 +1,119 @@
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+from vicon_projector_server.async_rpc_server import Async_JSON_RPC_Server
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+class _Test_Server(Async_JSON_RPC_Server):
+    ''' RPC server with test methods instead of a Projection_Server.
+    '''
+    def register_methods(self):
+        self.calls = []
+
+        def slow(value):
+            time.sleep(0.3)
+            self.calls.append(value)
+            return value
+
+        def fast(value):
+            self.calls.append(value)
+            return value
+
+        for method in (slow, fast):
+            self.dispatcher.add_method(method)
+
+
+@pytest.fixture
+def server():
+    _server = _Test_Server(None, "localhost", _free_port(), tcp_port=_free_port())
+    _thread = threading.Thread(target=_server.run, daemon=True)
+    _thread.start()
+    for _ in range(500):
+        try:
+            socket.create_connection(("localhost", _server.port)).close()
+            break
+        except ConnectionRefusedError:
+            time.sleep(0.01)
+    yield _server
+    _server.stop()
+    _thread.join(5)
+
+
+def _request(method, value, id) -> bytes:
+    return json.dumps({"jsonrpc": "2.0", "method": method, "params": [value], "id": id}).encode()
+
+
+def _http_request(body, headers=b"") -> bytes:
+    return (b"POST / HTTP/1.1\r\nHost: localhost\r\nContent-Length: %d\r\n%s\r\n" % (len(body), headers)) + body
+
+
+def _read_http_responses(connection, count) -> list:
+    _file = connection.makefile("rb")
+    _responses = []
+    for _ in range(count):
+        _status = _file.readline()
+        _headers = {}
+        while True:
+            _line = _file.readline().strip()
+            if not _line:
+                break
+            _key, _value = _line.decode().split(":", 1)
+            _headers[_key.strip().lower()] = _value.strip()
+        _body = _file.read(int(_headers.get("content-length", 0)))
+        _responses.append((int(_status.split()[1]), _body))
+    return _responses
+
+
+def test_http_pipelined_requests_run_in_order(server):
+    with socket.create_connection(("localhost", server.port), timeout=5) as connection:
+        connection.sendall(_http_request(_request("slow", "first", 1)) + _http_request(_request("fast", "second", 2)))
+        _responses = _read_http_responses(connection, 2)
+
+    assert [json.loads(body)["result"] for _, body in _responses] == ["first", "second"]
+    # The second call must not start before the first returned
+    assert server.calls == ["first", "second"]
+
+
+def test_tcp_requests_run_in_order(server):
+    with socket.create_connection(("localhost", server.tcp_port), timeout=5) as connection:
+        connection.sendall(_request("slow", "first", 1) + b"\n" + _request("fast", "second", 2) + b"\n")
+        _file = connection.makefile("rb")
+        _results = [json.loads(_file.readline())["result"] for _ in range(2)]
+
+    assert _results == ["first", "second"]
+    assert server.calls == ["first", "second"]
+
+
+def test_connections_run_concurrently(server):
+    with socket.create_connection(("localhost", server.tcp_port), timeout=5) as slow_connection, \
+            socket.create_connection(("localhost", server.tcp_port), timeout=5) as fast_connection:
+        slow_connection.sendall(_request("slow", "slow", 1) + b"\n")
+        time.sleep(0.05)
+        fast_connection.sendall(_request("fast", "fast", 2) + b"\n")
+        assert json.loads(fast_connection.makefile("rb").readline())["result"] == "fast"
+        assert json.loads(slow_connection.makefile("rb").readline())["result"] == "slow"
+
+    assert server.calls == ["fast", "slow"]
+
+
+@pytest.mark.parametrize("length", [b"abc", b"-5"])
+def test_http_bad_content_length(server, length):
+    with socket.create_connection(("localhost", server.port), timeout=5) as connection:
+        connection.sendall(b"POST / HTTP/1.1\r\nHost: localhost\r\nContent-Length: " + length + b"\r\n\r\n")
+        assert _read_http_responses(connection, 1)[0][0] == 400
+
+    # The server keeps serving other connections
+    with socket.create_connection(("localhost", server.port), timeout=5) as connection:
+        connection.sendall(_http_request(_request("fast", 1, 1)))
+        _status, _body = _read_http_responses(connection, 1)[0]
+        assert _status == 200 and json.loads(_body)["result"] == 1
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+
+def _marker(name, position=(0, 0)):
+    return {"type": "tracked_item_group", "name": name, "positions": [list(position)]}
+
+
+def test_set_positions_is_atomic(projection_server):
+    server = projection_server()
+    server.add_items([{"type": "tracked_item_group", "name": "g", "positions": [[0, 0], [1, 1]]},
+                      _marker("a")])
+    server.all_plot_items["a"].position = [0, 0]
+
+    with pytest.raises(ValueError):
+        server.set_positions({"a": [5, 5], "g": [[1, 2], [3, 4], [5, 6]]})
+    assert server.position_buffer.position[server.all_plot_items["a"].slots].tolist() == [[0, 0]]
+
+    server.set_positions({"a": [5, 5], "g": [[1, 2], [3, 4]]})
+    assert server.position_buffer.position[server.all_plot_items["g"].slots].tolist() == [[1, 2], [3, 4]]
+
+
+def test_set_z_values_is_atomic(projection_server):
+    server = projection_server()
+    server.add_items([_marker("a"), _marker("b")])
+    _z = server.all_plot_items["a"].handle.zValue()
+
+    with pytest.raises(ValueError):
+        server.set_z_values({"a": 3, "b": "top"})
+    assert server.all_plot_items["a"].handle.zValue() == _z
+
+
+def test_add_items_rolls_back_when_buffer_is_full(projection_server):
+    server = projection_server(max_tracked_slots=3)
+    server.add_items([_marker("a")])
+
+    with pytest.raises(MemoryError):
+        server.add_items([_marker("b"), {"type": "tracked_item_group", "name": "h", "positions": np.zeros((5, 2)).tolist()}])
+
+    assert sorted(server.all_plot_items) == ["a"]
+    assert server.spatial_index.get_stats()["slots"] == 1
+    # Freed slots can be used again
+    server.add_items([_marker("b"), _marker("c")])
+    assert sorted(server.all_plot_items) == ["a", "b", "c"]
+
+
+def test_add_items_rejects_duplicates(projection_server):
+    server = projection_server()
+    server.add_items([_marker("a")])
+
+    with pytest.raises(NameError):
+        server.add_items([_marker("b"), _marker("b")])
+    with pytest.raises(NameError):
+        server.add_items([_marker("a")])
+    assert sorted(server.all_plot_items) == ["a"]
+
+
+def test_hide_requests_a_frame(projection_server, monkeypatch):
+    server = projection_server()
+    server.add_items([_marker("a"), _marker("b")])
+    requests = []
+    monkeypatch.setattr(server.frame_scheduler, "request_frame", lambda: requests.append(1))
+
+    server.hide_item("a")
+    server.hide_item("a", False)
+    server.hide_items(["a", "b"])
+    assert len(requests) == 3
+
+
+def test_remove_items_is_atomic(projection_server):
+    server = projection_server()
+    server.add_items([_marker("a"), _marker("b")])
+
+    with pytest.raises(NameError):
+        server.remove_items(["a", "a"])
+    with pytest.raises(NameError):
+        server.remove_items(["a", "missing", "b"])
+    assert sorted(server.all_plot_items) == ["a", "b"]
+
+    server.remove_items(["a", "b"])
+    assert not server.all_plot_items
@@ -0,0 +1,81 @@
+import threading
+import time
+
+import pytest
+
+from vicon_projector_server.command_queue import Command_Queue
+
+
+def _call_from_thread(queue, fn):
+    _result = {}
+    def run():
+        try:
+            _result["value"] = queue.call(fn)
+        except BaseException as e:
+            _result["error"] = e
+    _thread = threading.Thread(target=run)
+    _thread.start()
+    return _thread, _result
+
+
+def test_call_runs_on_owner_thread():
+    queue = Command_Queue(timeout=5.0)
+    _thread, _result = _call_from_thread(queue, threading.get_ident)
+
+    while not len(queue):
+        time.sleep(0.001)
+    queue.drain()
+    _thread.join()
+
+    assert _result["value"] == queue.owner_thread
+
+
+def test_call_timeout_cancels_command():
+    queue = Command_Queue(timeout=0.05)
+    _ran = []
+    _thread, _result = _call_from_thread(queue, lambda: _ran.append(True))
+    _thread.join()
+
+    assert isinstance(_result["error"], TimeoutError)
+
+    # The render tick drains after the caller gave up: the command must not run
+    assert queue.drain() == 1
+    assert _ran == []
+
+
+def test_call_waits_for_running_command():
+    queue = Command_Queue(timeout=0.05)
+    _started = threading.Event()
+    def slow():
+        _started.set()
+        time.sleep(0.2)
+        return "done"
+
+    _thread, _result = _call_from_thread(queue, slow)
+    while not len(queue):
+        time.sleep(0.001)
+    queue.drain()
+    _thread.join()
+
+    # Started before the timeout expired: the caller gets the result, not an error
+    assert _started.is_set()
+    assert _result == {"value": "done"}
+
+
+def test_call_reraises_command_error():
+    queue = Command_Queue(timeout=5.0)
+    def fail():
+        raise NameError("missing")
+    _thread, _result = _call_from_thread(queue, fail)
+    while not len(queue):
+        time.sleep(0.001)
+    queue.drain()
+    _thread.join()
+
+    assert isinstance(_result["error"], NameError)
+
+
+def test_call_from_owner_thread_runs_immediately():
+    queue = Command_Queue()
+    assert queue.call(lambda: 42) == 42
+    assert len(queue) == 0
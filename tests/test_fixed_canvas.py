@@ -0,0 +1,91 @@
+import pyqtgraph as pg
+import pytest
+from PyQt6 import QtCore, QtGui, QtWidgets
+
+from vicon_projector_server.vicon_canvas import _Fixed_View
+
+
+@pytest.fixture(autouse=True)
+def app():
+    return pg.mkQApp()
+
+
+def _view(**kwargs):
+    view = _Fixed_View(QtCore.QRectF(-2, -1, 4, 2), **kwargs)
+    view.resize(400, 200)
+    view.show()
+    return view
+
+
+def _square(x, y, size=0.1, color=(255, 0, 0)):
+    item = QtWidgets.QGraphicsRectItem(x - size/2, y - size/2, size, size)
+    item.setPen(QtGui.QPen(QtCore.Qt.PenStyle.NoPen))
+    item.setBrush(QtGui.QColor(*color))
+    return item
+
+
+def test_world_fills_the_viewport_with_y_up():
+    view = _view()
+    assert view.mapFromScene(QtCore.QPointF(-2, 1)) == QtCore.QPoint(0, 0)
+    assert view.mapFromScene(QtCore.QPointF(2, -1)) == QtCore.QPoint(400, 200)
+    assert view.viewRect() == QtCore.QRectF(-2, -1, 4, 2)
+
+    view.set_world(QtCore.QRectF(0, 0, 1, 1))
+    assert view.mapFromScene(QtCore.QPointF(0, 1)) == QtCore.QPoint(0, 0)
+    assert view.mapFromScene(QtCore.QPointF(1, 0)) == QtCore.QPoint(400, 200)
+
+
+def test_items_are_drawn_at_their_world_position():
+    view = _view()
+    view.setBackground("k")
+    view.addItem(_square(1, 0.5))
+
+    frame = view.grab().toImage()
+    assert frame.pixelColor(300, 50).getRgb()[:3] == (255, 0, 0)
+    assert frame.pixelColor(300, 150).getRgb()[:3] == (0, 0, 0)       # Mirrored y
+    assert frame.pixelColor(100, 50).getRgb()[:3] == (0, 0, 0)        # Mirrored x
+
+
+def test_index_and_update_modes_follow_item_count():
+    view = _view(bsp_threshold=3, minimal_update_limit=1)
+    scene = view.scene()
+    items = [_square(0, 0) for _ in range(3)]
+
+    view.addItem(items[0])
+    assert scene.itemIndexMethod() == QtWidgets.QGraphicsScene.ItemIndexMethod.NoIndex
+    assert view.viewportUpdateMode() == QtWidgets.QGraphicsView.ViewportUpdateMode.MinimalViewportUpdate
+
+    view.addItem(items[1])
+    view.addItem(items[2])
+    assert scene.itemIndexMethod() == QtWidgets.QGraphicsScene.ItemIndexMethod.BspTreeIndex
+    assert view.viewportUpdateMode() == QtWidgets.QGraphicsView.ViewportUpdateMode.BoundingRectViewportUpdate
+
+    view.removeItem(items[2])
+    view.removeItem(items[1])
+    assert scene.itemIndexMethod() == QtWidgets.QGraphicsScene.ItemIndexMethod.NoIndex
+    assert view.viewportUpdateMode() == QtWidgets.QGraphicsView.ViewportUpdateMode.MinimalViewportUpdate
+
+
+def test_paint_callbacks_and_paint_time():
+    view = _view()
+    calls = []
+    view.paint_callbacks.append(lambda: calls.append(1))
+
+    view.grab()
+    assert calls == [1]
+    assert view.paint_time > 0
+
+
+def test_server_backends(projection_server):
+    server = projection_server()
+    assert isinstance(server.canvas.window, _Fixed_View)
+    assert server.canvas.get_tiles()[0]["x"] == [-2, 2]
+    with pytest.raises(NotImplementedError):
+        server.canvas.show_axis()
+
+    plot = projection_server(canvas_backend="plot")
+    assert isinstance(plot.canvas.window, pg.PlotWidget)
+    assert plot.canvas.get_tiles()[0]["items"] is None
+
+    with pytest.raises(ValueError):
+        projection_server(canvas_backend="opengl")
@@ -0,0 +1,85 @@
+import time
+from threading import Thread
+
+import pyqtgraph as pg
+import pytest
+from PyQt6 import QtCore
+
+from vicon_projector_server.frame_scheduler import Frame_Scheduler
+
+
+def _run_events(seconds):
+    _loop = QtCore.QEventLoop()
+    QtCore.QTimer.singleShot(int(seconds * 1000), _loop.quit)
+    _loop.exec()
+
+
+@pytest.fixture(autouse=True)
+def app():
+    return pg.mkQApp()
+
+
+def test_fixed_mode_runs_on_deadlines():
+    scheduler = Frame_Scheduler(lambda: None, mode="fixed", interval_ms=10)
+    scheduler.start()
+    _run_events(0.3)
+    scheduler.stop()
+    assert 20 <= scheduler.frame_count <= 32
+    assert scheduler.get_stats()["fps"] == pytest.approx(100, rel=0.3)
+
+
+def test_fixed_rate_mode_runs_at_the_refresh_rate():
+    scheduler = Frame_Scheduler(lambda: None, mode="fixed_rate", refresh_rate=50)
+    assert scheduler.period == pytest.approx(0.02)
+    scheduler.start()
+    _run_events(0.3)
+    scheduler.stop()
+    assert 10 <= scheduler.frame_count <= 17
+
+
+def test_overruns_skip_deadlines_and_lower_the_rate():
+    scheduler = Frame_Scheduler(lambda: time.sleep(0.025), mode="fixed", interval_ms=10)
+    scheduler.start()
+    _run_events(0.4)
+    scheduler.stop()
+    # Missed deadlines are skipped, not queued
+    assert scheduler.missed_deadlines > 0
+    assert scheduler.frame_count <= 0.4/0.025 + 1
+    assert scheduler.divisor > 1
+
+
+def test_data_mode_coalesces_requests_and_caps_the_rate():
+    frames = []
+    scheduler = Frame_Scheduler(lambda: frames.append(time.perf_counter()), mode="data", max_fps=50)
+    scheduler.start()
+    _run_events(0.05)
+    _start = len(frames)
+    assert _start == 1                  # start() runs one frame
+
+    # Requests from another thread, far above the cap
+    def requester():
+        for _ in range(300):
+            scheduler.request_frame()
+            time.sleep(0.001)
+    _thread = Thread(target=requester)
+    _thread.start()
+    _run_events(0.4)
+    _thread.join()
+
+    _count = len(frames) - _start
+    assert 5 <= _count <= 0.4*50 + 2
+    assert min(b - a for a, b in zip(frames[_start:], frames[_start + 1:])) >= 1/50 - 0.002
+
+    # No request, no frame
+    _run_events(0.05)
+    _count = len(frames)
+    _run_events(0.1)
+    scheduler.stop()
+    assert len(frames) == _count
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        Frame_Scheduler(lambda: None, mode="vsync")
+    with pytest.raises(ValueError):
+        Frame_Scheduler(lambda: None, mode="display")      # Not synchronized to the display. Check "fixed_rate"
@@ -0,0 +1,86 @@
+import numpy as np
+import pyqtgraph as pg
+import pytest
+from PyQt6 import QtGui
+
+from vicon_projector_server.Projection_Item.image_item import image_item, load_image
+from vicon_projector_server.texture_cache import Texture_Cache, Texture_Item, normalize_image
+
+
+@pytest.fixture(autouse=True)
+def app():
+    return pg.mkQApp()
+
+
+def _gray(qimage, x, y):
+    return qimage.pixelColor(x, y).red()
+
+
+def test_integer_images_use_fixed_levels():
+    # Narrow range: auto levels would stretch it to 0-255
+    image = np.full((4, 3), 100, dtype=np.int64)
+    image[1, 2] = 110
+    qimage, buffer = normalize_image(image)
+    assert buffer is None
+    assert (qimage.width(), qimage.height()) == (4, 3)        # image[x, y]
+    assert (_gray(qimage, 0, 0), _gray(qimage, 1, 2)) == (100, 110)
+
+    rgba = np.zeros((2, 2, 4), dtype=np.int32)
+    rgba[1, 0] = (255, 10, 20, 255)
+    assert normalize_image(rgba)[0].pixelColor(1, 0).getRgb() == (255, 10, 20, 255)
+
+
+def test_other_images_are_scaled_once():
+    image = np.array([[0.0, 0.5], [0.25, 1.0]])
+    qimage = normalize_image(image)[0]
+    assert (_gray(qimage, 0, 0), _gray(qimage, 1, 1)) == (0, 255)
+
+    wide = np.array([[0, 1000]], dtype=np.int64)
+    assert _gray(normalize_image(wide)[0], 0, 1) == 255
+
+
+def test_zero_copy_reads_the_array():
+    image = np.zeros((4, 2, 4), dtype=np.uint8).transpose(1, 0, 2).copy().transpose(1, 0, 2)
+    texture = Texture_Cache.wrap(image)
+    image[3, 1] = (1, 2, 3, 255)
+    assert texture.qimage.pixelColor(3, 1).getRgb() == (1, 2, 3, 255)
+
+    with pytest.raises(ValueError):
+        Texture_Cache.wrap(np.zeros((4, 2, 4), dtype=np.uint8))         # Rows not contiguous
+    with pytest.raises(ValueError):
+        Texture_Cache.wrap(np.zeros((2, 4), dtype=np.float64).T.copy().T)
+
+
+def test_load_image(tmp_path):
+    qimage = QtGui.QImage(3, 2, QtGui.QImage.Format.Format_RGBA8888)
+    qimage.fill(QtGui.QColor(0, 0, 0, 255))
+    qimage.setPixelColor(2, 1, QtGui.QColor(10, 20, 30, 255))
+    qimage.save(str(tmp_path / "image.png"))
+
+    image = load_image(str(tmp_path / "image.png"))
+    assert (image.shape, image.dtype) == ((2, 3, 4), np.uint8)      # Same layout as PIL: [row, column]
+    assert image[1, 2].tolist() == [10, 20, 30, 255]
+    with pytest.raises(FileNotFoundError):
+        load_image(str(tmp_path / "missing.png"))
+
+
+def test_image_items_blit_a_shared_texture():
+    image = np.zeros((8, 8, 4), dtype=np.uint8)
+    a = image_item("a", image, [1, 1], 2, 2)
+    b = image_item("b", image.copy(), [3, 3], 2, 2)
+    assert isinstance(a.handle, Texture_Item)
+    assert a.handle.texture is b.handle.texture
+    assert a.handle.mapRectToParent(a.handle.boundingRect()).getRect() == (0, 0, 2, 2)
+
+    # Extra pyqtgraph parameters: an image item of its own
+    c = image_item("c", image, [1, 1], 2, 2, autoLevels=False)
+    assert isinstance(c.handle, pg.ImageItem)
+
+
+def test_background_image(projection_server):
+    server = projection_server()
+    server.canvas.set_background(image=np.zeros((4, 4, 3), dtype=np.uint8))
+    background = server.canvas._bg
+    assert isinstance(background, Texture_Item)
+    assert background.zValue() == -100
+    assert background.mapRectToParent(background.boundingRect()).getRect() == (-2, -2, 4, 4)
@@ -0,0 +1,91 @@
+import os
+import signal
+import time
+
+import pytest
+
+from vicon_projector_server.ingest_process import Ingest_Process
+from vicon_projector_server.position_buffer import Shared_Position_Buffer
+
+
+@pytest.fixture
+def ingest():
+    _buffer = Shared_Position_Buffer(capacity=64)
+    _process = Ingest_Process(_buffer, timeout=10.0)
+    yield _process, _buffer
+    _process.stop()
+    _buffer.close()
+
+
+def test_call_returns_worker_result(ingest):
+    _process, _ = ingest
+    _stats = _process.get_stats()
+    assert _stats["pid"] == _process.process.pid
+    assert _stats["items"] == 0
+
+
+def test_worker_error_is_raised(ingest):
+    _process, _ = ingest
+    with pytest.raises(RuntimeError, match="Not recording"):
+        _process.call("stop_tracker_recording")
+
+
+def test_late_reply_is_not_given_to_next_call(ingest):
+    _process, _ = ingest
+    _process.get_stats()        # Worker started and answering
+
+    # Worker paused: the call times out, its reply comes once the worker resumes
+    os.kill(_process.process.pid, signal.SIGSTOP)
+    try:
+        _process.timeout = 0.5
+        with pytest.raises(RuntimeError, match="did not answer"):
+            _process.call("stop_tracker_recording")
+    finally:
+        os.kill(_process.process.pid, signal.SIGCONT)
+    time.sleep(0.5)
+
+    # The late "Not recording" error belongs to the call that timed out
+    _process.timeout = 10.0
+    assert _process.get_stats()["items"] == 0
+
+
+def test_unlink_removes_block():
+    _buffer = Shared_Position_Buffer(capacity=8)
+    _path = f"/dev/shm/{_buffer.name.lstrip('/')}"
+    if not os.path.exists(_path):
+        pytest.skip("Shared memory is not under /dev/shm")
+
+    _buffer.position[0] = (1, 2)
+    _buffer.unlink()
+    assert not os.path.exists(_path)
+    # Still mapped in this process
+    assert _buffer.position[0].tolist() == [1, 2]
+    _buffer.close()
+
+
+class _Failed_Ingest:
+    ''' Ingest_Process whose worker died.
+    '''
+    class process:
+        @staticmethod
+        def is_alive():
+            return False
+
+    def unregister(self, name):
+        raise RuntimeError("Ingest process is not running (exit code: -9)")
+
+
+def test_remove_item_when_worker_failed(projection_server):
+    server = projection_server()
+    server.add_items([{"type": "tracked_item_group", "name": "g", "positions": [[0, 0]]}])
+    _slots = server.all_plot_items["g"].slots
+    server.ingest_process = _Failed_Ingest()
+    server._ingest_items.add("g")
+
+    with pytest.raises(RuntimeError):
+        server.remove_item("g")
+
+    assert "g" not in server.all_plot_items
+    assert server.spatial_index.get_stats()["slots"] == 0
+    # Dead worker: slots are free again
+    assert server.position_buffer.allocate(1).tolist() == _slots.tolist()
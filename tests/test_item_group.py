@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+
+from vicon_projector_server.Projection_Item.item_group import tracked_item_group
+from vicon_projector_server.tracker_pool import Tracker_Pool
+
+
+@pytest.mark.parametrize("backend", ["plot", "fixed"])
+def test_marker_sizes_follow_the_view(projection_server, backend):
+    server = projection_server(canvas_backend=backend)
+    _requests = []
+    server.frame_scheduler.request_frame = lambda: _requests.append(True)
+    server.add_items([{"type": "tracked_item_group", "name": "g", "positions": [[0, 0], [1, 1]], "sizes": 0.5}])
+    _group = server.all_plot_items["g"]
+    _handle = _group.handle
+
+    # View not shown: pixel size unknown, nothing drawn at a wrong size, no frame loop
+    _requests.clear()
+    server.position_update()
+    assert not _handle.data["visible"].any()
+    server.position_update()
+    assert not _requests
+
+    # Showing the view requests the frame that draws the members
+    server.canvas.resize(1000, 1000)
+    server.canvas.show()
+    server.app.processEvents()
+    assert _requests
+    server.position_update()
+    _pixel = _handle.pixelVectors()[0].length()
+    assert _handle.data["visible"].all()
+    assert np.allclose(_handle.data["size"], 0.5 / _pixel)
+
+    # Resize with "data" pacing: a frame is requested and sizes follow
+    _requests.clear()
+    server.canvas.resize(500, 500)
+    server.app.processEvents()
+    assert _requests
+    server.position_update()
+    assert np.allclose(_handle.data["size"], 0.5 / _handle.pixelVectors()[0].length())
+    assert _handle.pixelVectors()[0].length() > _pixel
+
+    # Nothing changed: no more frames
+    server.app.processEvents()
+    _requests.clear()
+    server.position_update()
+    server.app.processEvents()
+    assert not _requests
+
+
+def test_positions_keep_style(projection_server):
+    server = projection_server()
+    server.canvas.show()
+    server.app.processEvents()
+    server.add_items([{"type": "tracked_item_group", "name": "g", "positions": [[0, 0], [1, 1]],
+                       "colors": [[255, 0, 0, 255], [0, 255, 0, 255]]}])
+    server.position_update()
+    _handle = server.all_plot_items["g"].handle
+    _brushes = list(_handle.data["brush"])
+
+    server.set_positions({"g": [[0.5, 0.5], [-1, -1]]})
+    server.position_update()
+    assert _handle.data["x"].tolist() == [0.5, -1] and _handle.data["y"].tolist() == [0.5, -1]
+    assert list(_handle.data["brush"]) == _brushes
+
+
+class _Receiver:
+    def __init__(self, name):
+        self.handlers = []
+        self.closed = False
+
+    def register_change_handler(self, userdata, callback, kind, sensor=None):
+        self.handlers.append((userdata, callback, kind))
+
+    def emit(self, kind, data):
+        for userdata, callback, _kind in self.handlers:
+            if _kind == kind:
+                callback(userdata, data)
+
+    def close(self):
+        self.closed = True
+
+
+def test_member_tracker_replaces_the_previous_one():
+    receivers = {}
+
+    def _open(name):
+        receivers[name] = _Receiver(name)
+        return receivers[name]
+
+    pool = Tracker_Pool(factory=_open)
+    group = tracked_item_group("g", [[0, 0], [0, 0]])
+
+    group.set_member_tracker(0, "a@host", sensor=1, tracker_pool=pool)
+    group.set_member_tracker(0, "b@host", sensor=1, tracker_pool=pool)
+    assert receivers["a@host"].closed
+    assert group.get_vicon_trackers() == [pool.acquire("b@host")]
+    pool.release(group.get_vicon_trackers()[0])
+
+    # Same tracker again: one subscription, one reference
+    group.set_member_tracker(0, "b@host", sensor=1, tracker_pool=pool)
+    _tracker = group.get_vicon_trackers()[0]
+    assert _tracker.ref_count == 1
+    receivers["b@host"].emit("position", {"sensor": 1, "position": [1.0, 2.0]})
+    assert group.position.tolist() == [[1, 2], [0, 0]]
+    assert group.position_version == 2
+
+    group.release_vicon_tracker()
+    assert receivers["b@host"].closed
@@ -0,0 +1,86 @@
+import json
+import os
+
+import pytest
+
+
+@pytest.mark.parametrize("filename", ["../escape.json", "/tmp/escape.json", "a/../../escape.json"])
+def test_dump_latency_stats_stays_in_output_directory(projection_server, tmp_path, filename):
+    server = projection_server(output_directory=str(tmp_path / "out"))
+    with pytest.raises(ValueError):
+        server.dump_latency_stats(filename)
+    assert not (tmp_path / "escape.json").exists()
+
+
+def test_dump_latency_stats(projection_server, tmp_path):
+    server = projection_server(output_directory=str(tmp_path / "out"))
+    assert server.dump_latency_stats("runs/latency.json")
+    with open(tmp_path / "out" / "runs" / "latency.json") as f:
+        json.load(f)
+
+
+def test_symlink_can_not_leave_output_directory(projection_server, tmp_path):
+    (tmp_path / "out").mkdir()
+    os.symlink(tmp_path, tmp_path / "out" / "link")
+    server = projection_server(output_directory=str(tmp_path / "out"))
+    with pytest.raises(ValueError):
+        server.dump_latency_stats("link/escape.json")
+
+
+def test_tracker_recording_stays_in_output_directory(projection_server, tmp_path):
+    server = projection_server(output_directory=str(tmp_path / "out"), max_record_capacity=1000)
+    (tmp_path / "keep.log").write_text("data")
+
+    with pytest.raises(ValueError):
+        server.start_tracker_recording("../keep.log", capacity=10)
+    assert (tmp_path / "keep.log").read_text() == "data"
+
+    with pytest.raises(ValueError):
+        server.start_tracker_recording("big.log", capacity=10**9)
+    assert not (tmp_path / "out" / "big.log").exists()
+
+    assert server.start_tracker_recording("trackers.log", capacity=10)
+    assert server.stop_tracker_recording()["filename"] == str(tmp_path / "out" / "trackers.log")
+
+
+def test_grab_frame_stays_in_output_directory(projection_server, tmp_path):
+    server = projection_server(output_directory=str(tmp_path / "out"))
+
+    with pytest.raises(ValueError):
+        server.grab_frame(str(tmp_path / "frame.png"))
+    assert not (tmp_path / "frame.png").exists()
+
+    assert server.grab_frame("frames/frame.png")
+    assert (tmp_path / "out" / "frames" / "frame.png").exists()
+
+
+def _image(path):
+    from PyQt6 import QtGui
+    _image = QtGui.QImage(4, 4, QtGui.QImage.Format.Format_RGB32)
+    _image.fill(0xff0000)
+    assert _image.save(str(path))
+
+
+@pytest.mark.parametrize("filename", ["../secret.png", "a/../../secret.png", "SECRET"])
+def test_image_files_stay_in_image_directory(projection_server, tmp_path, filename):
+    (tmp_path / "images").mkdir()
+    _image(tmp_path / "secret.png")
+    os.symlink(tmp_path / "secret.png", tmp_path / "images" / "link.png")
+    server = projection_server(image_directory=str(tmp_path / "images"))
+    filename = filename.replace("SECRET", str(tmp_path / "secret.png"))
+
+    for _file in (filename, "link.png"):
+        with pytest.raises(ValueError):
+            server.add_items([{"type": "image_item", "name": "spot", "image_file": _file,
+                               "position": [0, 0], "width": 1, "height": 1}])
+    assert "spot" not in server.all_plot_items
+
+
+def test_image_file(projection_server, tmp_path):
+    (tmp_path / "images" / "spots").mkdir(parents=True)
+    _image(tmp_path / "images" / "spots" / "red.png")
+    server = projection_server(image_directory=str(tmp_path / "images"))
+
+    server.add_items([{"type": "image_item", "name": "spot", "image_file": "spots/red.png",
+                       "position": [0, 0], "width": 1, "height": 1}])
+    assert "spot" in server.all_plot_items
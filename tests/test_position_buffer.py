@@ -0,0 +1,110 @@
+import sys
+from threading import Event, Thread
+
+import numpy as np
+import pytest
+
+from vicon_projector_server.position_buffer import Position_Buffer, Shared_Position_Buffer
+
+
+def test_allocate_reuses_lowest_free_slots():
+    buffer = Position_Buffer(capacity=6)
+    a, b, c = buffer.allocate(2), buffer.allocate(3), buffer.allocate(1)
+    assert (a.tolist(), b.tolist(), c.tolist(), buffer.count) == ([0, 1], [2, 3, 4], [5], 6)
+    with pytest.raises(MemoryError):
+        buffer.allocate(1)
+
+    buffer.free(a)
+    buffer.free(a)                  # Freeing twice is harmless
+    assert buffer.count == 6
+    assert buffer.allocate(1).tolist() == [0]
+
+    # Count shrinks to the highest slot in use
+    buffer.free(c)
+    buffer.free(b)
+    assert buffer.count == 1
+    assert buffer.allocate(3).tolist() == [1, 2, 3]
+    assert buffer.count == 4
+
+
+def test_snapshot_is_consistent_under_concurrent_writes():
+    buffer = Position_Buffer(capacity=64)
+    slots = buffer.allocate(64)
+    stop = Event()
+
+    def writer():
+        value = 0.0
+        while not stop.is_set():
+            value += 1.0
+            # Every field of a slot holds the same value in a consistent state
+            buffer.write_positions(slots[::2], np.full((32, 2), value), value)
+            buffer.write_position(int(slots[1]), value, value, value)
+            buffer.write_velocity(int(slots[3]), value, value)
+
+    _interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    _thread = Thread(target=writer)
+    _thread.start()
+    try:
+        _previous = np.zeros(64, dtype=np.uint64)
+        for _ in range(2000):
+            snapshot = buffer.snapshot()
+            assert np.all(snapshot.sequence % 2 == 0)
+            assert np.all(snapshot.sequence >= _previous)
+            assert np.array_equal(snapshot.position[:, 0], snapshot.position[:, 1])
+            assert np.array_equal(snapshot.position[::2, 0], snapshot.timestamp[::2])
+            assert snapshot.position[1, 0] == snapshot.timestamp[1]
+            assert snapshot.velocity[3, 0] == snapshot.velocity[3, 1]
+            _previous = snapshot.sequence.copy()
+    finally:
+        stop.set()
+        _thread.join()
+        sys.setswitchinterval(_interval)
+    assert _previous.max() > 0
+
+
+def test_snapshot_covers_slots_in_use():
+    buffer = Position_Buffer(capacity=8)
+    slots = buffer.allocate(3)
+    buffer.write_position(int(slots[2]), 1.0, 2.0, 10.0)
+    snapshot = buffer.snapshot()
+    assert len(snapshot.sequence) == 3
+    assert snapshot.position[2].tolist() == [1.0, 2.0]
+    assert snapshot.sequence.tolist() == [0, 0, 2]
+
+
+def test_snapshot_version_tracks_each_slot():
+    from vicon_projector_server.Projection_Item.item_group import tracked_item_group
+
+    buffer = Position_Buffer(capacity=4)
+    group = tracked_item_group("g", [[0, 0], [1, 1]])
+    group.attach_position_buffer(buffer)
+    _rendered = group.snapshot_version(buffer.snapshot())
+
+    # Different sequences per slot, same sum
+    buffer.write_positions(group.slots[:1], [[2, 2]])
+    buffer.sequence[group.slots[1]] -= 2
+    assert int(buffer.sequence[group.slots].sum()) == 4
+    assert group.snapshot_version(buffer.snapshot()) != _rendered
+
+    single = tracked_item_group("s", [[0, 0]])
+    single.attach_position_buffer(buffer)
+    _rendered = single.snapshot_version(buffer.snapshot())
+    buffer.write_positions(single.slots, [[1, 1]])
+    assert single.snapshot_version(buffer.snapshot()) != _rendered
+    assert single.is_dirty
+
+
+def test_shared_buffer_is_visible_to_attached_buffers():
+    owner = Shared_Position_Buffer(capacity=4)
+    attached = Shared_Position_Buffer(capacity=4, name=owner.name)
+    try:
+        slots = owner.allocate(2)
+        attached.write_positions(slots, [[1.0, 2.0], [3.0, 4.0]], 5.0)
+        snapshot = owner.snapshot()
+        assert snapshot.position.tolist() == [[1.0, 2.0], [3.0, 4.0]]
+        assert snapshot.timestamp.tolist() == [5.0, 5.0]
+        assert snapshot.sequence.tolist() == [2, 2]
+    finally:
+        attached.close()
+        owner.close()
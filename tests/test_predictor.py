@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from vicon_projector_server.position_buffer import Position_Snapshot
+from vicon_projector_server.predictor import Position_Predictor
+
+
+def _predict(predictor, age):
+    _snapshot = Position_Snapshot(1)
+    _snapshot.resize(1)
+    _snapshot.velocity[0] = (1.0, 0.0)
+    _snapshot.timestamp[0] = 100.0
+    _snapshot.sequence[0] = 2
+    predictor.predict(_snapshot, 100.0 + age)
+    return float(_snapshot.position[0, 0]), int(_snapshot.sequence[0])
+
+
+def test_moving_slots_redraw_until_max_horizon():
+    predictor = Position_Predictor(1, max_horizon=0.1)
+    predictor.configure([0], "constant_velocity")
+
+    _first = _predict(predictor, 0.02)
+    _second = _predict(predictor, 0.04)
+    assert _first[0] < _second[0]
+    assert _first[1] != _second[1] != 2
+
+    # Stale sample: prediction is frozen, the buffer sequence is kept
+    assert _predict(predictor, 0.5) == (0.1, 2)
+    assert _predict(predictor, 0.6) == (0.1, 2)
+
+
+def test_unknown_mode_leaves_the_item_unchanged(projection_server):
+    server = projection_server()
+    server.add_items([{"type": "tracked_item_group", "name": "g", "positions": [[0, 0]]}])
+    server.set_prediction("g", "alpha_beta")
+
+    with pytest.raises(ValueError):
+        server.set_prediction("g", "bogus")
+    assert server.all_plot_items["g"].prediction["mode"] == "alpha_beta"
+    assert server.predictor.mode[server.all_plot_items["g"].slots].tolist() == [Position_Predictor.MODES["alpha_beta"]]
@@ -0,0 +1,62 @@
+import json
+
+import pytest
+from werkzeug.test import Client
+
+from vicon_projector_server.rpc_server import JSON_RPC_Server
+
+
+@pytest.fixture
+def rpc(projection_server):
+    return JSON_RPC_Server(projection_server(), "localhost", 0)
+
+
+def _call(method, id=None, **params):
+    _request = {"jsonrpc": "2.0", "method": method, "params": params}
+    if id is not None:
+        _request["id"] = id
+    return _request
+
+
+def test_mixed_batch_with_an_invalid_entry(rpc):
+    _response = json.loads(rpc.handle(json.dumps([
+        _call("test_connection", 1),
+        {"id": 2, "params": []},                    # No method
+        _call("no_such_method", 3),
+        _call("remove_item", 4, name="missing"),
+        5,
+        _call("test_connection"),                   # Notification
+    ])))
+
+    assert [r.get("id") for r in _response] == [1, None, 3, 4, None]
+    assert "result" in _response[0]
+    assert _response[1]["error"]["code"] == -32600
+    assert _response[2]["error"]["code"] == -32601
+    assert _response[3]["error"]["data"]["type"] == "NameError"
+    assert _response[4]["error"]["code"] == -32600
+
+
+def test_empty_batch_is_an_error(rpc):
+    _response = json.loads(rpc.handle("[]"))
+    assert _response["error"]["code"] == -32600
+    assert _response["id"] is None
+
+
+def test_notifications_get_no_response(rpc):
+    assert rpc.handle(json.dumps(_call("test_connection"))) is None
+    assert rpc.handle(json.dumps([_call("test_connection"), _call("hide_items", names=[])])) is None
+
+    _response = json.loads(rpc.handle(json.dumps([_call("test_connection"), _call("test_connection", 7)])))
+    assert [r["id"] for r in _response] == [7]
+
+
+def test_parse_error(rpc):
+    assert json.loads(rpc.handle(b"{bad"))["error"]["code"] == -32700
+
+
+def test_http_application(rpc):
+    client = Client(rpc.application)
+    assert client.post("/", data=json.dumps(_call("test_connection"))).status_code == 204
+    _response = client.post("/", data=json.dumps(_call("test_connection", 1)))
+    assert _response.status_code == 200
+    assert json.loads(_response.data)["id"] == 1
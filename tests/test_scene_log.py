@@ -0,0 +1,60 @@
+from vicon_projector_server.scene_log import Scene_Change_Log
+
+
+def _marker(name):
+    return {"type": "tracked_item_group", "name": name, "positions": [[0, 0]]}
+
+
+def test_changes_since_in_version_order():
+    log = Scene_Change_Log()
+    log.record("add", "a")
+    _moves = log.next_version()
+    log.record_move("a", _moves)
+    log.record("hide", "a", visible=False)
+    log.record("add", "b")
+
+    _changes, _moved = log.changes_since(1)
+    assert [(c["version"], c["op"], c["name"]) for c in _changes] == [(3, "hide", "a"), (4, "add", "b")]
+    assert _moved == ["a"]
+    assert log.changes_since(2) == (_changes, [])
+    assert log.changes_since(4) == ([], [])
+
+
+def test_truncation_boundary():
+    log = Scene_Change_Log(max_changes=3)
+    for name in "abcde":
+        log.record("add", name)
+
+    # Versions 1 and 2 were dropped: a client at 2 still gets every later change, older ones resync
+    assert not log.is_available(1)
+    assert log.is_available(2)
+    assert [c["version"] for c in log.changes_since(2)[0]] == [3, 4, 5]
+    assert not log.is_available(6)
+
+
+def test_bulk_calls_are_logged(projection_server):
+    server = projection_server()
+    _start = server.get_scene_changes()["version"]
+    server.add_items([_marker("a"), _marker("b")])
+    server.hide_items(["a"])
+    server.set_z_values({"b": 3})
+    server.remove_items(["a"])
+
+    _result = server.get_scene_changes(_start)
+    assert not _result["full"]
+    assert [(c["op"], c["name"]) for c in _result["changes"]] == [
+        ("add", "a"), ("add", "b"), ("hide", "a"), ("z", "b"), ("remove", "a")]
+    assert _result["changes"][2]["visible"] is False
+    assert _result["changes"][3]["z"] == 3
+    assert [c["version"] for c in _result["changes"]] == sorted(c["version"] for c in _result["changes"])
+    assert server.get_scene_changes(_result["version"])["changes"] == []
+
+
+def test_old_versions_get_a_full_snapshot(projection_server):
+    server = projection_server(scene_log_size=2)
+    server.add_items([_marker("a"), _marker("b"), _marker("c")])
+
+    _result = server.get_scene_changes(0)
+    assert _result["full"]
+    assert sorted(_result["items"]) == ["a", "b", "c"]
+    assert not server.get_scene_changes(1)["full"]
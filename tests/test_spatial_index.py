@@ -0,0 +1,100 @@
+import numpy as np
+from PyQt6 import QtCore
+
+from vicon_projector_server.position_buffer import Position_Buffer
+from vicon_projector_server.spatial_index import Spatial_Index
+
+
+def _scene(count=300, seed=0):
+    rng = np.random.default_rng(seed)
+    buffer = Position_Buffer(capacity=count)
+    index = Spatial_Index((0, 10, 0, 10), count, cell_size=1.0)
+
+    # Random points, points on cell borders and points outside the canvas
+    positions = np.concatenate([rng.uniform(-2, 12, (count - 60, 2)),
+                                rng.integers(0, 11, (40, 2)).astype(float),
+                                rng.uniform(-50, 60, (20, 2))])
+    slots = buffer.allocate(count)
+    buffer.write_positions(slots, positions)
+    for i in range(0, count, 3):
+        index.register(f"item{i}", slots[i:i + 3])
+    index.update(buffer.snapshot())
+    return rng, buffer, index
+
+
+def _brute_rect(index, xmin, xmax, ymin, ymax):
+    _slots = index.active_slots()
+    _p = index.position[_slots]
+    return sorted(_slots[(_p[:, 0] >= xmin) & (_p[:, 0] <= xmax) & (_p[:, 1] >= ymin) & (_p[:, 1] <= ymax)].tolist())
+
+
+def _brute_distance(index, x, y):
+    _slots = index.active_slots()
+    return _slots, np.hypot(index.position[_slots, 0] - x, index.position[_slots, 1] - y)
+
+
+def _check(index, rng):
+    # Rectangles with edges on cell borders, inside cells, across the whole canvas and outside it
+    rects = [(2, 5, 3, 7), (2.5, 2.7, 3.1, 3.4), (-100, 100, -100, 100), (-30, -1, 11, 40), (4, 4, 6, 6)]
+    rects += [tuple(np.sort(rng.uniform(-5, 15, 2)).tolist() + np.sort(rng.uniform(-5, 15, 2)).tolist()) for _ in range(30)]
+    for rect in rects:
+        assert sorted(index.query_rect(*rect).tolist()) == _brute_rect(index, *rect)
+
+    for x, y, radius in [(5, 5, 1.0), (3, 3, 0.0), (0, 0, 2.5), (-20, 5, 30), (5, 5, -1)] + [(*rng.uniform(-5, 15, 2), rng.uniform(0, 5)) for _ in range(30)]:
+        _slots, _distance = index.query_radius(x, y, radius)
+        _all, _all_distance = _brute_distance(index, x, y)
+        assert sorted(_slots.tolist()) == sorted(_all[_all_distance <= radius].tolist())
+        assert np.all(np.diff(_distance) >= 0)
+
+    for x, y, k in [(5, 5, 1), (0.5, 9.5, 7), (40, 40, 3)] + [(*rng.uniform(-5, 15, 2), int(rng.integers(1, 20))) for _ in range(30)]:
+        _slots, _distance = index.query_nearest(x, y, k)
+        _, _all_distance = _brute_distance(index, x, y)
+        assert np.allclose(_distance, np.sort(_all_distance)[:k])
+        assert np.allclose(_distance, np.hypot(index.position[_slots, 0] - x, index.position[_slots, 1] - y))
+
+
+def test_queries_match_brute_force():
+    rng, _, index = _scene()
+    _check(index, rng)
+
+
+def test_queries_after_moves_and_removals():
+    rng, buffer, index = _scene(seed=1)
+    _slots = np.arange(buffer.count)
+
+    # Move a third of the points, some into other cells and off the canvas
+    _moved = rng.choice(_slots, len(_slots) // 3, replace=False)
+    buffer.write_positions(_moved, rng.uniform(-3, 13, (len(_moved), 2)))
+    assert index.update(buffer.snapshot()) == len(_moved)
+    assert np.array_equal(index.position[_moved], buffer.position[_moved])
+    _check(index, rng)
+
+    # Removed items are never returned
+    _removed = np.concatenate([_slots[0:3], _slots[30:33]])
+    index.unregister(_removed)
+    assert not set(index.query_rect(-100, 100, -100, 100).tolist()) & set(_removed.tolist())
+    _check(index, rng)
+
+    # Slots reused by a new item are indexed at their new position
+    buffer.free(_removed[:3])
+    _reused = buffer.allocate(3)
+    buffer.write_positions(_reused, [[5.5, 5.5]] * 3)
+    index.register("new", _reused)
+    index.update(buffer.snapshot())
+    assert set(_reused.tolist()) <= set(index.query_rect(5, 6, 5, 6).tolist())
+    _check(index, rng)
+
+
+def test_culling_of_items_spanning_the_canvas_border():
+    index = Spatial_Index((0, 10, 0, 10), 1, cell_size=1.0)
+    index.register("a", np.array([0]))
+
+    # Drawn half outside: 2 wide, centred on the left edge
+    index.set_drawn(0, np.array([0.0, 5.0]), QtCore.QRectF(-1.0, 4.0, 2.0, 2.0))
+    assert not index.is_culled(0, np.array([-0.5, 5.0]))
+
+    # Drawn fully outside and staying outside
+    index.set_drawn(0, np.array([-5.0, 5.0]), QtCore.QRectF(-6.0, 4.0, 2.0, 2.0))
+    assert index.is_culled(0, np.array([-3.0, 5.0]))
+    # Moving back across the border
+    assert not index.is_culled(0, np.array([-0.5, 5.0]))
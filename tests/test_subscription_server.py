@@ -0,0 +1,109 @@
+import asyncio
+import json
+import socket
+import time
+from threading import Thread
+
+from vicon_projector_server.subscription_server import Subscription_Server, _Subscriber
+
+
+class _Writer:
+    ''' Stands in for an asyncio StreamWriter. ``pending`` is the socket buffer fill.
+    '''
+    def __init__(self):
+        self.lines = []
+        self.pending = 0
+        self.transport = self
+
+    def get_write_buffer_size(self) -> int:
+        return self.pending
+
+    def write(self, data: bytes) -> None:
+        self.lines.append(json.loads(data))
+
+
+def _item(x, timestamp, visible=True):
+    return {"position": [x, 0.0], "visible": visible, "timestamp": timestamp}
+
+
+def _run(scenario):
+    server = Subscription_Server(high_water=1000)
+    writer = _Writer()
+
+    async def main():
+        server.loop = asyncio.get_running_loop()
+        subscriber = _Subscriber(writer, 1000.0)
+        subscriber.all_items = True
+        server._subscribers.add(subscriber)
+        sender = asyncio.ensure_future(server._send_updates(subscriber))
+        try:
+            await scenario(server, subscriber, writer)
+        finally:
+            sender.cancel()
+    asyncio.run(main())
+
+
+def test_updates_are_delta_encoded():
+    async def scenario(server, subscriber, writer):
+        server._on_publish({"a": _item(0.0, 1.0), "b": _item(5.0, 1.0)}, 1.0)
+        await asyncio.sleep(0.01)
+        server._on_publish({"a": _item(1.0, 2.0), "b": _item(5.0, 1.0)}, 2.0)
+        await asyncio.sleep(0.01)
+        server._on_publish({"a": _item(1.0, 2.0), "b": _item(5.0, 1.0)}, 3.0)
+        await asyncio.sleep(0.01)
+        server._on_publish({"b": _item(5.0, 1.0, visible=False)}, 4.0)
+        await asyncio.sleep(0.01)
+
+        assert writer.lines == [
+            {"time": 1.0, "items": {"a": _item(0.0, 1.0), "b": _item(5.0, 1.0)}},
+            # Changed fields only. Nothing sent for the unchanged state at t=3
+            {"time": 2.0, "items": {"a": {"position": [1.0, 0.0], "timestamp": 2.0}}},
+            {"time": 4.0, "items": {"b": {"visible": False}}, "removed": ["a"]},
+        ]
+    _run(scenario)
+
+
+def test_slow_client_gets_the_latest_state_after_drops():
+    async def scenario(server, subscriber, writer):
+        server._on_publish({"a": _item(0.0, 1.0), "b": _item(5.0, 1.0)}, 1.0)
+        await asyncio.sleep(0.01)
+
+        # Socket buffer above high water: intermediate states are dropped, nothing is written
+        writer.pending = 10**6
+        for x in (1.0, 2.0, 3.0):
+            server._on_publish({"a": _item(x, x + 1)}, x + 1)
+            await asyncio.sleep(0.01)
+        assert len(writer.lines) == 1
+        assert subscriber.dropped >= 1
+        assert server.get_stats()["subscribers"][0]["dropped"] == subscriber.dropped
+
+        # Drained: one update resyncs every change that was missed
+        writer.pending = 0
+        await asyncio.sleep(0.02)
+        assert writer.lines[1:] == [{"time": 4.0, "items": {"a": {"position": [3.0, 0.0], "timestamp": 4.0}}, "removed": ["b"]}]
+        assert subscriber.sent == {"a": _item(3.0, 4.0)}
+    _run(scenario)
+
+
+def test_subscribe_over_tcp():
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        port = s.getsockname()[1]
+    server = Subscription_Server(port=port)
+    Thread(target=server.run, daemon=True).start()
+    assert server.started.wait(5)
+
+    with socket.create_connection(("localhost", port), timeout=5) as client:
+        client.sendall(b'{"subscribe": ["a"], "rate_hz": 100}\n')
+        stream = client.makefile("rb")
+        for _ in range(500):
+            if server.wants("a"):
+                break
+            time.sleep(0.01)
+        assert not server.wants("b")
+
+        server.publish({"a": _item(1.0, 1.0)}, 1.0)
+        assert json.loads(stream.readline()) == {"time": 1.0, "items": {"a": _item(1.0, 1.0)}}
+
+        client.sendall(b'{"rate_hz": -1}\n')
+        assert "error" in json.loads(stream.readline())
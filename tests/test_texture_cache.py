@@ -0,0 +1,38 @@
+import numpy as np
+import pyqtgraph as pg
+
+from vicon_projector_server import texture_cache
+from vicon_projector_server.texture_cache import Texture_Cache
+
+
+def test_same_pixels_share_a_texture_across_dtypes():
+    pg.mkQApp()
+    cache = Texture_Cache()
+    image = np.random.default_rng(0).integers(0, 256, (16, 8, 3), dtype=np.uint8)
+    opaque = np.concatenate([image, np.full((16, 8, 1), 255, dtype=np.uint8)], axis=2)
+
+    texture = cache.get(image)
+    assert cache.get(image.astype(np.int64)) is texture        # JSON lists
+    assert cache.get(opaque) is texture     # RGBA, opaque
+    assert cache.get(image.transpose(1, 0, 2).copy()) is not texture
+    assert cache.get_stats()["misses"] == 2
+
+
+def test_repeated_get_does_not_convert_again(monkeypatch):
+    pg.mkQApp()
+    cache = Texture_Cache()
+    conversions = []
+    _normalize = texture_cache.normalize_image
+    monkeypatch.setattr(texture_cache, "normalize_image", lambda *args, **kwargs: conversions.append(1) or _normalize(*args, **kwargs))
+
+    image = np.random.default_rng(0).integers(0, 256, (16, 8, 4), dtype=np.uint8)
+    texture = cache.get(image)
+    assert cache.get(image.copy()) is texture
+    assert cache.get(np.asfortranarray(image)) is texture
+    assert len(conversions) == 1
+    assert cache.get_stats()["hits"] == 2
+
+    # Evicted, then converted again
+    cache.clear()
+    assert cache.get(image).key == texture.key
+    assert len(conversions) == 2
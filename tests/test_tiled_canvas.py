@@ -0,0 +1,74 @@
+import pytest
+from PyQt6 import QtCore
+
+# Two projectors side by side, overlapping on x in [-0.5, 0.5]
+TILES = [{"x": [-2, 0.5], "y": [-2, 2]}, {"x": [-0.5, 2], "y": [-2, 2]}]
+RESOLUTION = [250, 400]
+
+
+def _marker(name, position):
+    return {"type": "tracked_item_group", "name": name, "positions": [list(position)]}
+
+
+def _tiled_server(projection_server, **config):
+    return projection_server(tiles=TILES, resolution=RESOLUTION, **config)
+
+
+def test_tiles_share_one_scene(projection_server):
+    server = _tiled_server(projection_server)
+    tiles = server.canvas.tiles
+    assert len(tiles) == 2
+    assert tiles[0].scene() is tiles[1].scene()
+
+    server.add_items([_marker("left", (-1.5, 0)), _marker("right", (1.5, 0)), _marker("both", (0, 0))])
+    server.position_update()
+    assert [tile["items"] for tile in server.get_canvas_tiles()] == [2, 2]
+
+    server.remove_items(["both"])
+    assert [tile["items"] for tile in server.get_canvas_tiles()] == [1, 1]
+
+
+def test_default_blends_are_the_overlaps(projection_server):
+    server = _tiled_server(projection_server)
+    tiles = server.get_canvas_tiles()
+    assert [(tile["x"], tile["y"]) for tile in tiles] == [([-2, 0.5], [-2, 2]), ([-0.5, 2], [-2, 2])]
+    assert [tile["blend"] for tile in tiles] == [[0, 1, 0, 0], [1, 0, 0, 0]]
+
+
+def test_configured_blend_is_used(projection_server):
+    tiles = [dict(TILES[0], blend=[0, 0.5, 0, 0]), TILES[1]]
+    server = projection_server(tiles=tiles, resolution=RESOLUTION)
+    assert [tile["blend"] for tile in server.get_canvas_tiles()] == [[0, 0.5, 0, 0], [1, 0, 0, 0]]
+
+
+def test_blended_light_adds_up_to_one(projection_server):
+    server = _tiled_server(projection_server, blend_gamma=2.2)
+    server.canvas.set_background(color=(255, 255, 255))
+    tiles = server.canvas.tiles
+    frames = [tile.grab().toImage() for tile in tiles]
+
+    def light(index, x):
+        _pixel = tiles[index].mapFromScene(QtCore.QPointF(x, 0))
+        return (frames[index].pixelColor(_pixel).red() / 255) ** 2.2
+
+    # Outside the overlap each projector is at full light
+    assert light(0, -1.5) == pytest.approx(1.0)
+    assert light(1, 1.5) == pytest.approx(1.0)
+
+    for _x in (-0.4, -0.2, 0.0, 0.2, 0.4):
+        assert light(0, _x) + light(1, _x) == pytest.approx(1.0, abs=0.05)
+
+
+def test_grab_frame_of_each_tile(projection_server, tmp_path):
+    server = _tiled_server(projection_server, output_directory=str(tmp_path))
+    assert server.grab_frame("left.png", tile=0)
+    assert server.grab_frame("right.png", tile=1)
+    assert (tmp_path / "right.png").exists()
+
+    with pytest.raises(IndexError):
+        server.grab_frame("none.png", tile=2)
+
+
+def test_tiles_need_the_fixed_backend(projection_server):
+    with pytest.raises(ValueError):
+        _tiled_server(projection_server, canvas_backend="plot")
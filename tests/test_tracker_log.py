@@ -0,0 +1,59 @@
+import time
+
+import numpy as np
+import pytest
+
+from vicon_projector_server.tracker_log import Tracker_Recorder, Tracker_Replayer
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    ''' 100 position samples of one tracker, 1 ms apart.
+    '''
+    _filename = str(tmp_path / "trackers.log")
+    _recorder = Tracker_Recorder(_filename, capacity=1000)
+    for _i in range(100):
+        _recorder.record("body@sim", "position", {"sensor": 0, "position": (_i, 0, 0), "time": float(_i)})
+        time.sleep(0.001)
+    _recorder.close()
+    return _filename
+
+
+def _replay(replayer, calls, delay=0.0) -> list:
+    _source = replayer.create_source("body@sim")
+    _delivered = []
+    _source.register_change_handler(None, lambda _, data: _delivered[-1].append(data["position"][0]), "position")
+    for _ in range(calls):
+        _delivered.append([])
+        _source.mainloop()
+        time.sleep(delay)
+    return _delivered
+
+
+def test_loop_restarts_on_the_replay_clock(log_file):
+    _replayer = Tracker_Replayer(log_file, speed=1.0, loop=True)
+    _delivered = _replay(_replayer, 400, delay=0.001)
+
+    # Never the whole log in one call after a restart
+    assert max(len(batch) for batch in _delivered) < 50
+    _values = [value for batch in _delivered for value in batch]
+    assert _values.count(0) >= 2
+
+
+@pytest.mark.parametrize("speed", [0, None])
+def test_loop_as_fast_as_possible(log_file, speed):
+    _replayer = Tracker_Replayer(log_file, speed=speed, batch=30, loop=True)
+    _delivered = _replay(_replayer, 10)
+
+    _values = [value for batch in _delivered for value in batch]
+    assert max(len(batch) for batch in _delivered) <= 30
+    assert _values[:100] == list(range(100))
+    assert _values[100:130] == list(range(30))
+
+
+def test_no_loop_stops(log_file):
+    _replayer = Tracker_Replayer(log_file, speed=0, batch=1000)
+    _delivered = _replay(_replayer, 3)
+
+    assert [len(batch) for batch in _delivered] == [100, 0, 0]
+    assert _replayer.finished
@@ -0,0 +1,90 @@
+from vicon_projector_server.tracker_pool import Tracker_Pool
+
+
+class _Receiver:
+    def __init__(self, name):
+        self.name = name
+        self.handlers = []
+        self.closed = False
+
+    def register_change_handler(self, userdata, callback, kind, sensor=None):
+        self.handlers.append((userdata, callback, kind))
+
+    def emit(self, kind, data):
+        for userdata, callback, _kind in self.handlers:
+            if _kind == kind:
+                callback(userdata, data)
+
+    def mainloop(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class _Recorder:
+    def __init__(self):
+        self.samples = []
+
+    def record(self, tracker_name, kind, data):
+        self.samples.append((tracker_name, kind, data["sensor"]))
+
+
+def test_one_connection_per_tracker_name():
+    created = []
+    pool = Tracker_Pool(factory=lambda name: created.append(_Receiver(name)) or created[-1])
+
+    a = pool.acquire("body@host")
+    assert pool.acquire("body@host") is a
+    b = pool.acquire("other@host")
+    assert [r.name for r in created] == ["body@host", "other@host"]
+    assert a.ref_count == 2
+    assert sorted(pool.get_tracker_names()) == ["body@host", "other@host"]
+
+    # Closed with the last reference, opened again on the next acquire
+    assert not pool.release(a)
+    assert pool.release(a)
+    assert created[0].closed and a.receiver is None
+    a.mainloop()
+    assert pool.get_tracker_names() == ["other@host"]
+    assert pool.acquire("body@host") is not a
+    assert len(created) == 3
+    assert pool.release(b)
+
+
+def test_dispatch_by_sensor_and_unregister():
+    pool = Tracker_Pool(factory=_Receiver)
+    tracker = pool.acquire("body@host")
+    received = []
+    callback = lambda userdata, data: received.append((userdata, data["sensor"]))
+
+    tracker.register_change_handler("zero", callback, "position", 0)
+    tracker.register_change_handler("one", callback, "position", 1)
+    tracker.register_change_handler("all", callback, "position")
+    # One receiver handler per kind, whatever the number of subscribers
+    assert len(tracker.receiver.handlers) == 1
+
+    tracker.receiver.emit("position", {"sensor": 1})
+    assert received == [("one", 1), ("all", 1)]
+
+    received.clear()
+    tracker.unregister_change_handler("one", callback, "position", 1)
+    tracker.receiver.emit("position", {"sensor": 1})
+    tracker.receiver.emit("position", {"sensor": 0})
+    assert received == [("all", 1), ("zero", 0), ("all", 0)]
+
+
+def test_recorder_sees_every_sample():
+    pool = Tracker_Pool(factory=_Receiver)
+    first = pool.acquire("a@host")
+    recorder = _Recorder()
+    pool.set_recorder(recorder)
+    second = pool.acquire("b@host")
+    for tracker in (first, second):
+        tracker.register_change_handler(None, lambda userdata, data: None, "position")
+
+    first.receiver.emit("position", {"sensor": 3})
+    second.receiver.emit("position", {"sensor": 4})
+    pool.set_recorder(None)
+    first.receiver.emit("position", {"sensor": 5})
+    assert recorder.samples == [("a@host", "position", 3), ("b@host", "position", 4)]
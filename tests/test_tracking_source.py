@@ -0,0 +1,120 @@
+import select
+import time
+
+import numpy as np
+import pytest
+
+from vicon_projector_server.tracking_source import Simulated_Source, create_source
+
+
+def _collect(source, kind="position", sensor=None):
+    samples = []
+    source.register_change_handler(None, lambda userdata, data: samples.append(data), kind, sensor)
+    return samples
+
+
+def test_from_url():
+    source = create_source("sim://random_walk?bodies=3&rate_hz=200&center=1,2&speed=0.5&seed=4")
+    assert isinstance(source, Simulated_Source)
+    assert (source.trajectory, source.bodies, source.rate_hz, source.speed) == ("random_walk", 3, 200.0, 0.5)
+    assert source.center.tolist() == [1.0, 2.0]
+    with pytest.raises(ValueError):
+        Simulated_Source(trajectory="spiral")
+
+
+def test_circle_delivers_due_samples():
+    source = Simulated_Source(bodies=4, rate_hz=100, center=(1, 2), radius=0.5, speed=2.0)
+    positions = _collect(source)
+    velocities = _collect(source, "velocity", sensor=2)
+
+    # Samples due since the start, one per body per tick
+    source._start = time.time() - 0.1
+    source.mainloop()
+    _ticks = len(positions) // 4
+    assert 10 <= _ticks <= 11
+    assert source.samples == len(positions)
+
+    _xy = np.array([p["position"][:2] for p in positions])
+    assert np.allclose(np.hypot(_xy[:, 0] - 1, _xy[:, 1] - 2), 0.5)
+    assert [p["sensor"] for p in positions[:4]] == [0, 1, 2, 3]
+
+    # Velocity of one sensor only: tangential, radius*speed
+    assert {v["sensor"] for v in velocities} == {2} and len(velocities) == _ticks
+    assert np.allclose([np.hypot(*v["velocity"][:2]) for v in velocities], 1.0)
+
+    # Nothing new is due
+    positions.clear()
+    source._start = source._start + 1.0
+    source.mainloop()
+    assert not positions
+
+
+def test_backlog_is_bounded():
+    source = Simulated_Source(rate_hz=1000, max_catch_up=0.05)
+    positions = _collect(source)
+    source._start = time.time() - 1.0
+    source.mainloop()
+    assert len(positions) <= 0.05*1000 + 2
+    assert positions[-1]["time"] == pytest.approx(time.time(), abs=0.01)
+
+
+def test_dropout_and_bounded_random_walk():
+    source = Simulated_Source(bodies=10, rate_hz=1000, trajectory="random_walk", speed=5.0,
+                            bounds=(0, 1, 0, 1), center=(0.5, 0.5), dropout=0.5, seed=1)
+    positions = _collect(source)
+    source._start = time.time() - 0.2
+    source.mainloop()
+    assert source.samples == 2000
+    assert source.dropped == source.samples - len(positions)
+    assert 0.4 < source.dropped / source.samples < 0.6
+    _xy = np.array([p["position"][:2] for p in positions])
+    assert np.all((_xy >= 0) & (_xy <= 1))
+
+
+def test_replay_file(tmp_path):
+    _file = tmp_path / "path.npy"
+    np.save(_file, np.array([[0.0, 0.0], [1.0, 0.0], [2.0, 0.0]]))
+    source = create_source(f"sim://replay//{_file}?bodies=2&rate_hz=100")
+    positions = _collect(source, sensor=1)
+    source._start = time.time() - 0.065
+    source.mainloop()
+    # Looped, same path for every body
+    assert [p["position"][0] for p in positions[:6]] == [1.0, 2.0, 0.0, 1.0, 2.0, 0.0]
+
+
+def test_pollable_source_wakes_select():
+    source = Simulated_Source(rate_hz=200, pollable=True)
+    try:
+        positions = _collect(source)
+        ready, _, _ = select.select([source.fileno()], [], [], 1.0)
+        assert ready
+        source.mainloop()
+        assert positions
+    finally:
+        source.close()
+    assert source.fileno() is None
+
+
+class _Closing_Socket:
+    ''' Socket whose first recv closes the source (close() on another thread).
+    '''
+    def __init__(self, source):
+        self.source = source
+        self.closed = False
+
+    def recv(self, size):
+        if self.closed:
+            raise OSError("Bad file descriptor")
+        self.source.close()
+        return b"\0"
+
+    def close(self):
+        self.closed = True
+
+
+def test_close_during_mainloop():
+    source = Simulated_Source(rate_hz=200)
+    source._rx = _Closing_Socket(source)
+    source._tx = _Closing_Socket(source)
+    source.mainloop()
+    assert source.fileno() is None
@@ -0,0 +1,28 @@
+def _alpha(server, name="g"):
+    return int(server.all_plot_items[name].colors[0, 3])
+
+
+def test_overlapping_opacity_triggers(projection_server):
+    server = projection_server()
+    server.add_items([{"type": "tracked_item_group", "name": "g", "positions": [[0, 0]]}])
+    server.position_update()
+    _original = _alpha(server)
+
+    server.add_rect_zone("dim", -1, 1, -1, 1, opacity=0.5)
+    server.add_rect_zone("faint", -0.5, 0.5, -0.5, 0.5, opacity=0.2)
+    server.add_rect_zone("light", -1.5, 1.5, -1.5, 1.5, opacity=0.8)
+    server.position_update()
+    # Lowest opacity of the triggers holding the point, whatever their order
+    assert _alpha(server) == round(_original * 0.2)
+
+    # Leaves "faint" only: the others still hold it
+    server.set_group_positions("g", [[0.75, 0]])
+    server.position_update()
+    assert _alpha(server) == round(_original * 0.5)
+
+    server.remove_trigger("dim")
+    assert _alpha(server) == round(_original * 0.8)
+
+    server.set_group_positions("g", [[1.75, 0]])
+    server.position_update()
+    assert _alpha(server) == _original
@@ -0,0 +1,55 @@
+import numpy as np
+
+from vicon_projector_server.position_buffer import Position_Buffer
+from vicon_projector_server.udp_ingress import PACKET_DTYPE, UDP_Ingress, pack_records
+
+
+def _ingress():
+    _buffer = Position_Buffer(capacity=4)
+    _slots = _buffer.allocate(1)
+    _ingress = UDP_Ingress(_buffer)
+    _ingress.register("body", [7], _slots)
+    return _ingress, _buffer, int(_slots[0])
+
+
+def _send(ingress, x, seq, timestamp):
+    return ingress.process(np.frombuffer(pack_records([7], [[x, 0.0]], seq, timestamp=timestamp), dtype=PACKET_DTYPE))
+
+
+def test_binds_localhost_by_default():
+    assert UDP_Ingress(Position_Buffer(capacity=1)).hostname == "localhost"
+
+
+def test_reordered_and_duplicate_records_are_stale():
+    ingress, buffer, slot = _ingress()
+    assert _send(ingress, 1.0, 10, 100.0) == 1
+    assert _send(ingress, 2.0, 9, 99.0) == 0
+    assert _send(ingress, 2.0, 10, 100.0) == 0
+    assert buffer.read(slot)[0][0] == 1.0
+    assert ingress.get_stats()["restarts"] == 0
+
+
+def test_restarted_sender_resyncs():
+    ingress, buffer, slot = _ingress()
+    assert _send(ingress, 1.0, 50000, 100.0) == 1
+
+    # Sequence back to 0 with a newer sample
+    assert _send(ingress, 2.0, 0, 101.0) == 1
+    assert _send(ingress, 3.0, 1, 101.1) == 1
+    assert buffer.read(slot)[0][0] == 3.0
+
+    # Large backward jump, even without a usable timestamp
+    assert _send(ingress, 4.0, 60000, 0.0) == 1
+    assert _send(ingress, 5.0, 3, 0.0) == 1
+    assert _send(ingress, 6.0, 2, 0.0) == 0
+    assert buffer.read(slot)[0][0] == 5.0
+    assert ingress.get_stats()["restarts"] == 2
+
+
+def test_restart_within_a_batch_keeps_the_new_session():
+    ingress, buffer, slot = _ingress()
+    _send(ingress, 1.0, 50000, 100.0)
+    _batch = np.frombuffer(pack_records([7, 7, 7], [[2.0, 0.0], [3.0, 0.0], [4.0, 0.0]],
+                                        [50001, 0, 1], timestamp=[100.1, 200.0, 200.1]), dtype=PACKET_DTYPE)
+    assert ingress.process(_batch) == 1
+    assert buffer.read(slot)[0][0] == 4.0
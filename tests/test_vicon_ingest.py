@@ -0,0 +1,130 @@
+import socket
+import time
+from threading import Thread
+
+import pytest
+
+from vicon_projector_server.tracker_pool import Tracker_Pool
+from vicon_projector_server.vicon_ingest import Vicon_Ingest
+
+
+class _Socket_Tracker:
+    ''' Tracker with a socket: one sample per byte received.
+    '''
+    def __init__(self):
+        self.reader, self.writer = socket.socketpair()
+        self.reader.setblocking(False)
+        self.handlers = []
+        self.pumps = 0
+
+    def register_change_handler(self, userdata, callback, kind, sensor=None):
+        self.handlers.append((userdata, callback))
+
+    def unregister_change_handler(self, userdata, callback, kind, sensor=None):
+        self.handlers.remove((userdata, callback))
+
+    def fileno(self):
+        return self.reader.fileno()
+
+    def mainloop(self):
+        self.pumps += 1
+        try:
+            data = self.reader.recv(4096)
+        except BlockingIOError:
+            return
+        for _ in data:
+            for userdata, callback in list(self.handlers):
+                callback(userdata, {"sensor": 0})
+
+    def close(self):
+        self.reader.close()
+        self.writer.close()
+
+
+class _Polled_Tracker:
+    ''' Tracker without a file descriptor, never producing samples.
+    '''
+    def __init__(self):
+        self.pumps = 0
+
+    def register_change_handler(self, userdata, callback, kind, sensor=None):
+        pass
+
+    def mainloop(self):
+        self.pumps += 1
+
+
+@pytest.fixture
+def ingest():
+    _ingest = Vicon_Ingest(min_sleep=0.001, max_sleep=0.02)
+    _thread = Thread(target=_ingest.run)
+    _thread.start()
+    yield _ingest
+    _ingest.stop()
+    _thread.join()
+
+
+def _wait(condition, timeout=2.0):
+    _end = time.time() + timeout
+    while not condition() and time.time() < _end:
+        time.sleep(0.005)
+    return condition()
+
+
+def test_socket_trackers_are_pumped_when_data_arrives(ingest):
+    tracker = _Socket_Tracker()
+    woken = []
+    ingest.on_data = lambda: woken.append(1)
+    ingest.add_tracker(tracker)
+    ingest.add_tracker(tracker)
+    assert ingest.trackers == (tracker,)
+
+    # Quiet: only the keep-alive pumps at max_sleep, no busy spinning
+    time.sleep(0.2)
+    assert tracker.pumps <= 0.2/0.02 + 2
+    assert not woken
+
+    tracker.writer.send(b"abc")
+    assert _wait(lambda: ingest.callback_count == 3)
+    assert _wait(lambda: woken)
+
+    ingest.remove_tracker(tracker)
+    assert ingest.trackers == ()
+    _pumps = tracker.pumps
+    time.sleep(0.1)
+    assert tracker.pumps <= _pumps + 1
+    tracker.close()
+
+
+def test_polled_trackers_back_off(ingest):
+    tracker = _Polled_Tracker()
+    ingest.add_tracker(tracker)
+    time.sleep(0.3)
+    # Waits grow from min_sleep to max_sleep while idle
+    assert 5 < tracker.pumps < 0.3/0.001
+
+
+def test_pooled_trackers_count_every_sample(ingest):
+    pool = Tracker_Pool(factory=lambda name: _Socket_Tracker())
+    tracker = pool.acquire("body@host")
+    ingest.add_tracker(tracker)
+    tracker.receiver.writer.send(b"ab")
+    assert _wait(lambda: ingest.callback_count == 2)
+    ingest.remove_tracker(tracker)
+    pool.release(tracker)
+
+
+def test_removed_and_added_again_counts_samples_once(ingest):
+    pool = Tracker_Pool(factory=lambda name: _Socket_Tracker())
+    tracker = pool.acquire("body@host")
+    for _ in range(3):
+        ingest.add_tracker(tracker)
+        ingest.remove_tracker(tracker)
+    ingest.add_tracker(tracker)
+
+    tracker.receiver.writer.send(b"abcd")
+    assert _wait(lambda: ingest.callback_count >= 4)
+    time.sleep(0.05)
+    assert ingest.callback_count == 4
+    ingest.remove_tracker(tracker)
+    pool.release(tracker)
@@ -1,2 +1,4 @@
 from .base import tracked_item
-from .image_item import image_item
\ No newline at end of file
+from .image_item import image_item
+from .item_group import tracked_item_group
+from .registry import item_types, create_item
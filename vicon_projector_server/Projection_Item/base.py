@@ -1,6 +1,8 @@
 import numpy as np
 from typing import Callable
-import vrpn
+from ..tracker_pool import default_tracker_pool
+from ..position_buffer import sample_time
+from ..predictor import Position_Predictor
 
 class tracked_item:
     '''Base Item
@@ -20,35 +22,70 @@ class tracked_item:
 
         self.name = name
 
+        # Slots in the server's Position_Buffer. Set by attach_position_buffer
+        self.position_buffer = None
+        self.slots = None
+
+        # Incremented on every local position change. Render tick only updates items with
+        # snapshot_version() != rendered_version
+        self.position_version = 0
         self.position = position
+        self.rendered_version = self.position_version
 
         self.handle = handle
 
         self.is_vicon_tracked = False
+        self.vicon_tracker = None
+        self._vicon_subscriptions = []
+
+        # Latency compensation. Check set_prediction
+        self.prediction = None
 
         if zValue is not None:
             self.zValue = zValue
         
         self.tracking_offset = tracking_offset
     
+    @classmethod
+    def from_dict(cls, params: dict) -> 'tracked_item':
+        '''Create an item from JSON friendly constructor parameters. Used by :obj:`create_item`.
+
+        Parameters:
+            params(dict): Constructor parameters
+
+        Returns:
+            tracked_item: New item
+        '''
+        return cls(**params)
+
     def set_vicon_tracker(self, tracker_name:str,
                         enable_position:bool = True,
                         enable_velocity:bool = False,
                         position_callback:Callable = None,
-                        velocity_callback:Callable = None):
+                        velocity_callback:Callable = None,
+                        sensor:int = None,
+                        tracker_pool:'Tracker_Pool' = None):
         '''Setup Vicon tracker
 
+        Items tracking the same ``tracker_name`` share one VRPN connection (Check :obj:`Tracker_Pool`).
+
         Parameters:
-            tracker_name(str): Name of the tracker. Eg: tracker@ip_address
+            tracker_name(str): Name of the tracker. Eg: tracker@ip_address, or ``sim://circle?bodies=10`` (Check :obj:`create_source`)
             enable_position(bool): Enable callback function for position data. Default: True
             enable_velocity(bool): Enable callback function for velocity data. Default: False
             position_callback(function): Overrides default vicon_position_callback function. 
                                         Function format: fn(obj,position_data)
             velocity_callback(function): Overrides default vicon_velocity_callback function. 
                                         Function format: fn(obj,velocity_data)
+            sensor(int): Only use data from this sensor id. Default: None (all sensors)
+            tracker_pool(Tracker_Pool): Pool to get the connection from. Default: process wide pool
 
         '''
-        self.vicon_tracker = vrpn.receiver.Tracker(tracker_name)
+        # Drop previous tracker, if any
+        self.release_vicon_tracker()
+
+        self._tracker_pool = default_tracker_pool if tracker_pool is None else tracker_pool
+        self.vicon_tracker = self._tracker_pool.acquire(tracker_name)
 
         if enable_position:
             if position_callback:
@@ -57,7 +94,8 @@ class tracked_item:
                 _position_fn = self.vicon_position_callback
             
             # Set callback handler
-            self.vicon_tracker.register_change_handler(None,_position_fn,"position")
+            self.vicon_tracker.register_change_handler(None,_position_fn,"position",sensor)
+            self._vicon_subscriptions.append((_position_fn,"position",sensor))
             self.is_vicon_tracked = True
             self.vicon_position = []
         
@@ -68,11 +106,78 @@ class tracked_item:
                 _velocity_fn = self.vicon_velocity_callback
             
             # Set callback handler
-            self.vicon_tracker.register_change_handler(None,_velocity_fn,"velocity")
+            self.vicon_tracker.register_change_handler(None,_velocity_fn,"velocity",sensor)
+            self._vicon_subscriptions.append((_velocity_fn,"velocity",sensor))
             self.is_vicon_tracked = True
             self.vicon_velocity = []
+
+    def get_vicon_trackers(self) -> list:
+        '''Trackers that need to be pumped for this item.
+
+        Returns:
+            list: Shared trackers (:obj:`Pooled_Tracker`)
+        '''
+        if self.vicon_tracker is None:
+            return []
+        return [self.vicon_tracker]
+
+    def get_tracking_routes(self) -> list:
+        '''Tracker subscriptions as slot writes, for trackers running in another process. Check :obj:`Ingest_Process`.
+
+        Only the default callbacks can be routed: they write the item's slot with ``tracking_offset``
+        applied. Call after ``attach_position_buffer``.
+
+        Returns:
+            list: (tracker_name, kind, sensor, slot, tracking_offset) of each subscription
+        '''
+        if self.vicon_tracker is None:
+            return []
+
+        _offset = (float(self.tracking_offset[0]), float(self.tracking_offset[1]))
+        _routes = []
+        for _fn, _kind, _sensor in self._vicon_subscriptions:
+            if getattr(_fn, "__func__", None) is not getattr(tracked_item, f"vicon_{_kind}_callback"):
+                raise RuntimeError(f"Custom {_kind} callback of item '{self.name}' can not run in the ingest process.")
+            _routes.append((self.vicon_tracker.tracker_name, _kind, _sensor, int(self.slots[0]), _offset))
+        return _routes
+
+    def release_vicon_tracker(self) -> list:
+        '''Unsubscribe from the Vicon tracker and release the shared connection.
+
+        Returns:
+            list: Trackers whose connection was closed (no other item is using them).
+        '''
+        if self.vicon_tracker is None:
+            return []
+
+        for _fn, _kind, _sensor in self._vicon_subscriptions:
+            self.vicon_tracker.unregister_change_handler(None,_fn,_kind,_sensor)
+        self._vicon_subscriptions = []
+
+        _closed = [self.vicon_tracker] if self._tracker_pool.release(self.vicon_tracker) else []
+
+        self.vicon_tracker = None
+        self.is_vicon_tracked = False
+        return _closed
     
 
+    def set_prediction(self, mode:str = "constant_velocity",
+                    alpha:float = 0.85,
+                    beta:float = 0.005):
+        '''Extrapolate the item to the expected display time. Check :obj:`Position_Predictor`.
+
+        Applied when the item is added to the projection server.
+        Use ``Projection_Server.set_prediction`` for items already on the canvas.
+
+        Parameters:
+            mode(str): None, "constant_velocity" (needs ``enable_velocity=True``) or "alpha_beta". Default: "constant_velocity"
+            alpha(float): Alpha-beta position gain. Default: 0.85
+            beta(float): Alpha-beta velocity gain. Default: 0.005
+        '''
+        if mode not in Position_Predictor.MODES:
+            raise ValueError(f"Unknown prediction mode '{mode}'. Use one of {list(Position_Predictor.MODES)}")
+        self.prediction = {"mode": mode, "alpha": alpha, "beta": beta}
+
     def ros_callback(self,**kwargs):
         '''Ros Callback
 
@@ -90,6 +195,15 @@ class tracked_item:
             data(dict): Vicon Data
 
         '''
+        _buffer = self.position_buffer
+        if _buffer is not None:
+            # Written in place. Picked up by the render tick
+            _buffer.write_position(self.slots[0],
+                                data['position'][0] + self.tracking_offset[0],
+                                data['position'][1] + self.tracking_offset[1],
+                                sample_time(data))
+            return
+
         self.vicon_position = [data['position'][0] + self.tracking_offset[0],
                             data['position'][1] + self.tracking_offset[1]]
         self.position = self.vicon_position
@@ -103,7 +217,68 @@ class tracked_item:
             data(dict): Vicon Data
 
         '''
+        _buffer = self.position_buffer
+        if _buffer is not None:
+            _buffer.write_velocity(self.slots[0], data['velocity'][0], data['velocity'][1])
+            return
+
         self.vicon_velocity = [data['velocity'][0], data['velocity'][1]]
+
+    def attach_position_buffer(self, position_buffer: 'Position_Buffer') -> None:
+        ''' Move position state into slots of a shared :obj:`Position_Buffer`.
+
+        Called by ``Projection_Server.add_new_item``. Once attached, tracking callbacks
+        write into the buffer and ``position`` is refreshed by the render tick.
+
+        Parameters:
+            position_buffer(Position_Buffer): Server position buffer
+        '''
+        _position = np.array(self._position, dtype=np.float64)
+        _slots = position_buffer.allocate(len(_position.reshape(-1, 2)))
+        position_buffer.write_positions(_slots, _position.reshape(-1, 2))
+
+        self._position = _position
+        self.slots = _slots
+        self.position_buffer = position_buffer
+
+        # Render on the next tick
+        self.rendered_version = -1
+
+    def detach_position_buffer(self) -> None:
+        ''' Release slots in the position buffer. Called by ``Projection_Server.remove_item``.
+        '''
+        _buffer = self.position_buffer
+        if _buffer is None:
+            return
+
+        self.position_buffer = None
+        _buffer.free(self.slots)
+
+    def snapshot_version(self, snapshot):
+        ''' Render version of the item. Changes whenever the item needs to be redrawn.
+
+        Parameters:
+            snapshot(Position_Snapshot): Snapshot taken by the render tick (or the live Position_Buffer)
+
+        Returns:
+            int|tuple: Version to compare with ``rendered_version``. ``position_version`` and the
+                sequence of each slot, once the item is attached to a position buffer.
+        '''
+        if self.position_buffer is None:
+            return self.position_version
+
+        _slots = self.slots
+        if len(_slots) == 1:
+            return (self.position_version, int(snapshot.sequence[_slots[0]]))
+        return (self.position_version, snapshot.sequence[_slots].tobytes())
+
+    def apply_snapshot(self, snapshot) -> None:
+        ''' Copy the item's position out of a render snapshot, in place.
+
+        Parameters:
+            snapshot(Position_Snapshot): Snapshot taken by the render tick
+        '''
+        self._position.reshape(-1, 2)[:] = snapshot.position[self.slots]
         
     def position_updater(self):
         ''' Defines how graphic item's position is updated.
@@ -137,13 +312,29 @@ class tracked_item:
     @property
     def position(self):
         '''numpy.ndarray = [x,y]: Position of the item. Sets ``handle.position``, if available.
+
+        Once the item is added to a projection server, this is the position as of the last rendered frame.
+        Latest tracked position is in ``position_buffer``.
     
         '''
         return self._position
 
     @position.setter
     def position(self,value: np.ndarray):
-        self._position = value
+        if self.position_buffer is None:
+            self._position = value
+            self.position_version += 1
+            return
+
+        self._position = np.array(value, dtype=np.float64)
+        self.position_buffer.write_positions(self.slots, self._position.reshape(-1, 2))
+
+    @property
+    def is_dirty(self):
+        '''bool: True if the position changed since the graphic item was last updated.
+
+        '''
+        return self.snapshot_version(self.position_buffer) != self.rendered_version
 
     @property
     def tracking_offset(self):
@@ -1,19 +1,43 @@
 from .base import tracked_item
+from ..texture_cache import Texture, Texture_Item, default_texture_cache
 import numpy as np
 import pyqtgraph as pg
+from PyQt6 import QtGui
+
+
+def load_image(filename: str) -> np.ndarray:
+    '''Load an image file as an RGBA array. Same layout as :obj:`np.asarray(Image.open(filename))`.
+
+    Parameters:
+        filename(str): Image file
+
+    Returns:
+        numpy.ndarray: uint8 array. Shape (height, width, 4)
+    '''
+    _image = QtGui.QImage(filename)
+    if _image.isNull():
+        raise FileNotFoundError(f"Unable to load image '{filename}'")
+
+    _image = _image.convertToFormat(QtGui.QImage.Format.Format_RGBA8888)
+    _buffer = np.frombuffer(_image.constBits().asarray(_image.sizeInBytes()), dtype=np.uint8)
+    _buffer = _buffer.reshape(_image.height(), _image.bytesPerLine())[:, :_image.width()*4]
+    return _buffer.reshape(_image.height(), _image.width(), 4).copy()
+
 
 class image_item(tracked_item):
     '''
 
     Attributes:
         name(str): Unique name to identify items on the canvas/projection server.
-        image(numpy.ndarray): Image RGB array. Use :obj:`np.asarray(Image.open("IMAGE_NAME").load())`.
+        image(numpy.ndarray|Texture): Image RGB array. Use :obj:`np.asarray(Image.open("IMAGE_NAME").load())`.
         position(numpy.ndarray = [x,y]): Position of the item. Sets ``handle.position``, if available.
         width(float): Width of the image.
         height(float): Height of the image.
         zValue(float): Z-Value of the item. Determines how items are stacked. `Relative` (Higher Z-Value = Top).
         tracking_offset (list[float]): Defines how posiiton is offset from vicon/ros position. Check more info at `tracked_item.tracking_offset`
-        **kwargs: Additional Keyword arguments. Will be passed on to the actual pyqtgraph graphic item handle
+        shared_texture(bool): Share the converted image with items showing the same pixels (check :obj:`Texture_Cache`). Default: True
+        zero_copy(bool): Draw straight from a uint8 ``image`` without converting or copying it. Changes to the array show on repaint. Check :obj:`normalize_image`. Default: False
+        **kwargs: Additional Keyword arguments. Will be passed on to the actual pyqtgraph graphic item handle. Disables ``shared_texture``.
     '''
     def __init__(self,
                 name: str,
@@ -23,13 +47,22 @@ class image_item(tracked_item):
                 height: float,
                 zValue:float = None,
                 tracking_offset: 'list[float]' = [0.0,0.0],
+                shared_texture: bool = True,
+                zero_copy: bool = False,
                 **kwargs):
 
         self.height = height
         self.width = width
 
-        # Create a new pyqtgraph image item
-        self.handle = pg.ImageItem(image=image,**kwargs)
+        # Shared texture from the process wide cache, or a pyqtgraph image item of its own
+        if isinstance(image, Texture):
+            self.handle = Texture_Item(image)
+        elif zero_copy:
+            self.handle = Texture_Item(default_texture_cache.wrap(image))
+        elif shared_texture and not kwargs:
+            self.handle = Texture_Item(default_texture_cache.get(image))
+        else:
+            self.handle = pg.ImageItem(image=image,**kwargs)
 
         # Set Initial Position
         self.handle.setRect(position[0]-width/2,      # Origin at Center of image
@@ -46,6 +79,30 @@ class image_item(tracked_item):
 
 
         
+    # Constructor parameters that keep the texture shared
+    _shared_params = {"name", "position", "width", "height", "zValue", "tracking_offset", "shared_texture"}
+
+    @classmethod
+    def from_dict(cls, params: dict) -> 'image_item':
+        '''Create an image item from JSON friendly parameters.
+
+        Parameters:
+            params(dict): Constructor parameters. ``image`` can be a nested list, or use ``image_file`` to load a file on the server.
+
+        Returns:
+            image_item: New item
+        '''
+        _params = dict(params)
+        if "image_file" in _params:
+            _filename = _params.pop("image_file")
+            if _params.get("shared_texture", True) and not set(_params) - cls._shared_params:
+                _params["image"] = default_texture_cache.get_file(_filename, load_image)
+            else:
+                _params["image"] = load_image(_filename)
+        else:
+            _params["image"] = np.asarray(_params["image"])
+        return cls(**_params)
+
     def position_updater(self):
 
 
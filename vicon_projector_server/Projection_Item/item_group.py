@@ -0,0 +1,342 @@
+from .base import tracked_item
+from ..tracker_pool import default_tracker_pool
+from ..position_buffer import sample_time
+import numpy as np
+import pyqtgraph as pg
+
+
+class _Group_Scatter(pg.ScatterPlotItem):
+    '''ScatterPlotItem that reports view changes. Marker sizes are in world units,
+    so pixel sizes need to be recomputed when the view is resized.
+    '''
+    def __init__(self, on_view_changed, *args, **kwargs):
+        self._on_view_changed = on_view_changed
+        super().__init__(*args, **kwargs)
+
+    def viewTransformChanged(self):
+        super().viewTransformChanged()
+        self._on_view_changed()
+
+    def setPositions(self, x: np.ndarray, y: np.ndarray) -> None:
+        ''' Move the points, keeping their size, brush and visibility.
+
+        ``setData`` rebuilds every spot (about 25 ms for 5000 points, against 0.03 ms here), so
+        positions are written in place when the number of points did not change.
+        '''
+        if len(x) != len(self.data):
+            self.setData(x=x, y=y)
+            return
+
+        self.data['x'] = x
+        self.data['y'] = y
+        # As in addPoints: new bounds and repaint
+        self.prepareGeometryChange()
+        self.informViewBoundsChanged()
+        self.bounds = [None, None]
+        self.invalidate()
+
+
+class tracked_item_group(tracked_item):
+    '''Group of markers rendered by a single graphic item.
+
+    Member state is kept in contiguous NumPy arrays (struct-of-arrays) and drawn
+    in one batch, so thousands of markers cost one scene item and one
+    ``position_updater`` call per frame.
+
+    Attributes:
+        name(str): Unique name to identify items on the canvas/projection server.
+        positions(numpy.ndarray = [[x,y],...]): Initial position of each member. Shape (N,2)
+        sizes(float|numpy.ndarray): Diameter of each member, in canvas units. Default: 1.0
+        colors(tuple|numpy.ndarray): RGBA color of each member. Shape (4,) or (N,4). Default: White
+        member_names(list[str]): Names of the members. Default: ``name/index``
+        on_view_changed(function): Called when the canvas zoom or size changed, so marker sizes are redrawn. Set by the projection server. Default: None
+        zValue(float): Z-Value of the item. Determines how items are stacked. `Relative` (Higher Z-Value = Top).
+        tracking_offset (list[float]): Defines how posiiton is offset from vicon/ros position. Check more info at `tracked_item.tracking_offset`
+        symbol(str): Marker symbol. Check :obj:`pyqtgraph.ScatterPlotItem`. Default: 'o'
+        **kwargs: Additional Keyword arguments. Will be passed on to the actual pyqtgraph graphic item handle
+    '''
+    def __init__(self,
+                name: str,
+                positions: np.ndarray,
+                sizes = 1.0,
+                colors = (255, 255, 255, 255),
+                member_names: 'list[str]' = None,
+                zValue: float = None,
+                tracking_offset: 'list[float]' = [0.0,0.0],
+                symbol: str = 'o',
+                **kwargs):
+
+        positions = np.array(positions, dtype=np.float64).reshape(-1, 2)
+        _count = len(positions)
+
+        self.sizes = np.empty(_count, dtype=np.float64)
+        self.sizes[:] = sizes
+
+        self.colors = np.empty((_count, 4), dtype=np.uint8)
+        self.colors[:] = colors
+
+        self.visible = np.ones(_count, dtype=bool)
+
+        if member_names is None:
+            member_names = [f"{name}/{i}" for i in range(_count)]
+        assert len(member_names) == _count, "Number of member names does not match number of positions"
+        self.member_names = list(member_names)
+        self._member_index = {_member: i for i, _member in enumerate(self.member_names)}
+
+        self._style_changed = True
+        self._pixel_width = None
+        self._member_trackers = []
+        self.on_view_changed = None
+
+        # One scatter item for all members. Sizes are converted to pixels in position_updater
+        self.position_version = 0
+        self.handle = _Group_Scatter(self._view_changed, pen=None, symbol=symbol, pxMode=True, **kwargs)
+        self.handle.setData(x=positions[:, 0], y=positions[:, 1])
+
+        super().__init__(name=name,
+                        handle = self.handle,
+                        position=positions,
+                        zValue=zValue,
+                        tracking_offset = tracking_offset)
+
+        # Render on the first frame. Pixel sizes are unknown until the item is on a canvas
+        self.rendered_version = -1
+
+    def __len__(self):
+        return len(self._position)
+
+    def member_indices(self, members = None) -> np.ndarray:
+        '''Convert member names/indices to indices.
+
+        Parameters:
+            members(list): Member names or indices. Default: None (all members)
+
+        Returns:
+            numpy.ndarray: Member indices
+        '''
+        if members is None:
+            return np.arange(len(self))
+
+        return np.array([m if isinstance(m, (int, np.integer)) else self._member_index[m]
+                        for m in members], dtype=np.intp)
+
+    def set_positions(self, positions: np.ndarray, members = None) -> None:
+        '''Bulk position update.
+
+        Parameters:
+            positions(numpy.ndarray): New positions. Shape (N,2)
+            members(list): Member names or indices matching ``positions``. Default: None (all members)
+        '''
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        _indices = self.member_indices(members)
+
+        if self.position_buffer is not None:
+            self.position_buffer.write_positions(self.slots[_indices], positions)
+            return
+
+        self._position[_indices] = positions
+        self._mark_changed()
+
+    def set_sizes(self, sizes, members = None) -> None:
+        '''Bulk size update.
+
+        Parameters:
+            sizes(float|numpy.ndarray): Diameter in canvas units.
+            members(list): Member names or indices matching ``sizes``. Default: None (all members)
+        '''
+        self.sizes[self.member_indices(members)] = sizes
+        self._style_changed = True
+        self._mark_changed()
+
+    def set_colors(self, colors, members = None) -> None:
+        '''Bulk color update.
+
+        Parameters:
+            colors(tuple|numpy.ndarray): RGBA color(s). Shape (4,) or (N,4)
+            members(list): Member names or indices matching ``colors``. Default: None (all members)
+        '''
+        self.colors[self.member_indices(members)] = colors
+        self._style_changed = True
+        self._mark_changed()
+
+    def set_visible(self, visible, members = None) -> None:
+        '''Bulk visibility update.
+
+        Parameters:
+            visible(bool|numpy.ndarray): Visibility of the member(s).
+            members(list): Member names or indices matching ``visible``. Default: None (all members)
+        '''
+        self.visible[self.member_indices(members)] = visible
+        self._style_changed = True
+        self._mark_changed()
+
+    def set_vicon_tracker(self, tracker_name: str,
+                        sensors: 'list[int]' = None,
+                        members: list = None,
+                        tracker_pool: 'Tracker_Pool' = None):
+        '''Setup Vicon tracker for members. One VRPN sensor per member.
+
+        Parameters:
+            tracker_name(str): Name of the tracker. Eg: tracker@ip_address
+            sensors(list[int]): Sensor id of each member. Default: member index
+            members(list): Member names or indices. Default: None (all members)
+            tracker_pool(Tracker_Pool): Pool to get the connection from. Default: process wide pool
+        '''
+        _indices = self.member_indices(members)
+        if sensors is None:
+            sensors = _indices
+
+        for _index, _sensor in zip(_indices, sensors):
+            self.set_member_tracker(int(_index), tracker_name, sensor=int(_sensor), tracker_pool=tracker_pool)
+
+    def set_member_tracker(self, member, tracker_name: str,
+                        sensor: int = None,
+                        tracker_pool: 'Tracker_Pool' = None):
+        '''Setup Vicon tracker for a single member.
+
+        Parameters:
+            member(str|int): Member name or index
+            tracker_name(str): Name of the tracker. Eg: tracker@ip_address
+            sensor(int): Only use data from this sensor id. Default: None (all sensors)
+            tracker_pool(Tracker_Pool): Pool to get the connection from. Default: process wide pool
+        '''
+        _index = int(self.member_indices([member])[0])
+
+        # Drop the previous tracker of this member, if any
+        for _entry in [entry for entry in self._member_trackers if entry[4] == _index]:
+            _old_pool, _old_tracker, _old_callback, _old_sensor, _ = _entry
+            _old_tracker.unregister_change_handler(None, _old_callback, "position", _old_sensor)
+            _old_pool.release(_old_tracker)
+            self._member_trackers.remove(_entry)
+
+        _pool = default_tracker_pool if tracker_pool is None else tracker_pool
+        _tracker = _pool.acquire(tracker_name)
+
+        def _callback(custom_data, data, index = _index):
+            self.member_position_callback(index, data)
+
+        _tracker.register_change_handler(None, _callback, "position", sensor)
+        self._member_trackers.append((_pool, _tracker, _callback, sensor, _index))
+        self.is_vicon_tracked = True
+
+    def member_position_callback(self, index: int, data: dict):
+        '''Vicon Callback
+
+        Position Callback function for a member. Override to use custom method.
+
+        Parameters:
+            index(int): Member index
+            data(dict): Vicon Data
+
+        '''
+        _buffer = self.position_buffer
+        if _buffer is not None:
+            _buffer.write_position(self.slots[index],
+                                data['position'][0] + self.tracking_offset[0],
+                                data['position'][1] + self.tracking_offset[1],
+                                sample_time(data))
+            return
+
+        self._position[index, 0] = data['position'][0] + self.tracking_offset[0]
+        self._position[index, 1] = data['position'][1] + self.tracking_offset[1]
+        self.position_version += 1
+
+    def get_vicon_trackers(self) -> list:
+        '''Trackers that need to be pumped for this group.
+
+        Returns:
+            list: Shared trackers (:obj:`Pooled_Tracker`)
+        '''
+        _trackers = []
+        for _, _tracker, _, _, _ in self._member_trackers:
+            if _tracker not in _trackers:
+                _trackers.append(_tracker)
+        return _trackers
+
+    def get_tracking_routes(self) -> list:
+        '''Member subscriptions as slot writes, for trackers running in another process. Check :obj:`Ingest_Process`.
+
+        Call after ``attach_position_buffer``.
+
+        Returns:
+            list: (tracker_name, kind, sensor, slot, tracking_offset) of each subscription
+        '''
+        if self._member_trackers and type(self).member_position_callback is not tracked_item_group.member_position_callback:
+            raise RuntimeError(f"Custom member_position_callback of item '{self.name}' can not run in the ingest process.")
+
+        _offset = (float(self.tracking_offset[0]), float(self.tracking_offset[1]))
+        return [(_tracker.tracker_name, "position", _sensor, int(self.slots[_index]), _offset)
+                for _, _tracker, _, _sensor, _index in self._member_trackers]
+
+    def release_vicon_tracker(self) -> list:
+        '''Unsubscribe all members and release the shared connections.
+
+        Returns:
+            list: Trackers whose connection was closed (no other item is using them).
+        '''
+        _closed = []
+        for _pool, _tracker, _callback, _sensor, _ in self._member_trackers:
+            _tracker.unregister_change_handler(None, _callback, "position", _sensor)
+            if _pool.release(_tracker):
+                _closed.append(_tracker)
+
+        self._member_trackers = []
+        self.is_vicon_tracked = False
+        return _closed
+
+    def position_updater(self):
+        ''' Update all members in one batch.
+
+        '''
+        handle = self.handle
+        handle.setPositions(self._position[:, 0], self._position[:, 1])
+
+        _pixel_width = self._view_pixel_width()
+        if _pixel_width is None:
+            # View not shown yet: sizes in pixels are unknown. Draw nothing. Showing the view
+            # changes its transform, and _view_changed requests the frame that draws the members
+            handle.setPointsVisible(np.zeros(len(self), dtype=bool))
+            self._style_changed = True
+            self._pixel_width = None
+            return
+
+        if self._style_changed or _pixel_width != self._pixel_width:
+            handle.setSize(self.sizes / _pixel_width, update=False)
+            handle.setBrush(self._brushes(), update=False)
+            handle.setPointsVisible(self.visible, update=False)
+            handle.updateSpots()
+
+            self._style_changed = False
+            self._pixel_width = _pixel_width
+
+    def _view_pixel_width(self) -> float:
+        ''' Width of a screen pixel in canvas units. None until the item is shown in a laid out view.
+        '''
+        # Hidden views report placeholder transforms (eg. 1 pixel per unit)
+        _view = self.handle.getViewWidget()
+        if _view is None or not _view.isVisible():
+            return None
+
+        _pixel = self.handle.pixelVectors()[0]
+        if _pixel is None or not _pixel.length():
+            return None
+        return _pixel.length()
+
+    def _view_changed(self) -> None:
+        # Zoom or resize: marker sizes in pixels need to be recomputed
+        if self._view_pixel_width() == self._pixel_width:
+            return
+        self._mark_changed()
+        if self.on_view_changed is not None:
+            self.on_view_changed()
+
+    def _brushes(self) -> np.ndarray:
+        ''' One brush per member. Brushes are shared between members with the same color.
+        '''
+        _unique, _inverse = np.unique(self.colors, axis=0, return_inverse=True)
+        _brushes = np.empty(len(_unique), dtype=object)
+        _brushes[:] = [pg.mkBrush(*color) for color in _unique.tolist()]
+        return _brushes[_inverse.reshape(-1)]
+
+    def _mark_changed(self):
+        self.position_version += 1
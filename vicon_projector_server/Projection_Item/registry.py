@@ -0,0 +1,42 @@
+from .base import tracked_item
+from .image_item import image_item
+from .item_group import tracked_item_group
+
+# Item types that can be created by name. Eg: Projection_Server.add_items
+item_types = {
+    "image_item": image_item,
+    "tracked_item_group": tracked_item_group,
+}
+
+
+def create_item(spec: dict) -> tracked_item:
+    '''Create an item from a JSON friendly description.
+
+    Parameters:
+        spec(dict): ``type`` (key of ``item_types``), constructor parameters of that type and optionally
+                    ``vicon_tracker`` (tracker name or ``set_vicon_tracker`` parameters) and
+                    ``prediction`` (``set_prediction`` parameters).
+                    Eg: ``{"type": "image_item", "name": "spot1", "image_file": "circle.png", "position": [5,5], "width": 1, "height": 1}``
+
+    Returns:
+        tracked_item: New item. Not added to any projection server yet.
+    '''
+    _params = dict(spec)
+    _type = _params.pop("type", None)
+    _tracker = _params.pop("vicon_tracker", None)
+    _prediction = _params.pop("prediction", None)
+
+    if _type not in item_types:
+        raise TypeError(f"Unknown item type '{_type}'. Use one of {list(item_types)}")
+
+    item = item_types[_type].from_dict(_params)
+
+    if _tracker is not None:
+        if isinstance(_tracker, str):
+            _tracker = {"tracker_name": _tracker}
+        item.set_vicon_tracker(**_tracker)
+
+    if _prediction is not None:
+        item.set_prediction(**_prediction)
+
+    return item
@@ -0,0 +1,199 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from vicon_projector_server.rpc_server import JSON_RPC_Server
+
+
+class Async_JSON_RPC_Server(JSON_RPC_Server):
+    """ JSON RPC Server on a single asyncio event loop.
+
+    Same methods and dispatcher as :obj:`JSON_RPC_Server`, without a thread per request.
+
+        * HTTP/1.1 with keep-alive and pipelining. Requests of a connection run one after the
+          other, in order, while the next requests are read.
+        * Optional raw TCP mode (``tcp_port``): one JSON-RPC request (or batch) per line,
+          one response per line. Notifications get no response line.
+
+    Methods run in a small thread pool, so calls waiting for the render tick (check
+    :obj:`Command_Queue`) do not stall the event loop. Different connections run concurrently.
+
+    Parameters:
+        projection_server(Projection_Server): Server exposing the methods
+        hostname(str): Hostname. Default: "localhost"
+        port(int): HTTP port. Default: 4000
+        tcp_port(int): Newline delimited JSON-RPC port. Default: None (disabled)
+        workers(int): Threads running the methods. Default: 4
+        max_request_size(int): Largest accepted request body (bytes). Default: 16 MiB
+    """
+
+    def __init__(self, projection_server, hostname:str,
+                port,
+                tcp_port:int = None,
+                workers:int = 4,
+                max_request_size:int = 16*1024*1024):
+        super().__init__(projection_server = projection_server,
+                        hostname = hostname,
+                        port = port)
+
+        self.tcp_port = tcp_port
+        self.workers = workers
+        self.max_request_size = max_request_size
+
+        self.loop = None
+        self._executor = None
+        self._stopped = None
+
+    # To start RPC Server
+    def run(self):
+        asyncio.run(self.serve())
+
+    def stop(self) -> None:
+        """ Stop ``run()``. Thread safe.
+        """
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._stopped.set)
+
+    async def serve(self) -> None:
+        """ Serve HTTP (and TCP) connections until ``stop()`` is called.
+        """
+        self.loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="rpc")
+
+        _servers = [await asyncio.start_server(self._http_connection, self.hostname, self.port,
+                                            limit=self.max_request_size)]
+        if self.tcp_port is not None:
+            _servers.append(await asyncio.start_server(self._tcp_connection, self.hostname, self.tcp_port,
+                                                    limit=self.max_request_size))
+
+        try:
+            await self._stopped.wait()
+        finally:
+            for server in _servers:
+                server.close()
+                await server.wait_closed()
+            self._executor.shutdown(wait=False)
+
+    async def _dispatch(self, request_data):
+        return await self.loop.run_in_executor(self._executor, self.handle, request_data)
+
+    async def _write_responses(self, writer, requests:asyncio.Queue, encode) -> None:
+        ''' Run the requests of a connection in order and send their responses. ``None`` in the queue ends the connection.
+
+        A request is an HTTP status (rejected before dispatch) or a JSON-RPC payload.
+        '''
+        try:
+            while True:
+                _pending = await requests.get()
+                if _pending is None:
+                    break
+
+                _request, _keep_alive = _pending
+                if not isinstance(_request, int):
+                    # Next request only starts once this one returned (eg. add_items, then set_positions)
+                    _request = await self._dispatch(_request)
+                _data = encode(_request, _keep_alive)
+                if _data:
+                    writer.write(_data)
+                    await writer.drain()
+                if not _keep_alive:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    async def _http_connection(self, reader, writer) -> None:
+        _requests = asyncio.Queue()
+        _writer_task = asyncio.ensure_future(self._write_responses(writer, _requests, self._http_response))
+
+        try:
+            while True:
+                try:
+                    _head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+
+                _lines = _head.decode("latin-1").split("\r\n")
+                _version = _lines[0].rsplit(" ", 1)[-1]
+                _headers = {}
+                for line in _lines[1:]:
+                    if ":" in line:
+                        _key, _value = line.split(":", 1)
+                        _headers[_key.strip().lower()] = _value.strip()
+
+                _connection = _headers.get("connection", "").lower()
+                _keep_alive = _connection == "keep-alive" if _version == "HTTP/1.0" else _connection != "close"
+
+                if "chunked" in _headers.get("transfer-encoding", "").lower():
+                    await _requests.put((411, False))
+                    break
+
+                try:
+                    _length = int(_headers.get("content-length", 0))
+                except ValueError:
+                    _length = -1
+                if _length < 0:
+                    await _requests.put((400, False))
+                    break
+                if _length > self.max_request_size:
+                    await _requests.put((413, False))
+                    break
+
+                try:
+                    _body = await reader.readexactly(_length)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+
+                # Pipelined requests are queued. The writer runs them in order
+                await _requests.put((_body, _keep_alive))
+                if not _keep_alive:
+                    break
+        finally:
+            await _requests.put(None)
+            await _writer_task
+
+    async def _tcp_connection(self, reader, writer) -> None:
+        _requests = asyncio.Queue()
+        _writer_task = asyncio.ensure_future(self._write_responses(writer, _requests, self._line_response))
+
+        try:
+            while True:
+                try:
+                    _line = await reader.readuntil(b"\n")
+                except asyncio.IncompleteReadError as e:
+                    _line = e.partial
+                    if not _line.strip():
+                        break
+                except (asyncio.LimitOverrunError, ConnectionError):
+                    break
+
+                if _line.strip():
+                    await _requests.put((_line, True))
+        finally:
+            await _requests.put(None)
+            await _writer_task
+
+    @staticmethod
+    def _http_response(response, keep_alive:bool) -> bytes:
+        _connection = b"keep-alive" if keep_alive else b"close"
+
+        # Error status (request rejected before dispatch)
+        if isinstance(response, int):
+            _reasons = {400: b"Bad Request", 411: b"Length Required", 413: b"Payload Too Large"}
+            return (b"HTTP/1.1 %d %s\r\nContent-Length: 0\r\nConnection: close\r\n\r\n"
+                    % (response, _reasons.get(response, b"Error")))
+
+        # Notifications only. Nothing to return
+        if response is None:
+            return b"HTTP/1.1 204 No Content\r\nConnection: " + _connection + b"\r\n\r\n"
+
+        _body = response.encode("utf-8")
+        return (b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: %d\r\nConnection: %s\r\n\r\n"
+                % (len(_body), _connection)) + _body
+
+    @staticmethod
+    def _line_response(response, keep_alive:bool) -> bytes:
+        if response is None:
+            return b""
+        return response.encode("utf-8") + b"\n"
@@ -7,9 +7,10 @@ from PyQt6 import QtWidgets
 import pyqtgraph as pg
 
 from threading import Thread
-import vrpn
 
 from .vicon_canvas import Vicon_Canvas
+from .tracking_source import create_source
+from .vicon_ingest import Vicon_Ingest
 
 
 class Calibration_Setup:
@@ -17,7 +18,7 @@ class Calibration_Setup:
     plot Axis. 
 
     Parameters:
-        tracker_name(str): Name of the calibration tracker. Eg: tracker@ip_address
+        tracker_name(str): Name of the calibration tracker. Eg: tracker@ip_address, or sim://circle for a simulated tracker
         monitor_number(int): Display number of Monitor/Projector to start calibration. Default = 0
 
     Attributes:
@@ -312,8 +313,9 @@ class Calibration_Setup:
         
         This function needs to run in a seperate thread.
         '''
-        self.vicon_handle  = vrpn.receiver.Tracker(self.tracker_name)
+        self.vicon_handle  = create_source(self.tracker_name)
         self.vicon_handle.register_change_handler(None,self.vicon_position_updator,'position')
-        
-        while True:
-            self.vicon_handle.mainloop()
+
+        self.vicon_ingest = Vicon_Ingest()
+        self.vicon_ingest.add_tracker(self.vicon_handle)
+        self.vicon_ingest.run()
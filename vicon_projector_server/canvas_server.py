@@ -1,9 +1,29 @@
 from PyQt6 import QtWidgets
 from vicon_projector_server import Vicon_Canvas
 from vicon_projector_server import rpc_server
+from vicon_projector_server.async_rpc_server import Async_JSON_RPC_Server
+from vicon_projector_server.vicon_ingest import Vicon_Ingest
+from vicon_projector_server.position_buffer import Position_Buffer, Shared_Position_Buffer
+from vicon_projector_server.ingest_process import Ingest_Process
+from vicon_projector_server.spatial_index import Spatial_Index
+from vicon_projector_server.trigger_engine import Trigger_Engine
+from vicon_projector_server.predictor import Position_Predictor
+from vicon_projector_server.frame_scheduler import Frame_Scheduler
+from vicon_projector_server.latency_tracer import Latency_Tracer
+from vicon_projector_server.command_queue import Command_Queue, gui_thread
+from vicon_projector_server.subscription_server import Subscription_Server
+from vicon_projector_server.scene_log import Scene_Change_Log
+from vicon_projector_server.udp_ingress import UDP_Ingress
+from vicon_projector_server.tracker_pool import default_tracker_pool
+from vicon_projector_server.tracker_log import Tracker_Recorder, Tracker_Replayer
+from vicon_projector_server.texture_cache import default_texture_cache
+from vicon_projector_server.Projection_Item import create_item
 import sys
 import os
 import json
+import time
+import numpy as np
+from collections import Counter
 
 from pyqtgraph.Qt import QtGui, QtCore
 
@@ -13,20 +33,130 @@ class Projection_Server:
     
     def __init__(self, config_file: str):
 
-        self.app = QtWidgets.QApplication([])
         self.load_config_data(config_file = config_file)
+
+        # Headless: Qt offscreen platform, no window on screen. Check run_canvas
+        self.headless = self.config_data.get("headless",False)
+        _argv = ["vicon_projector_server", "-platform", "offscreen"] if self.headless else []
+        self.app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(_argv)
+
         self.canvas = Vicon_Canvas(self.config_data)
         self.plot_handle = self.canvas.window
 
         self.managed_threads = {}
-        self.rpc_server = rpc_server.JSON_RPC_Server(projection_server = self,
+        # RPC transport. "werkzeug" (default) or "asyncio" (keep-alive, pipelining, raw TCP)
+        if self.config_data.get("rpc_backend","werkzeug") == "asyncio":
+            self.rpc_server = Async_JSON_RPC_Server(projection_server = self,
                                                     hostname=self.config_data.get("hostname"),
-                                                    port = self.config_data.get("port"))
+                                                    port = self.config_data.get("port"),
+                                                    tcp_port = self.config_data.get("rpc_tcp_port"))
+        else:
+            self.rpc_server = rpc_server.JSON_RPC_Server(projection_server = self,
+                                                        hostname=self.config_data.get("hostname"),
+                                                        port = self.config_data.get("port"))
+
+        # Positions written by tracking callbacks, read once per frame by the render tick.
+        # With "ingest_process", trackers run in a worker process writing to shared memory
+        _capacity = self.config_data.get("max_tracked_slots",16384)
+        if self.config_data.get("ingest_process",False):
+            self.position_buffer = Shared_Position_Buffer(capacity = _capacity)
+        else:
+            self.position_buffer = Position_Buffer(capacity = _capacity)
+
+        # Region queries and off-canvas culling. Check Spatial_Index
+        self.spatial_index = Spatial_Index((*self.config_data["x"], *self.config_data["y"]),
+                                        capacity = self.position_buffer.capacity,
+                                        cell_size = self.config_data.get("spatial_cell_size"))
+        self.cull_offscreen = self.config_data.get("cull_offscreen",True)
+
+        # Zone and proximity triggers, evaluated by the render tick. Check Trigger_Engine
+        self.trigger_engine = Trigger_Engine(max_events = self.config_data.get("trigger_event_log_size",10000))
+        self.trigger_engine.callbacks.append(self._publish_events)
+
+        # Latency compensation
+        self.predictor = Position_Predictor(capacity = self.position_buffer.capacity,
+                                        display_latency = self.config_data.get("display_latency_ms",0)/1000,
+                                        max_horizon = self.config_data.get("prediction_max_horizon_ms",100)/1000)
+
+        # Motion-to-photon latency
+        self.latency_tracer = Latency_Tracer(enabled = self.config_data.get("latency_tracing",False))
+        self.canvas.add_paint_callback(self._on_paint)
+
+        # Frame pacing. Check Frame_Scheduler for modes
+        self.frame_scheduler = Frame_Scheduler(frame_fn = self.position_update,
+                                            mode = self.config_data.get("frame_mode","fixed"),
+                                            interval_ms = self.config_data.get("update_ms",25),
+                                            max_fps = self.config_data.get("max_fps",60))
 
+        # VRPN Ingest
+        self.vicon_ingest = Vicon_Ingest(max_sleep = self.config_data.get("vicon_max_sleep_ms",5)/1000)
+        self.vicon_ingest.on_data = self.frame_scheduler.request_frame
+
+        # Process isolated VRPN ingest. Check Ingest_Process
+        self.ingest_process = None
+        self._ingest_items = set()
+        if self.config_data.get("ingest_process",False):
+            _replay = None
+            if self.config_data.get("replay_trackers"):
+                _replay = {"filename": self.config_data["replay_trackers"],
+                        "speed": self.config_data.get("replay_speed",1.0),
+                        "loop": self.config_data.get("replay_loop",False)}
+            self.ingest_process = Ingest_Process(self.position_buffer,
+                                                max_sleep = self.config_data.get("vicon_max_sleep_ms",5)/1000,
+                                                replay = _replay,
+                                                timeout = self.config_data.get("command_timeout_s",5.0))
+            self.ingest_process.install(default_tracker_pool)
+            self.ingest_process.on_data = self.frame_scheduler.request_frame
+
+        # Binary UDP position ingress. Enabled by "udp_port", bound to "udp_hostname" (default localhost). Check set_udp_source
+        self.udp_ingress = None
+        if self.config_data.get("udp_port") is not None:
+            self.udp_ingress = UDP_Ingress(self.position_buffer,
+                                        hostname = self.config_data.get("udp_hostname"),
+                                        port = self.config_data.get("udp_port"))
+            self.udp_ingress.on_data = self.frame_scheduler.request_frame
         
         # Plot Items
         self.all_plot_items = {}
 
+        # Converted images shared by image items
+        default_texture_cache.max_bytes = int(self.config_data.get("texture_cache_mb",256)*1024*1024)
+
+        # Scene version and change log. Check get_scene_changes
+        self.scene_log = Scene_Change_Log(max_changes = self.config_data.get("scene_log_size",10000))
+
+        # Scene mutations from other threads (RPC) are queued and applied by the render tick
+        self.command_queue = Command_Queue(timeout = self.config_data.get("command_timeout_s",5.0))
+        self.command_queue.on_submit = self.frame_scheduler.request_frame
+
+        # Position push stream. Enabled by "subscription_port"
+        self.subscription_server = None
+        if self.config_data.get("subscription_port") is not None:
+            self.subscription_server = Subscription_Server(hostname = self.config_data.get("hostname"),
+                                                        port = self.config_data.get("subscription_port"))
+            self.subscription_server.on_interest_changed = self.frame_scheduler.request_frame
+
+        # Files written on request of RPC clients (latency dumps, frames, tracker logs) stay in this directory
+        self.output_directory = os.path.realpath(self.config_data.get("output_directory","output"))
+
+        # Image files of items added by RPC clients (``image_file``) are read from this directory only
+        self.image_directory = os.path.realpath(self.config_data.get("image_directory","images"))
+
+        # Tracker record/replay. Check start_tracker_recording and Tracker_Replayer
+        self.tracker_recorder = None
+        self.max_record_capacity = self.config_data.get("max_record_capacity",3600000)
+        if self.config_data.get("record_trackers"):
+            # Path from the config: trusted, not limited to output_directory
+            self._start_tracker_recording(self.config_data["record_trackers"],
+                                        capacity = self.config_data.get("record_capacity",3600000))
+
+        self.tracker_replayer = None
+        if self.config_data.get("replay_trackers") and self.ingest_process is None:
+            self.tracker_replayer = Tracker_Replayer(self.config_data["replay_trackers"],
+                                                    speed = self.config_data.get("replay_speed",1.0),
+                                                    loop = self.config_data.get("replay_loop",False))
+            self.tracker_replayer.install(default_tracker_pool)
+
     def test_connection(self):
         '''
         Method to JSON-RPC client can call to test connection to server
@@ -41,20 +171,115 @@ class Projection_Server:
         return payload
     
     def vicon_loop(self):
-        ''' Loop through all tracked item and run vrpn mainloop
+        ''' Run vrpn mainloop of all tracked items.
+
+        Blocks on the tracker connections and only pumps them when data is pending.
+        Check :obj:`Vicon_Ingest` for more info. With an :obj:`Ingest_Process`, waits for its
+        notifications instead.
         '''
-        while True:
-            for item in self.all_plot_items:
-                if self.all_plot_items[item].is_vicon_tracked:
-                    self.all_plot_items[item].vicon_tracker.mainloop()
+        if self.ingest_process is not None:
+            self.ingest_process.run()
+        else:
+            self.vicon_ingest.run()
     
     def position_update(self):
-        
-        
-        for item in self.all_plot_items:
-            self.all_plot_items[item].position_updater()
+        ''' Render tick. Applies queued scene mutations, then updates graphic items that moved since the last tick.
+
+            * Hidden items are skipped. They are updated once shown again.
+            * Items drawn off the canvas that stay off the canvas are not redrawn (``cull_offscreen``).
+            * Zone and proximity triggers are evaluated once positions changed. Their appearance changes are drawn in the same frame.
+            * Nothing is repainted if no item moved.
+        '''
+        _drained = self.command_queue.drain()
+        _changed = self._render_frame()
+
+        _subscriptions = self.subscription_server
+        if _subscriptions is not None and _subscriptions.has_subscribers:
+            if _changed or _drained or _subscriptions.interest_changed:
+                self._publish_state()
+
+    def _render_frame(self) -> bool:
+        _changed = False
+        _frame_start = time.time()
+
+        # Consistent copy of all tracked positions, extrapolated to the expected display time
+        _snapshot = self.position_buffer.snapshot()
+        self.spatial_index.update(_snapshot)
+        self.predictor.predict(_snapshot, self.predictor.display_time(_frame_start))
+
+        _tracer = self.latency_tracer if self.latency_tracer.enabled else None
+        if _tracer:
+            _tracer.begin_frame(_frame_start)
+
+        _index = self.spatial_index if self.cull_offscreen else None
+        _scene_version = None
+        for item in list(self.all_plot_items.values()):
+            _version = item.snapshot_version(_snapshot)
+            if _version == item.rendered_version or not item.handle.isVisible():
+                continue
+
+            item.apply_snapshot(_snapshot)
+            if _index is not None and len(item.slots) == 1:
+                # Off the canvas before and after the move: nothing to redraw
+                _slot = item.slots[0]
+                if not _index.is_culled(_slot, _snapshot.position[_slot]):
+                    item.position_updater()
+                    _handle = item.handle
+                    _index.set_drawn(_slot, _snapshot.position[_slot],
+                                    _handle.mapRectToParent(_handle.boundingRect() | _handle.childrenBoundingRect()))
+            else:
+                item.position_updater()
+            item.rendered_version = _version
+            _changed = True
+
+            # All moves of a frame share one scene version
+            if _scene_version is None:
+                _scene_version = self.scene_log.next_version()
+            self.scene_log.record_move(item.name, _scene_version)
+
+            if _tracer:
+                _tracer.item_updated(item.name, item.slots, _snapshot)
+
+        # Triggers see every indexed point, culled or hidden
+        for name in self.trigger_engine.evaluate(self.spatial_index, self.all_plot_items):
+            item = self.all_plot_items[name]
+            if item.handle.isVisible():
+                item.apply_snapshot(_snapshot)
+                item.position_updater()
+                item.rendered_version = item.snapshot_version(_snapshot)
+            _changed = True
+
+        if _changed:
+            self.app.processEvents()
+            self.predictor.record_render_latency(time.time() - _frame_start)
+
+        return _changed
+
+    def _publish_state(self) -> None:
+        ''' Push rendered positions of subscribed items to the subscription stream.
+        '''
+        _timestamp = self.position_buffer.timestamp
+        _state = {}
+        for name, item in self.all_plot_items.items():
+            if not self.subscription_server.wants(name):
+                continue
 
-        self.app.processEvents()
+            _state[name] = {
+                "position": np.asarray(item.position, dtype=np.float64).tolist(),
+                "visible": item.handle.isVisible(),
+                "timestamp": float(_timestamp[item.slots].max()) if len(item.slots) else None,
+            }
+        self.subscription_server.publish(_state)
+
+    def _publish_events(self, events: list) -> None:
+        ''' Push trigger events to the subscription stream. Called by the trigger engine.
+        '''
+        if self.subscription_server is not None:
+            self.subscription_server.publish_events(events)
+
+    def _on_paint(self) -> None:
+        if self.latency_tracer.enabled:
+            self.latency_tracer.paint_completed()
 
     def run_canvas(self)->None:
         '''
@@ -63,12 +288,20 @@ class Projection_Server:
         Returns:
             None:
         '''
-        self.canvas.showFullScreen()
+        if self.headless:
+            # Offscreen buffer at the configured resolution
+            self.canvas.resize(*self.config_data.get("resolution",[1920,1080]))
+            self.canvas.show()
+            self.canvas.show_tiles(resolution = self.config_data.get("resolution",[1920,1080]))
+        else:
+            self.canvas.showFullScreen()
+            self.canvas.show_tiles()
         #sys.exit(self.app.exec())
 
-        timer = QtCore.QTimer() # to create a thread that calls a function at intervals
-        timer.timeout.connect(self.position_update)
-        timer.start(self.config_data.get("update_ms",25))
+        # Pace frames to the refresh rate of the projector the canvas is on
+        if self.canvas.screen() is not None and self.canvas.screen().refreshRate() > 0:
+            self.frame_scheduler.refresh_rate = self.canvas.screen().refreshRate()
+        self.frame_scheduler.start()
 
         QtGui.QGuiApplication.instance().exec()
         #sys.exit(self.app.exec())
@@ -89,9 +322,23 @@ class Projection_Server:
 
         self.managed_threads["VICON_LOOP"] = Thread(target=self.vicon_loop)
         self.managed_threads["VICON_LOOP"].start()
+
+        if self.udp_ingress is not None:
+            self.managed_threads["UDP_INGRESS"] = Thread(target=self.udp_ingress.run)
+            self.managed_threads["UDP_INGRESS"].start()
+
+        if self.subscription_server is not None:
+            self.managed_threads["SUBSCRIPTIONS"] = Thread(target=self.subscription_server.run)
+            self.managed_threads["SUBSCRIPTIONS"].start()
         
 
-        self.run_canvas()
+        try:
+            self.run_canvas()
+        finally:
+            if self.ingest_process is not None:
+                self.ingest_process.stop()
+                # Worker gone: remove the shared memory block. Still mapped until this process exits
+                self.position_buffer.unlink()
 
         for thread in self.managed_threads:
             
@@ -99,13 +346,359 @@ class Projection_Server:
 
     def get_all_plot_items(self) -> dict:
         _payload = {}
-        for plot_item in self.all_plot_items.keys():
+        # Copy first. Items are added/removed on the GUI thread
+        for plot_item, item in list(self.all_plot_items.items()):
             _payload[plot_item] = {}
             _payload[plot_item]["name"] = plot_item
-            _payload[plot_item]["type"] = str(self.all_plot_items[plot_item].__class__.__name__)
+            _payload[plot_item]["type"] = str(item.__class__.__name__)
             
         return _payload
 
+    @gui_thread
+    def get_scene_changes(self, since_version:int = None) -> dict:
+        ''' Scene changes since a version. Call with the ``version`` of the previous result.
+
+        Attributes:
+            since_version(int): Scene version the client has. Default: None (full snapshot)
+
+        Returns:
+            dict: ``version`` (current scene version) and ``full``.
+
+                * ``full == False``: ``changes`` (adds, removes, hides and z changes in order) and
+                  ``moved`` (item name -> position, items moved since ``since_version``).
+                * ``full == True``: ``items`` (item name -> type, position, visible, z). Returned if
+                  ``since_version`` is None or older than the change log.
+        '''
+        _log = self.scene_log
+        if since_version is None or not _log.is_available(since_version):
+            return {
+                "version": _log.version,
+                "full": True,
+                "items": {name: self._item_state(item) for name, item in self.all_plot_items.items()},
+            }
+
+        _changes, _moved = _log.changes_since(since_version)
+        return {
+            "version": _log.version,
+            "full": False,
+            "changes": _changes,
+            "moved": {name: np.asarray(self.all_plot_items[name].position, dtype=np.float64).tolist()
+                    for name in _moved},
+        }
+
+    def _item_state(self, item) -> dict:
+        return {
+            "type": item.__class__.__name__,
+            "position": np.asarray(item.position, dtype=np.float64).tolist(),
+            "visible": item.handle.isVisible(),
+            "z": item.handle.zValue(),
+        }
+
+    def _region_result(self, slots, distances = None) -> list:
+        ''' Items (or group members) of index slots, for the region queries.
+        '''
+        _result = []
+        _index = self.spatial_index
+        for _i, _slot in enumerate(slots.tolist()):
+            _item = self.all_plot_items[_index.names[_slot]]
+            _member = int(_index.members[_slot])
+            _entry = {"name": _item.name,
+                    "member": _item.member_names[_member] if hasattr(_item, "member_names") else None,
+                    "position": _index.position[_slot].tolist()}
+            if distances is not None:
+                _entry["distance"] = float(distances[_i])
+            _result.append(_entry)
+        return _result
+
+    def _refresh_index(self) -> None:
+        # Positions written since the last frame
+        self.spatial_index.update(self.position_buffer.snapshot())
+
+    @gui_thread
+    def get_items_in_rect(self, xmin:float, xmax:float, ymin:float, ymax:float) -> list:
+        '''Items whose (latest measured) position is inside a rectangle. Check :obj:`Spatial_Index`.
+
+        Each member of a group is a point.
+
+        Attributes:
+            xmin(float): Left edge
+            xmax(float): Right edge
+            ymin(float): Bottom edge
+            ymax(float): Top edge
+
+        Returns:
+            list: ``{"name", "member" (group member name, else None), "position"}`` per point
+        '''
+        self._refresh_index()
+        return self._region_result(self.spatial_index.query_rect(xmin, xmax, ymin, ymax))
+
+    @gui_thread
+    def get_items_in_radius(self, x:float, y:float, radius:float) -> list:
+        '''Items within ``radius`` of a point, nearest first. Check :obj:`Spatial_Index`.
+
+        Attributes:
+            x(float): X coordinate of the center
+            y(float): Y coordinate of the center
+            radius(float): Radius, in canvas units
+
+        Returns:
+            list: ``{"name", "member", "position", "distance"}`` per point
+        '''
+        self._refresh_index()
+        return self._region_result(*self.spatial_index.query_radius(x, y, radius))
+
+    @gui_thread
+    def get_nearest_items(self, x:float, y:float, k:int = 1) -> list:
+        '''The ``k`` items nearest to a point, nearest first. Check :obj:`Spatial_Index`.
+
+        Attributes:
+            x(float): X coordinate of the point
+            y(float): Y coordinate of the point
+            k(int): Number of items. Default: 1
+
+        Returns:
+            list: ``{"name", "member", "position", "distance"}`` per point
+        '''
+        self._refresh_index()
+        return self._region_result(*self.spatial_index.query_nearest(x, y, k))
+
+    @gui_thread
+    def add_rect_zone(self, name:str, xmin:float, xmax:float, ymin:float, ymax:float,
+                    items:list = None, opacity:float = None) -> bool:
+        '''Add a rectangular zone. Points entering or leaving it raise events. Check :obj:`Trigger_Engine`.
+
+        Attributes:
+            name(str): Unique trigger name
+            xmin(float): Left edge
+            xmax(float): Right edge
+            ymin(float): Bottom edge
+            ymax(float): Top edge
+            items(list): Item names to watch. Default: None (all items)
+            opacity(float): Opacity of the points inside. Default: None (no change)
+
+        Returns:
+            bool: Return True if success. Raises NameError if the trigger name is already used.
+        '''
+        self.trigger_engine.add_rect_zone(name, xmin, xmax, ymin, ymax, items = items, opacity = opacity)
+        return True
+
+    @gui_thread
+    def add_polygon_zone(self, name:str, vertices:list, items:list = None, opacity:float = None) -> bool:
+        '''Add a polygon zone. Points entering or leaving it raise events. Check :obj:`Trigger_Engine`.
+
+        Attributes:
+            name(str): Unique trigger name
+            vertices(list): Polygon vertices [[x,y], ...], in order
+            items(list): Item names to watch. Default: None (all items)
+            opacity(float): Opacity of the points inside. Default: None (no change)
+
+        Returns:
+            bool: Return True if success. Raises NameError if the trigger name is already used.
+        '''
+        self.trigger_engine.add_polygon_zone(name, vertices, items = items, opacity = opacity)
+        return True
+
+    @gui_thread
+    def add_proximity_rule(self, name:str, distance:float, items:list = None, others:list = None,
+                        hysteresis:float = 0.0, opacity:float = None) -> bool:
+        '''Add a pairwise distance rule. Pairs of points getting closer than ``distance`` raise events. Check :obj:`Trigger_Engine`.
+
+        Attributes:
+            name(str): Unique trigger name
+            distance(float): Pairs closer than this enter
+            items(list): Item names to watch. Default: None (all items)
+            others(list): Only pairs between ``items`` and these item names. Default: None (pairs within ``items``)
+            hysteresis(float): Pairs exit beyond ``distance + hysteresis``. Default: 0
+            opacity(float): Opacity of the points of close pairs. Default: None (no change)
+
+        Returns:
+            bool: Return True if success. Raises NameError if the trigger name is already used.
+        '''
+        self.trigger_engine.add_proximity_rule(name, distance, items = items, others = others,
+                                            hysteresis = hysteresis, opacity = opacity)
+        return True
+
+    @gui_thread
+    def remove_trigger(self, name:str) -> bool:
+        '''Remove a zone or proximity rule. Restores the appearance it changed.
+
+        Attributes:
+            name(str): Trigger name
+
+        Returns:
+            bool: Return True if success. Raises NameError if the trigger is not found.
+        '''
+        self.trigger_engine.remove(name, self.all_plot_items)
+        return True
+
+    @gui_thread
+    def get_triggers(self) -> dict:
+        '''Registered zones and proximity rules.
+
+        Returns:
+            dict: Trigger name -> type, geometry, watched items, opacity and current point/pair count
+        '''
+        return self.trigger_engine.get_triggers()
+
+    @gui_thread
+    def get_trigger_events(self, since_id:int = None) -> dict:
+        '''Recent trigger events. Events are also pushed on the subscription stream (``{"events": true}``).
+
+        Attributes:
+            since_id(int): Only events after this id. Default: None (all kept events)
+
+        Returns:
+            dict: ``last_id`` and ``events`` (``{"id", "time", "trigger", "event" ("enter"/"exit"), "item", "member"}``,
+            plus ``other``, ``other_member`` and ``distance`` for proximity rules)
+        '''
+        return {"last_id": self.trigger_engine.last_id, "events": self.trigger_engine.get_events(since_id)}
+
+    def get_frame_stats(self) -> dict:
+        '''Frame pacing statistics. Check :obj:`Frame_Scheduler.get_stats`.
+
+        Returns:
+            dict: Achieved fps, frame time, jitter and missed deadlines.
+        '''
+        return self.frame_scheduler.get_stats()
+
+    def get_texture_cache_stats(self) -> dict:
+        '''Shared image textures. Check :obj:`Texture_Cache`.
+
+        Returns:
+            dict: Hits, misses, evictions, number of textures and memory used.
+        '''
+        return default_texture_cache.get_stats()
+
+    def get_ingest_stats(self) -> dict:
+        '''Counters of the tracker worker process. Check :obj:`Ingest_Process`.
+
+        Returns:
+            dict: Worker counters. Raises RuntimeError if ``ingest_process`` is not enabled in the config.
+        '''
+        if self.ingest_process is None:
+            raise RuntimeError("Ingest process is not enabled. Set 'ingest_process' in the config.")
+        return self.ingest_process.get_stats()
+
+    def get_subscription_stats(self) -> dict:
+        '''Clients of the position push stream. Check :obj:`Subscription_Server`.
+
+        Returns:
+            dict: Number of clients and, per client, subscribed items, rate and dropped updates.
+        '''
+        if self.subscription_server is None:
+            return {"clients": 0, "subscribers": []}
+        return self.subscription_server.get_stats()
+
+    def enable_latency_tracing(self, enable:bool = True) -> bool:
+        '''Start/stop recording motion-to-photon latency. Check :obj:`Latency_Tracer`.
+
+        Attributes:
+            enable(bool): Default: True. Set to False to stop recording.
+
+        Returns:
+            bool: Return True if success.
+        '''
+        self.latency_tracer.enabled = enable
+        return True
+
+    def get_latency_stats(self, name:str = None) -> dict:
+        '''Latency per stage (sample -> callback -> pickup -> update -> paint), in milliseconds.
+
+        Attributes:
+            name(str): Name of the item. Default: None (all items)
+
+        Returns:
+            dict: ``{stage: {count, mean, p50, p90, p99, max}}``
+        '''
+        return self.latency_tracer.get_stats(name)
+
+    def dump_latency_stats(self, filename:str) -> bool:
+        '''Write latency histograms to a JSON file on the server.
+
+        Attributes:
+            filename(str): Output file, relative to ``output_directory`` (config).
+
+        Returns:
+            bool: Return True if success. Raises ValueError if the file is outside ``output_directory``.
+        '''
+        self.latency_tracer.dump(self._output_path(filename))
+        return True
+
+    def _output_path(self, filename:str) -> str:
+        ''' Resolve a file name sent by a client under ``output_directory``. Raises ValueError for paths outside it.
+        '''
+        # realpath: "..", absolute paths and symlinks can not leave the directory
+        _path = os.path.realpath(os.path.join(self.output_directory, filename))
+        if os.path.commonpath([self.output_directory, _path]) != self.output_directory or _path == self.output_directory:
+            raise ValueError(f"'{filename}' is outside the output directory ('{self.output_directory}')")
+
+        os.makedirs(os.path.dirname(_path), exist_ok=True)
+        return _path
+
+    def _image_path(self, filename:str) -> str:
+        ''' Resolve an image file name sent by a client under ``image_directory``. Raises ValueError for paths outside it.
+        '''
+        _path = os.path.realpath(os.path.join(self.image_directory, filename))
+        if os.path.commonpath([self.image_directory, _path]) != self.image_directory or _path == self.image_directory:
+            raise ValueError(f"'{filename}' is outside the image directory ('{self.image_directory}')")
+        return _path
+
+    def reset_latency_stats(self) -> bool:
+        '''Clear latency histograms.
+
+        Returns:
+            bool: Return True if success.
+        '''
+        self.latency_tracer.reset()
+        return True
+
+    def start_tracker_recording(self, filename:str, capacity:int = 3600000) -> bool:
+        '''Record every tracker sample to a memory-mapped file on the server. Check :obj:`Tracker_Recorder`.
+
+        Replay with ``replay_trackers`` in the config.
+
+        Attributes:
+            filename(str): Output file, relative to ``output_directory`` (config). Overwritten.
+            capacity(int): Records preallocated, at most ``max_record_capacity`` (config). Default: 3600000 (1 hour at 1 kHz, ~400 MB)
+
+        Returns:
+            bool: Return True if success. Raises ValueError if the file is outside ``output_directory`` or capacity is out of range.
+        '''
+        if not 0 < capacity <= self.max_record_capacity:
+            raise ValueError(f"capacity must be between 1 and {self.max_record_capacity}")
+        return self._start_tracker_recording(self._output_path(filename), capacity)
+
+    def _start_tracker_recording(self, filename:str, capacity:int) -> bool:
+        if self.ingest_process is not None:
+            self.ingest_process.call("start_tracker_recording", filename, capacity)
+            return True
+
+        if self.tracker_recorder is not None:
+            raise RuntimeError(f"Already recording to '{self.tracker_recorder.filename}'")
+
+        self.tracker_recorder = Tracker_Recorder(filename, capacity=capacity)
+        default_tracker_pool.set_recorder(self.tracker_recorder)
+        return True
+
+    def stop_tracker_recording(self) -> dict:
+        '''Stop recording and close the file.
+
+        Returns:
+            dict: ``filename``, ``records`` written and ``dropped`` (file full).
+        '''
+        if self.ingest_process is not None:
+            return self.ingest_process.call("stop_tracker_recording")
+
+        _recorder = self.tracker_recorder
+        if _recorder is None:
+            raise RuntimeError("Not recording")
+
+        default_tracker_pool.set_recorder(None)
+        self.tracker_recorder = None
+        _stats = {"filename": _recorder.filename, "records": _recorder.count, "dropped": _recorder.dropped}
+        _recorder.close()
+        return _stats
+
     def get_canvas(self) -> 'Vicon_Canvas':
         '''Returns canvas object handle
 
@@ -114,6 +707,35 @@ class Projection_Server:
         '''
         return self.canvas
     
+    @gui_thread
+    def grab_frame(self, filename:str, tile:int = 0) -> bool:
+        '''Save the canvas, as last rendered, to an image file on the server. Works in headless mode.
+
+        Attributes:
+            filename(str): Output file, relative to ``output_directory`` (config). Format from the extension. Eg: frame.png
+            tile(int): Tile to save, with a tiled canvas (check :obj:`Vicon_Canvas`). Default: 0
+
+        Returns:
+            bool: Return True if success. Raises ValueError if the file is outside ``output_directory``.
+        '''
+        if not 0 <= tile < len(self.canvas.tiles):
+            raise IndexError(f"Tile {tile} does not exist ({len(self.canvas.tiles)} tiles)")
+
+        filename = self._output_path(filename)
+
+        if not self.canvas.tiles[tile].grab().save(filename):
+            raise IOError(f"Unable to save frame to '{filename}'")
+        return True
+
+    @gui_thread
+    def get_canvas_tiles(self) -> list:
+        '''World region, edge blends and number of items of each projector tile. Check :obj:`Vicon_Canvas`.
+
+        Returns:
+            list: One dict per tile. A single tile when the canvas is not tiled.
+        '''
+        return self.canvas.get_tiles()
+
     def get_plot_handle(self) -> 'Vicon_Canvas.window':
         '''Return Plot handle (:obj:`PyQtGraph.PlotWidget`)
 
@@ -135,10 +757,16 @@ class Projection_Server:
         _f = open(config_file)
         self.config_data = json.load(_f)
 
+    # Scene mutations. Run on the GUI thread, check :obj:`Command_Queue`.
+    # Calls from other threads are applied by the next render tick and return its result.
+
     # Add plot item
+    @gui_thread
     def add_new_item(self, item) -> None:
         ''' Add new item to the canvas.
 
+        Call ``item.set_vicon_tracker`` before adding the item.
+
         Returns:
             None:
         '''
@@ -147,10 +775,10 @@ class Projection_Server:
         if item.name in self.all_plot_items.keys():
             raise NameError(f"Item with same name ('{item.name}') already exist.'")
 
-        self.all_plot_items[item.name] = item
-        self.plot_handle.addItem(item.handle)
+        self._add_item(item)
     
     # Remove Item
+    @gui_thread
     def remove_item(self,name:str = None):
 
         ''' Remove item from canvas.
@@ -162,18 +790,323 @@ class Projection_Server:
             bool: Return True if success. Raises NameError if the name/item is not found.
         '''
   
+        if name not in self.all_plot_items:
+            raise NameError(f"Item (Name: '{name}') does not exist")
+
+        self._remove_item(name)
+
+        return True
+
+    def _add_item(self, item) -> None:
+        # Slots first: nothing to undo if the buffer is full
+        item.attach_position_buffer(self.position_buffer)
+        self.all_plot_items[item.name] = item
+        self.spatial_index.register(item.name, item.slots)
+        if hasattr(item, "on_view_changed"):
+            # Groups size their markers in pixels: redraw after zoom/resize, also with "data" pacing
+            item.on_view_changed = self.frame_scheduler.request_frame
+
+        if self.ingest_process is not None:
+            try:
+                _routes = item.get_tracking_routes()
+            except RuntimeError:
+                del self.all_plot_items[item.name]
+                self.spatial_index.unregister(item.slots)
+                item.detach_position_buffer()
+                raise
+            if _routes:
+                self.ingest_process.register(item.name, _routes)
+                self._ingest_items.add(item.name)
+
+        if item.prediction is not None:
+            self.predictor.configure(item.slots, **item.prediction)
+        self.plot_handle.addItem(item.handle)
+
+        for tracker in item.get_vicon_trackers():
+            self.vicon_ingest.add_tracker(tracker)
+
+        self.scene_log.record("add", item.name, type = item.__class__.__name__)
+
+    def _remove_item(self, name:str) -> None:
+        _item = self.all_plot_items[name]
+
+        # Release shared tracker. Stop pumping it once no item uses it
+        for tracker in _item.release_vicon_tracker():
+            self.vicon_ingest.remove_tracker(tracker)
+
+        if self.udp_ingress is not None:
+            self.udp_ingress.unregister(name)
+
+        # Worker stops writing the slots before they are freed
+        _free_slots = True
         try:
+            if name in self._ingest_items:
+                self._ingest_items.discard(name)
+                self.ingest_process.unregister(name)
+        except RuntimeError:
+            # No answer: a running worker may still write the slots. Keep them allocated
+            _free_slots = not self.ingest_process.process.is_alive()
+            raise
+        finally:
+            # The item is removed even if the worker failed
+            self.predictor.configure(_item.slots, None)
+            self.trigger_engine.forget_slots(self.spatial_index, self.all_plot_items, _item.slots)
+            self.spatial_index.unregister(_item.slots)
+            if _free_slots:
+                _item.detach_position_buffer()
+            self.latency_tracer.forget(name)
+
+            if hasattr(_item, "on_view_changed"):
+                _item.on_view_changed = None
+
             # Remove from canvas
-            self.canvas.window.removeItem(self.all_plot_items[name].handle)
-            
+            self.canvas.window.removeItem(_item.handle)
+
             # Delete from list
             del self.all_plot_items[name]
 
+        self.scene_log.record("remove", name)
+
+    def _check_names(self, names) -> None:
+        ''' Raise NameError if any of the items does not exist.
+        '''
+        _missing = [name for name in names if name not in self.all_plot_items]
+        if _missing:
+            raise NameError(f"Items (Names: {_missing}) do not exist")
+
+    # Bulk scene mutations. Each call is validated first, then applied in a single frame.
+    @gui_thread
+    def add_items(self, items:list) -> bool:
+        ''' Create and add many items. Check :obj:`create_item` for the item description.
+
+        Attributes:
+            items(list[dict]): Item descriptions. Eg: ``[{"type": "image_item", "name": "spot1", "image_file": "circle.png", "position": [5,5], "width": 1, "height": 1}]``
+                                ``image_file`` is relative to ``image_directory`` (config).
+                                Add ``udp_ids`` to track the item over UDP (check ``set_udp_source``).
+
+        Returns:
+            bool: Return True if success. Nothing is added if any item fails.
+                Raises ValueError if an ``image_file`` is outside ``image_directory``.
+        '''
+        _names = Counter(spec.get("name") for spec in items)
+        _duplicates = [name for name, count in _names.items() if name in self.all_plot_items or count > 1]
+        if _duplicates:
+            raise NameError(f"Items with same names ({sorted(set(_duplicates))}) already exist.")
+
+        _created = []
+        _udp_ids = {}
+        try:
+            for spec in items:
+                spec = dict(spec)
+                if "udp_ids" in spec:
+                    _udp_ids[spec["name"]] = spec.pop("udp_ids")
+                if "image_file" in spec:
+                    spec["image_file"] = self._image_path(spec["image_file"])
+                _created.append(create_item(spec))
+        except Exception:
+            for item in _created:
+                item.release_vicon_tracker()
+            raise
+
+        # Undo everything if any item fails (eg. position buffer full)
+        _added = []
+        try:
+            for item in _created:
+                self._add_item(item)
+                _added.append(item)
+
+            for name, ids in _udp_ids.items():
+                self.set_udp_source(name, ids)
+        except Exception:
+            for item in _added:
+                self._remove_item(item.name)
+            for item in _created[len(_added):]:
+                item.release_vicon_tracker()
+            raise
+
+        self.frame_scheduler.request_frame()
+        return True
+
+    @gui_thread
+    def remove_items(self, names:list) -> bool:
+        ''' Remove many items.
+
+        Attributes:
+            names(list[str]): Names of the items.
+
+        Returns:
+            bool: Return True if success. Raises NameError (and removes nothing) if any item is not found or is listed twice.
+        '''
+        _duplicates = [name for name, count in Counter(names).items() if count > 1]
+        if _duplicates:
+            raise NameError(f"Items (Names: {sorted(_duplicates)}) are listed more than once")
+        self._check_names(names)
+
+        for name in names:
+            self._remove_item(name)
+
+        return True
+
+    @gui_thread
+    def hide_items(self, names:list, hide:bool = True) -> bool:
+        ''' Hide or show many items.
+
+        Attributes:
+            names(list[str]): Names of the items.
+            hide(bool): Default: True. Set to False to show the items.
+
+        Returns:
+            bool: Return True if success. Raises NameError (and changes nothing) if any item is not found.
+        '''
+        self._check_names(names)
+
+        for name in names:
+            self.all_plot_items[name].handle.setVisible(not hide)
+            self.scene_log.record("hide", name, visible = not hide)
+
+        self.frame_scheduler.request_frame()
+        return True
+
+    @gui_thread
+    def set_positions(self, positions:dict) -> bool:
+        ''' Move many items.
+
+        Attributes:
+            positions(dict): Item name -> [x,y]. Use [[x,y],...] (all members) for a :obj:`tracked_item_group`.
+
+        Returns:
+            bool: Return True if success. Raises NameError (missing item) or ValueError (wrong shape) and moves nothing.
+        '''
+        self._check_names(positions.keys())
+
+        # Convert everything before moving anything
+        _positions = {}
+        _invalid = []
+        for name, position in positions.items():
+            _count = len(self.all_plot_items[name].slots)
+            try:
+                _position = np.array(position, dtype=np.float64)
+            except (TypeError, ValueError):
+                _position = None
+            if _position is None or _position.size != 2 * _count:
+                _invalid.append(name)
+                continue
+            _positions[name] = _position.reshape(2) if _count == 1 else _position.reshape(_count, 2)
+        if _invalid:
+            raise ValueError(f"Invalid positions for items {_invalid}. Expected [x,y] (or one per group member)")
+
+        for name, position in _positions.items():
+            self.all_plot_items[name].position = position
+
+        self.frame_scheduler.request_frame()
+        return True
+
+    @gui_thread
+    def set_z_values(self, z_values:dict) -> bool:
+        ''' Change stacking order of many items.
+
+        Attributes:
+            z_values(dict): Item name -> Z-Value. Higher Z-Value = Top.
+
+        Returns:
+            bool: Return True if success. Raises NameError (missing item) or ValueError (not a number) and changes nothing.
+        '''
+        self._check_names(z_values.keys())
+
+        _z_values = {}
+        for name, z_value in z_values.items():
+            try:
+                _z_values[name] = float(z_value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid Z-Value for item '{name}': {z_value!r}")
+
+        for name, z_value in _z_values.items():
+            self.all_plot_items[name].zValue = z_value
+            self.scene_log.record("z", name, z = z_value)
+
+        self.frame_scheduler.request_frame()
+        return True
+
+    # Bulk position update
+    @gui_thread
+    def set_group_positions(self, name:str, positions:list, members:list = None):
+        ''' Move members of a :obj:`tracked_item_group`.
+
+        Attributes:
+            name(str): Name of the group.
+            positions(list): New positions [[x,y],...]
+            members(list): Member names or indices matching ``positions``. Default: None (all members)
+
+        Returns:
+            bool: Return True if success. Raises NameError if the name/item is not found.
+        '''
+        if name not in self.all_plot_items:
+            raise NameError(f"Item (Name: '{name}') does not exist")
+
+        self.all_plot_items[name].set_positions(positions, members)
+        self.frame_scheduler.request_frame()
+        return True
+
+    @gui_thread
+    def set_udp_source(self, name:str, ids) -> bool:
+        ''' Track an item with the binary UDP ingress (check :obj:`UDP_Ingress`). Requires ``udp_port`` in the config.
+
+        Attributes:
+            name(str): Name of the item.
+            ids(int|list[int]): Body id. One per member for a :obj:`tracked_item_group`. None stops UDP tracking.
+
+        Returns:
+            bool: Return True if success. Raises NameError if the name/item is not found.
+        '''
+        if name not in self.all_plot_items:
+            raise NameError(f"Item (Name: '{name}') does not exist")
+        if self.udp_ingress is None:
+            raise RuntimeError("UDP ingress is disabled. Set 'udp_port' in the config.")
+
+        if ids is None:
+            self.udp_ingress.unregister(name)
             return True
-        except:
+
+        _item = self.all_plot_items[name]
+        self.udp_ingress.register(name, ids, _item.slots, _item.tracking_offset)
+        return True
+
+    def get_udp_stats(self) -> dict:
+        '''UDP ingress counters. Check :obj:`UDP_Ingress.get_stats`.
+
+        Returns:
+            dict: Received datagrams/records, written slots and dropped records (stale, unknown id, malformed).
+        '''
+        if self.udp_ingress is None:
+            raise RuntimeError("UDP ingress is disabled. Set 'udp_port' in the config.")
+        return self.udp_ingress.get_stats()
+
+    # Latency compensation
+    @gui_thread
+    def set_prediction(self, name:str, mode:str = "constant_velocity",
+                    alpha:float = 0.85,
+                    beta:float = 0.005):
+        ''' Set latency compensation of an item. Check :obj:`Position_Predictor`.
+
+        Attributes:
+            name(str): Name of the item.
+            mode(str): None, "constant_velocity" or "alpha_beta". Default: "constant_velocity"
+            alpha(float): Alpha-beta position gain. Default: 0.85
+            beta(float): Alpha-beta velocity gain. Default: 0.005
+
+        Returns:
+            bool: Return True if success. Raises NameError if the name/item is not found, ValueError (and changes nothing) for an unknown mode.
+        '''
+        if name not in self.all_plot_items:
             raise NameError(f"Item (Name: '{name}') does not exist")
-    
+
+        _item = self.all_plot_items[name]
+        _item.set_prediction(mode, alpha, beta)
+        self.predictor.configure(_item.slots, **_item.prediction)
+        return True
+
     # Hide Item
+    @gui_thread
     def hide_item(self,name:str,hide=True):
         ''' Hide item from canvas.
 
@@ -189,6 +1122,8 @@ class Projection_Server:
             self.all_plot_items[name].handle.hide()
         else:
             self.all_plot_items[name].handle.show()
+        self.scene_log.record("hide", name, visible = not hide)
+        self.frame_scheduler.request_frame()
         
         return True
 
@@ -0,0 +1,104 @@
+import functools
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable
+
+
+class Command_Queue:
+    '''Thread safe queue that runs scene mutations on the GUI thread.
+
+    Other threads (JSON-RPC handlers) ``submit`` commands and get a
+    :obj:`concurrent.futures.Future` back. The render tick ``drain``-s the queue
+    once per frame, so commands never race the renderer and a batch of
+    commands lands in the same frame.
+
+    Parameters:
+        timeout(float): Seconds ``call`` waits for a result. Default: 5.0
+
+    Attributes:
+        owner_thread(int): Thread that drains the queue (the thread that created it).
+        on_submit(function): Called after a command is queued, from the submitting thread. Default: None
+    '''
+    def __init__(self, timeout: float = 5.0):
+
+        self.timeout = timeout
+        self.owner_thread = threading.get_ident()
+        self.on_submit = None
+
+        self._commands = deque()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        '''Queue a command.
+
+        Parameters:
+            fn(function): Command. Runs on the owner thread.
+            *args: Positional arguments of ``fn``
+            **kwargs: Keyword arguments of ``fn``
+
+        Returns:
+            concurrent.futures.Future: Result (or exception) of the command.
+        '''
+        _future = Future()
+        self._commands.append((_future, fn, args, kwargs))
+
+        if self.on_submit is not None:
+            self.on_submit()
+        return _future
+
+    def call(self, fn: Callable, *args, **kwargs):
+        '''Run a command on the owner thread and wait for its result.
+
+        Runs immediately when called from the owner thread.
+
+        Returns:
+            Result of ``fn``. Exceptions raised by ``fn`` are re-raised. Raises TimeoutError if
+            the command did not run within ``timeout``; it is then cancelled and never runs.
+        '''
+        if threading.get_ident() == self.owner_thread:
+            return fn(*args, **kwargs)
+
+        _future = self.submit(fn, *args, **kwargs)
+        try:
+            return _future.result(timeout=self.timeout)
+        except TimeoutError:
+            # Still queued: drop it. Already running: wait, the caller must see its outcome
+            if _future.cancel():
+                raise
+            return _future.result()
+
+    def drain(self) -> int:
+        '''Run all queued commands. Call from the owner thread.
+
+        Returns:
+            int: Number of commands run.
+        '''
+        _count = 0
+        while self._commands:
+            _future, fn, args, kwargs = self._commands.popleft()
+            _count += 1
+
+            if not _future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                _future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                _future.set_exception(e)
+
+        return _count
+
+    def __len__(self):
+        return len(self._commands)
+
+
+def gui_thread(method: Callable) -> Callable:
+    '''Decorator for ``Projection_Server`` methods that mutate the scene.
+
+    The method runs on the GUI thread through ``self.command_queue``. Calls from other
+    threads wait for the next frame and return its result.
+    '''
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        return self.command_queue.call(method, self, *args, **kwargs)
+    return wrapper
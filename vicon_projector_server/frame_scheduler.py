@@ -0,0 +1,226 @@
+import time
+from collections import deque
+from typing import Callable
+import numpy as np
+from PyQt6 import QtCore
+
+
+class Frame_Scheduler(QtCore.QObject):
+    '''Frame pacing for the render tick.
+
+    Modes:
+        * ``"fixed"``: Every ``interval_ms``. Same as the previous QTimer.
+        * ``"fixed_rate"``: Every display refresh period (``refresh_rate``). Timer based, the frames
+          are not synchronized to the vertical blank of the display.
+        * ``"data"``: Only when ``request_frame`` is called (new tracker data), capped at ``max_fps``.
+
+    In ``fixed`` and ``fixed_rate`` modes frames run on deadlines ``start + k * period``. A frame that
+    overruns skips the deadlines it missed instead of queueing them. After repeated overruns the
+    period is doubled (render every 2nd refresh, etc.), and restored once frames fit again.
+
+    Parameters:
+        frame_fn(function): Render tick. Called on the GUI thread.
+        mode(str): "fixed", "fixed_rate" or "data". Default: "fixed"
+        interval_ms(float): Frame interval for "fixed" mode. Default: 25
+        refresh_rate(float): Display refresh rate (Hz) for "fixed_rate" mode. Default: 60
+        max_fps(float): Frame rate cap for "data" mode. Default: 60
+
+    Attributes:
+        missed_deadlines(int): Number of deadlines skipped because a frame overran.
+        frame_count(int): Number of frames run.
+        divisor(int): Current period multiplier applied after repeated overruns.
+    '''
+    MODES = ("fixed", "fixed_rate", "data")
+
+    # Emitted from any thread by request_frame. Delivered on the GUI thread
+    _frame_requested = QtCore.pyqtSignal()
+
+    def __init__(self, frame_fn: Callable,
+                mode: str = "fixed",
+                interval_ms: float = 25,
+                refresh_rate: float = 60.0,
+                max_fps: float = 60.0,
+                history: int = 240):
+        super().__init__()
+
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown frame mode '{mode}'. Use one of {self.MODES}")
+
+        self.frame_fn = frame_fn
+        self.mode = mode
+        self.interval_ms = interval_ms
+        self.refresh_rate = refresh_rate
+        self.max_fps = max_fps
+
+        self.missed_deadlines = 0
+        self.frame_count = 0
+        self.divisor = 1
+
+        # Consecutive frames that overran / fit in half the period
+        self._overruns = 0
+        self._headroom = 0
+
+        self._frame_starts = deque(maxlen=history)
+        self._frame_times = deque(maxlen=history)
+
+        self._next_deadline = None
+        self._last_frame = 0.0
+        self._pending = False
+        self._running = False
+        self._in_frame = False
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(QtCore.Qt.TimerType.PreciseTimer)
+        self._timer.timeout.connect(self._on_timer)
+
+        self._frame_requested.connect(self._on_request, QtCore.Qt.ConnectionType.QueuedConnection)
+
+    @property
+    def period(self) -> float:
+        '''float: Target frame period in seconds, including the overrun divisor.
+        '''
+        if self.mode == "fixed":
+            _period = self.interval_ms/1000
+        elif self.mode == "fixed_rate":
+            _period = 1.0/self.refresh_rate
+        else:
+            _period = 1.0/self.max_fps
+        return _period * self.divisor
+
+    def start(self) -> None:
+        ''' Start scheduling frames. Call from the GUI thread.
+        '''
+        self._running = True
+        if self.mode == "data":
+            self.request_frame()
+            return
+
+        self._next_deadline = time.perf_counter()
+        self._arm()
+
+    def stop(self) -> None:
+        ''' Stop scheduling frames.
+        '''
+        self._running = False
+        self._timer.stop()
+
+    def request_frame(self) -> None:
+        ''' Ask for a frame in "data" mode. Thread safe. Requests are coalesced until the frame runs.
+        '''
+        if self.mode != "data" or self._pending:
+            return
+        self._pending = True
+        self._frame_requested.emit()
+
+    def get_stats(self) -> dict:
+        '''Frame pacing statistics over the recent frames.
+
+        Returns:
+            dict: ``fps``, ``frame_time_ms`` (mean/max), ``jitter_ms`` (std of frame interval),
+                ``missed_deadlines``, ``frame_count``, ``divisor``, ``mode``, ``target_fps``
+        '''
+        _payload = {
+            "mode": self.mode,
+            "target_fps": 1.0/self.period,
+            "fps": 0.0,
+            "jitter_ms": 0.0,
+            "frame_time_ms": {"mean": 0.0, "max": 0.0},
+            "missed_deadlines": self.missed_deadlines,
+            "frame_count": self.frame_count,
+            "divisor": self.divisor,
+        }
+
+        _starts = np.array(self._frame_starts)
+        if len(_starts) > 1:
+            _intervals = np.diff(_starts)
+            _payload["fps"] = float(len(_intervals)/(_starts[-1] - _starts[0]))
+            _payload["jitter_ms"] = float(np.std(_intervals) * 1000)
+
+        if self._frame_times:
+            _times = np.array(self._frame_times) * 1000
+            _payload["frame_time_ms"] = {"mean": float(_times.mean()), "max": float(_times.max())}
+
+        return _payload
+
+    def _on_request(self) -> None:
+        if not self._running:
+            self._pending = False
+            return
+
+        # Cap frame rate. Run the pending frame once the period has elapsed
+        _wait = self._last_frame + self.period - time.perf_counter()
+        if _wait > 0 or self._in_frame:         # processEvents() of the running frame delivered the request
+            _wait = max(_wait, 0.001)
+            if not self._timer.isActive():
+                self._timer.start(int(np.ceil(_wait * 1000)))
+            return
+
+        self._pending = False
+        self._run_frame()
+
+    def _on_timer(self) -> None:
+        if not self._running:
+            return
+
+        if self.mode == "data":
+            if self._in_frame:
+                self._timer.start(1)
+                return
+            self._pending = False
+            self._run_frame()
+            return
+
+        _start = self._run_frame()
+        _duration = time.perf_counter() - _start
+        _period = self.period
+
+        # Next deadline. Skip the ones this frame overran
+        self._next_deadline += _period
+        _now = time.perf_counter()
+        if _now > self._next_deadline:
+            _skipped = int((_now - self._next_deadline) // _period) + 1
+            self.missed_deadlines += _skipped
+            self._next_deadline += _skipped * _period
+
+        self._adapt(_duration, _period)
+        self._arm()
+
+    def _adapt(self, duration: float, period: float) -> None:
+        ''' Double the period after repeated overruns, halve it again once frames fit.
+        '''
+        if duration > period:
+            self._overruns += 1
+            self._headroom = 0
+        elif duration < period/4:
+            self._headroom += 1
+            self._overruns = 0
+        else:
+            self._overruns = 0
+            self._headroom = 0
+
+        if self._overruns >= 5 and self.divisor < 8:
+            self.divisor *= 2
+            self._overruns = 0
+        elif self._headroom >= 120 and self.divisor > 1:
+            self.divisor //= 2
+            self._headroom = 0
+
+    def _arm(self) -> None:
+        _wait = max(0.0, self._next_deadline - time.perf_counter())
+        self._timer.start(int(_wait * 1000))
+
+    def _run_frame(self) -> float:
+        _start = time.perf_counter()
+        self._last_frame = _start
+        self._in_frame = True
+        try:
+            self.frame_fn()
+        finally:
+            self._in_frame = False
+        _end = time.perf_counter()
+
+        self._frame_starts.append(_start)
+        self._frame_times.append(_end - _start)
+        self.frame_count += 1
+        return _start
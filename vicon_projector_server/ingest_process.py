@@ -0,0 +1,338 @@
+import multiprocessing
+import os
+import sys
+import time
+from queue import Empty
+from threading import Lock, Thread
+from typing import Callable
+
+from .position_buffer import Shared_Position_Buffer, sample_time
+from .tracker_log import Tracker_Recorder, Tracker_Replayer
+from .tracker_pool import Tracker_Pool
+from .tracking_source import Tracking_Source
+from .vicon_ingest import Vicon_Ingest
+
+
+class Remote_Source(Tracking_Source):
+    '''Placeholder receiver of the GUI process when trackers run in an :obj:`Ingest_Process`.
+
+    Opens no connection and delivers nothing: items keep their ``set_vicon_tracker``
+    bookkeeping, the samples are written to their slots by the worker process.
+
+    Parameters:
+        tracker_name(str): Name of the tracker. Eg: tracker@ip_address
+    '''
+    def __init__(self, tracker_name: str):
+
+        self.tracker_name = tracker_name
+
+    def register_change_handler(self, userdata, callback: Callable, kind: str, sensor: int = None) -> None:
+        pass
+
+    def mainloop(self) -> None:
+        pass
+
+
+class _Route:
+    '''Writes the samples of one subscription into a slot of the shared buffer (worker side).
+    '''
+    def __init__(self, position_buffer: Shared_Position_Buffer, lock: Lock, slot: int, tracking_offset):
+
+        self.position_buffer = position_buffer
+        self.lock = lock
+        self.slot = slot
+        self.tracking_offset = tracking_offset
+        self.active = True
+
+    def position(self, userdata, data) -> None:
+        with self.lock:
+            if self.active:
+                self.position_buffer.write_position(self.slot,
+                                                    data['position'][0] + self.tracking_offset[0],
+                                                    data['position'][1] + self.tracking_offset[1],
+                                                    sample_time(data))
+
+    def velocity(self, userdata, data) -> None:
+        with self.lock:
+            if self.active:
+                self.position_buffer.write_velocity(self.slot, data['velocity'][0], data['velocity'][1])
+
+
+class _Ingest_Worker:
+    '''Tracker pool and ingest loop of the worker process. Commands come from :obj:`Ingest_Process`.
+    '''
+    def __init__(self, buffer_name: str, capacity: int, notify, max_sleep: float, replay: dict):
+
+        self.position_buffer = Shared_Position_Buffer(capacity, name=buffer_name)
+        self.pool = Tracker_Pool()
+        if replay:
+            Tracker_Replayer(**replay).install(self.pool)
+
+        self.ingest = Vicon_Ingest(max_sleep=max_sleep)
+        self.ingest.on_data = self._notify
+        self.recorder = None
+        self.errors = []
+
+        self._notify_fd = notify.fileno()
+        os.set_blocking(self._notify_fd, False)
+
+        # item name -> [(tracker, route, kind, sensor)]
+        self._routes = {}
+        # Held by route writes. Unregistered routes never write again, so freed slots can be reused
+        self._lock = Lock()
+
+    def _notify(self) -> None:
+        try:
+            os.write(self._notify_fd, b"\0")
+        except BlockingIOError:
+            pass        # GUI has pending notifications. One is enough
+
+    def register(self, name: str, routes: list) -> None:
+        self.unregister(name)
+
+        _subscriptions = []
+        self._routes[name] = _subscriptions
+        for _tracker_name, _kind, _sensor, _slot, _offset in routes:
+            _tracker = self.pool.acquire(_tracker_name)
+            if _tracker not in self.ingest.trackers:
+                self.ingest.add_tracker(_tracker)
+
+            _route = _Route(self.position_buffer, self._lock, _slot, _offset)
+            _tracker.register_change_handler(None, getattr(_route, _kind), _kind, _sensor)
+            _subscriptions.append((_tracker, _route, _kind, _sensor))
+
+    def unregister(self, name: str) -> None:
+        _subscriptions = self._routes.pop(name, [])
+        with self._lock:
+            for _, _route, _, _ in _subscriptions:
+                _route.active = False
+
+        for _tracker, _route, _kind, _sensor in _subscriptions:
+            _tracker.unregister_change_handler(None, getattr(_route, _kind), _kind, _sensor)
+            if self.pool.release(_tracker):
+                self.ingest.remove_tracker(_tracker)
+
+    def start_tracker_recording(self, filename: str, capacity: int) -> None:
+        if self.recorder is not None:
+            raise RuntimeError(f"Already recording to '{self.recorder.filename}'")
+
+        self.recorder = Tracker_Recorder(filename, capacity=capacity)
+        self.pool.set_recorder(self.recorder)
+
+    def stop_tracker_recording(self) -> dict:
+        _recorder = self.recorder
+        if _recorder is None:
+            raise RuntimeError("Not recording")
+
+        self.pool.set_recorder(None)
+        self.recorder = None
+        _stats = {"filename": _recorder.filename, "records": _recorder.count, "dropped": _recorder.dropped}
+        _recorder.close()
+        return _stats
+
+    def get_stats(self) -> dict:
+        return {"trackers": self.pool.get_tracker_names(),
+                "items": len(self._routes),
+                "callbacks": self.ingest.callback_count,
+                "pumps": self.ingest.pump_count,
+                "recording": self.recorder is not None,
+                "errors": self.errors[-10:]}
+
+    def run(self, commands, replies) -> None:
+        _ingest_thread = Thread(target=self.ingest.run, daemon=True)
+        _ingest_thread.start()
+
+        _parent = multiprocessing.parent_process()
+        while True:
+            try:
+                _command = commands.get(timeout=1.0)
+            except Empty:
+                if _parent is not None and not _parent.is_alive():
+                    break
+                continue
+            if _command is None:
+                break
+
+            # Request id: None for calls without reply
+            _method, _args, _id = _command
+            try:
+                _result = ("ok", getattr(self, _method)(*_args))
+            except Exception as e:
+                _result = ("error", f"{type(e).__name__}: {e}")
+                if _id is None:
+                    self.errors.append(f"{_method}: {_result[1]}")
+                    print(f"Ingest process: {_method} failed. {_result[1]}", file=sys.stderr)
+            if _id is not None:
+                replies.put((_id, *_result))
+
+        self.ingest.stop()
+        _ingest_thread.join()
+        for _name in list(self._routes):
+            self.unregister(_name)
+        if self.recorder is not None:
+            self.stop_tracker_recording()
+        self.position_buffer.close()
+
+
+def _run_worker(buffer_name, capacity, commands, replies, notify, max_sleep, replay) -> None:
+    _Ingest_Worker(buffer_name, capacity, notify, max_sleep, replay).run(commands, replies)
+
+
+class Ingest_Process:
+    '''Runs every tracker connection in a separate worker process.
+
+    VRPN parsing and tracking callbacks no longer share the GIL with the render thread.
+    The worker writes positions, velocities and timestamps straight into the slots of a
+    :obj:`Shared_Position_Buffer`; the render tick reads them with its usual ``snapshot``,
+    without messages or copies between the processes.
+
+    Items keep using ``set_vicon_tracker``: ``install`` points the GUI side pool to
+    :obj:`Remote_Source` placeholders, and ``register`` sends the item's subscriptions
+    (``get_tracking_routes``) to the worker, which opens and pumps the connections. Only the
+    default tracking callbacks can be routed, and ``tracking_offset`` is read when the item
+    is registered.
+
+    The worker is started with the ``spawn`` method: scripts starting the server need the
+    ``if __name__ == "__main__":`` guard.
+
+    Parameters:
+        position_buffer(Shared_Position_Buffer): Table written by the worker
+        max_sleep(float): Longest wait between polls of the worker ingest loop (in seconds). Default: 0.005
+        replay(dict): :obj:`Tracker_Replayer` parameters (``filename``, ``speed``, ``loop``) of the worker pool. Default: None
+        timeout(float): Longest wait for the worker to answer a call (in seconds). Default: 5.0
+
+    Attributes:
+        process(multiprocessing.Process): Worker process
+        on_data(function): Called (from the ``run()`` thread) after the worker wrote new samples. Default: None
+    '''
+    def __init__(self, position_buffer: Shared_Position_Buffer,
+                max_sleep: float = 0.005,
+                replay: dict = None,
+                timeout: float = 5.0):
+
+        self.timeout = timeout
+        self.on_data = None
+
+        _context = multiprocessing.get_context("spawn")
+        self._commands = _context.Queue()
+        self._replies = _context.Queue()
+        self._notify, _notify_writer = _context.Pipe(duplex=False)
+        self._call_lock = Lock()
+        self._call_id = 0
+
+        self.process = _context.Process(target=_run_worker, name="vicon_ingest", daemon=True,
+                                        args=(position_buffer.name, position_buffer.capacity, self._commands,
+                                            self._replies, _notify_writer, max_sleep, replay))
+        self.process.start()
+
+        # Only the worker writes. Reads see end of file once it exits
+        _notify_writer.close()
+
+    @staticmethod
+    def create_source(tracker_name: str) -> Tracking_Source:
+        ''' Receiver factory of the GUI side pool. Check ``install``.
+
+        Parameters:
+            tracker_name(str): Name of the tracker
+
+        Returns:
+            Tracking_Source: :obj:`Remote_Source` placeholder
+        '''
+        return Remote_Source(tracker_name)
+
+    def install(self, pool: 'Tracker_Pool') -> None:
+        ''' Stop ``pool`` from opening connections in this process. Trackers acquired afterwards are placeholders.
+
+        Parameters:
+            pool(Tracker_Pool): Pool used by the items. Eg: ``default_tracker_pool``
+        '''
+        pool.factory = self.create_source
+
+    def register(self, name: str, routes: list) -> None:
+        ''' Subscribe the slots of an item in the worker. Replaces previous routes of the item.
+
+        Errors (eg. unreachable tracker) are reported by the worker. Check ``get_stats``.
+
+        Parameters:
+            name(str): Item name
+            routes(list): Subscriptions from the item's ``get_tracking_routes``
+        '''
+        self._commands.put(("register", (name, routes), None))
+
+    def unregister(self, name: str) -> None:
+        ''' Unsubscribe an item. Returns once the worker stopped writing its slots, so they can be freed.
+
+        Parameters:
+            name(str): Item name
+        '''
+        self.call("unregister", name)
+
+    def call(self, method: str, *args):
+        ''' Run a worker method and wait for the result.
+
+        Parameters:
+            method(str): "unregister", "start_tracker_recording", "stop_tracker_recording" or "get_stats"
+            args: Method arguments
+
+        Returns:
+            Result of the method. Worker errors are raised as RuntimeError.
+        '''
+        with self._call_lock:
+            if not self.process.is_alive():
+                raise RuntimeError(f"Ingest process is not running (exit code: {self.process.exitcode})")
+
+            self._call_id += 1
+            _id = self._call_id
+            self._commands.put((method, args, _id))
+
+            # Replies of calls that timed out earlier arrive late: skip them
+            _deadline = time.monotonic() + self.timeout
+            while True:
+                try:
+                    _reply_id, _status, _result = self._replies.get(timeout=max(_deadline - time.monotonic(), 0))
+                except Empty:
+                    raise RuntimeError(f"Ingest process did not answer '{method}' within {self.timeout} s")
+                if _reply_id == _id:
+                    break
+
+        if _status == "error":
+            raise RuntimeError(_result)
+        return _result
+
+    def get_stats(self) -> dict:
+        ''' Worker counters.
+
+        Returns:
+            dict: ``pid``, ``trackers`` (open connections), ``items``, ``callbacks``, ``pumps``, ``recording`` and recent ``errors``
+        '''
+        return {"pid": self.process.pid, **self.call("get_stats")}
+
+    def run(self) -> None:
+        ''' Forward worker notifications to ``on_data``. Blocks until the worker exits.
+
+        This function needs to run in a seperate thread.
+        '''
+        _fd = self._notify.fileno()
+        while True:
+            try:
+                _data = os.read(_fd, 4096)
+            except OSError:
+                break
+            if not _data:
+                break
+
+            if self.on_data is not None:
+                self.on_data()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        ''' Close the worker connections and stop the worker process.
+
+        Parameters:
+            timeout(float): Longest wait before the worker is terminated (in seconds). Default: 5.0
+        '''
+        if self.process.is_alive():
+            self._commands.put(None)
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join()
@@ -0,0 +1,195 @@
+import json
+import time
+from threading import Lock
+import numpy as np
+
+
+class Latency_Tracer:
+    '''Motion-to-photon latency histograms.
+
+    Timestamps recorded for every rendered slot:
+        * ``sample``: VRPN sample time (sender clock)
+        * ``callback``: Sample written by the tracking callback
+        * ``pickup``: Render tick started (``position_update``)
+        * ``update``: Graphic item updated (``position_updater``/``setRect``)
+        * ``paint``: Canvas paint completed
+
+    Stage latencies (differences of consecutive timestamps, plus ``total = paint - sample``)
+    are accumulated into fixed, log-spaced histograms, globally and per item. Recording is a
+    few vectorized NumPy operations per frame.
+
+    Parameters:
+        enabled(bool): Record latencies. Default: False
+        min_latency(float): Lower edge of the histogram, in seconds. Default: 1e-5
+        max_latency(float): Upper edge of the histogram, in seconds. Default: 10.0
+        bins(int): Number of histogram bins. Default: 100
+    '''
+    STAGES = ("transport", "queue", "update", "paint", "total")
+
+    def __init__(self, enabled: bool = False,
+                min_latency: float = 1e-5,
+                max_latency: float = 10.0,
+                bins: int = 100):
+
+        self.enabled = enabled
+        self.edges = np.logspace(np.log10(min_latency), np.log10(max_latency), bins + 1)
+
+        self._lock = Lock()
+        self._global = self._new_histogram()
+        self._items = {}
+
+        # Frame waiting for its paint
+        self._pending = []
+        self._pickup = None
+        self.unpainted_frames = 0
+
+    def begin_frame(self, pickup_time: float) -> None:
+        '''Start of a render tick.
+
+        Parameters:
+            pickup_time(float): Tick start (seconds since epoch)
+        '''
+        if self._pending:
+            # Previous frame was never painted (nothing visible changed on screen)
+            self.unpainted_frames += 1
+            self._pending = []
+        self._pickup = pickup_time
+
+    def item_updated(self, name: str, slots: np.ndarray, snapshot: 'Position_Snapshot') -> None:
+        '''An item was updated in the current render tick.
+
+        Parameters:
+            name(str): Item name
+            slots(numpy.ndarray): Item slots
+            snapshot(Position_Snapshot): Snapshot used by the tick
+        '''
+        self._pending.append((name,
+                            snapshot.timestamp[slots],
+                            snapshot.receive_time[slots],
+                            time.time()))
+
+    def paint_completed(self, paint_time: float = None) -> None:
+        '''Canvas paint finished. Records the pending frame.
+
+        Parameters:
+            paint_time(float): Paint completion time (seconds since epoch). Default: current time
+        '''
+        if not self._pending:
+            return
+        if paint_time is None:
+            paint_time = time.time()
+
+        _pending, self._pending = self._pending, []
+
+        with self._lock:
+            for name, sample, callback, update in _pending:
+                _stages = np.empty((len(self.STAGES), len(sample)), dtype=np.float64)
+                _stages[0] = callback - sample
+                _stages[1] = self._pickup - callback
+                _stages[2] = update - self._pickup
+                _stages[3] = paint_time - update
+                _stages[4] = paint_time - sample
+
+                self._add(self._global, _stages)
+                if name not in self._items:
+                    self._items[name] = self._new_histogram()
+                self._add(self._items[name], _stages)
+
+    def forget(self, name: str) -> None:
+        '''Drop the histograms of an item.
+
+        Parameters:
+            name(str): Item name
+        '''
+        with self._lock:
+            self._items.pop(name, None)
+
+    def reset(self) -> None:
+        '''Clear all histograms.
+        '''
+        with self._lock:
+            self._global = self._new_histogram()
+            self._items = {}
+            self.unpainted_frames = 0
+
+    def get_stats(self, name: str = None) -> dict:
+        '''Latency summary per stage (milliseconds).
+
+        Parameters:
+            name(str): Item name. Default: None (all items)
+
+        Returns:
+            dict: ``{stage: {count, mean, p50, p90, p99, max}}``
+        '''
+        with self._lock:
+            if name is None:
+                _histogram = self._global
+            elif name in self._items:
+                _histogram = self._items[name]
+            else:
+                raise NameError(f"No latency data for item (Name: '{name}')")
+
+            return {stage: self._summary(_histogram, i) for i, stage in enumerate(self.STAGES)}
+
+    def dump(self, filename: str) -> None:
+        '''Write all histograms to a JSON file.
+
+        Parameters:
+            filename(str): Output file
+        '''
+        with self._lock:
+            _payload = {
+                "stages": list(self.STAGES),
+                "edges_s": self.edges.tolist(),
+                "unpainted_frames": self.unpainted_frames,
+                "global": self._serialize(self._global),
+                "items": {name: self._serialize(h) for name, h in self._items.items()},
+            }
+
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(_payload, f, indent=4)
+
+    def _new_histogram(self) -> dict:
+        _stages = len(self.STAGES)
+        return {
+            "counts": np.zeros((_stages, len(self.edges) + 1), dtype=np.int64),  # + under/overflow
+            "sum": np.zeros(_stages, dtype=np.float64),
+            "max": np.zeros(_stages, dtype=np.float64),
+        }
+
+    def _add(self, histogram: dict, stages: np.ndarray) -> None:
+        _bins = np.searchsorted(self.edges, stages)
+        for i in range(len(self.STAGES)):
+            histogram["counts"][i] += np.bincount(_bins[i], minlength=len(self.edges) + 1)
+        histogram["sum"] += stages.sum(axis=1)
+        histogram["max"] = np.maximum(histogram["max"], stages.max(axis=1))
+
+    def _summary(self, histogram: dict, stage: int) -> dict:
+        _counts = histogram["counts"][stage]
+        _total = int(_counts.sum())
+        if not _total:
+            return {"count": 0, "mean": None, "p50": None, "p90": None, "p99": None, "max": None}
+
+        # Percentile = upper edge of the bin containing it, bounded by the recorded max
+        _max = histogram["max"][stage]
+        _upper = np.minimum(np.append(self.edges, _max), _max)
+        _cumulative = np.cumsum(_counts)
+
+        def _percentile(q):
+            return float(_upper[np.searchsorted(_cumulative, q * _total)] * 1000)
+
+        return {
+            "count": _total,
+            "mean": float(histogram["sum"][stage] / _total * 1000),
+            "p50": _percentile(0.50),
+            "p90": _percentile(0.90),
+            "p99": _percentile(0.99),
+            "max": float(histogram["max"][stage] * 1000),
+        }
+
+    def _serialize(self, histogram: dict) -> dict:
+        return {
+            "counts": histogram["counts"].tolist(),
+            "sum_s": histogram["sum"].tolist(),
+            "max_s": histogram["max"].tolist(),
+        }
@@ -0,0 +1,288 @@
+import heapq
+import time
+from multiprocessing import shared_memory
+from threading import Lock
+import numpy as np
+
+
+def sample_time(data: dict) -> float:
+    '''Timestamp of a VRPN sample in seconds since epoch.
+
+    Parameters:
+        data(dict): Vicon Data
+
+    Returns:
+        float: Sample time. Falls back to the current time if the sample has none.
+    '''
+    _time = data.get('time')
+    if _time is None:
+        return time.time()
+    if hasattr(_time, "timestamp"):
+        return _time.timestamp()
+    return float(_time)
+
+
+class Position_Snapshot:
+    '''Consistent copy of a :obj:`Position_Buffer`, taken once per frame.
+
+    Attributes:
+        position(numpy.ndarray): Position of each slot. Shape (N,2)
+        velocity(numpy.ndarray): Velocity of each slot. Shape (N,2)
+        timestamp(numpy.ndarray): Sample time of each slot (seconds since epoch). Shape (N,)
+        receive_time(numpy.ndarray): Time the sample entered the tracking callback (seconds since epoch). Shape (N,)
+        sequence(numpy.ndarray): Write sequence of each slot. Changes on every write. Shape (N,)
+    '''
+    def __init__(self, capacity: int):
+
+        self._position = np.zeros((capacity, 2), dtype=np.float64)
+        self._velocity = np.zeros((capacity, 2), dtype=np.float64)
+        self._timestamp = np.zeros(capacity, dtype=np.float64)
+        self._receive_time = np.zeros(capacity, dtype=np.float64)
+        self._sequence = np.zeros(capacity, dtype=np.uint64)
+
+        self.resize(0)
+
+    def resize(self, count: int) -> None:
+        self.position = self._position[:count]
+        self.velocity = self._velocity[:count]
+        self.timestamp = self._timestamp[:count]
+        self.receive_time = self._receive_time[:count]
+        self.sequence = self._sequence[:count]
+
+
+class Position_Buffer:
+    '''Preallocated position table shared between tracking callbacks and the GUI thread.
+
+    Every item gets a slot. Writers (tracking callbacks) overwrite the slot in place,
+    latest wins, without allocating. Each slot is guarded by a sequence counter
+    (seqlock): it is odd while a write is in progress and is bumped twice per write.
+    The renderer takes a lock-free ``snapshot`` of all slots in one pass and only
+    re-reads the slots that were written during the copy.
+
+    Parameters:
+        capacity(int): Number of slots. Default: 16384
+
+    Attributes:
+        position(numpy.ndarray): Position of each slot. Shape (capacity,2)
+        velocity(numpy.ndarray): Velocity of each slot. Shape (capacity,2)
+        timestamp(numpy.ndarray): Sample time of each slot (seconds since epoch). Shape (capacity,)
+        receive_time(numpy.ndarray): Time the sample was written (seconds since epoch). Shape (capacity,)
+        sequence(numpy.ndarray): Seqlock counter of each slot. Shape (capacity,)
+    '''
+    def __init__(self, capacity: int = 16384):
+
+        self.capacity = capacity
+        self._create_table(capacity)
+
+        # Number of slots in use, including freed slots below the highest allocated one
+        self.count = 0
+
+        self._free = list(range(capacity))
+        self._allocated = np.zeros(capacity, dtype=bool)
+
+        # Serializes writers only. Readers never take it.
+        self._write_lock = Lock()
+        self._alloc_lock = Lock()
+
+        self._snapshot = Position_Snapshot(capacity)
+
+    def _create_table(self, capacity: int) -> None:
+        self.position = np.zeros((capacity, 2), dtype=np.float64)
+        self.velocity = np.zeros((capacity, 2), dtype=np.float64)
+        self.timestamp = np.zeros(capacity, dtype=np.float64)
+        self.receive_time = np.zeros(capacity, dtype=np.float64)
+        self.sequence = np.zeros(capacity, dtype=np.uint64)
+
+    def allocate(self, count: int = 1) -> np.ndarray:
+        '''Reserve slots. Lowest free slots are used first to keep the table dense.
+
+        Parameters:
+            count(int): Number of slots. Default: 1
+
+        Returns:
+            numpy.ndarray: Slot indices
+        '''
+        with self._alloc_lock:
+            if count > len(self._free):
+                raise MemoryError(f"Position buffer is full ({self.capacity} slots).")
+
+            _slots = np.array([heapq.heappop(self._free) for _ in range(count)], dtype=np.intp)
+            self._allocated[_slots] = True
+            if len(_slots):
+                self.count = max(self.count, int(_slots.max()) + 1)
+            return _slots
+
+    def free(self, slots) -> None:
+        '''Return slots to the buffer.
+
+        Parameters:
+            slots(numpy.ndarray): Slot indices from ``allocate``
+        '''
+        with self._alloc_lock:
+            for _slot in np.atleast_1d(slots).tolist():
+                if self._allocated[_slot]:
+                    self._allocated[_slot] = False
+                    heapq.heappush(self._free, _slot)
+
+            _used = np.flatnonzero(self._allocated[:self.count])
+            self.count = int(_used[-1]) + 1 if len(_used) else 0
+
+    def write_position(self, slot: int, x: float, y: float, stamp: float) -> None:
+        '''Write the position of a slot. Called from tracking callbacks.
+
+        Parameters:
+            slot(int): Slot index
+            x(float): X position
+            y(float): Y position
+            stamp(float): Sample time (seconds since epoch)
+        '''
+        _received = time.time()
+        with self._write_lock:
+            self.sequence[slot] += 1
+            self.position[slot, 0] = x
+            self.position[slot, 1] = y
+            self.timestamp[slot] = stamp
+            self.receive_time[slot] = _received
+            self.sequence[slot] += 1
+
+    def write_velocity(self, slot: int, vx: float, vy: float) -> None:
+        '''Write the velocity of a slot. Called from tracking callbacks.
+
+        Parameters:
+            slot(int): Slot index
+            vx(float): X velocity
+            vy(float): Y velocity
+        '''
+        with self._write_lock:
+            self.sequence[slot] += 1
+            self.velocity[slot, 0] = vx
+            self.velocity[slot, 1] = vy
+            self.sequence[slot] += 1
+
+    def write_positions(self, slots: np.ndarray, positions: np.ndarray, stamps = None) -> None:
+        '''Bulk position write.
+
+        Parameters:
+            slots(numpy.ndarray): Slot indices. Shape (N,)
+            positions(numpy.ndarray): Positions. Shape (N,2)
+            stamps(float|numpy.ndarray): Sample time(s). Default: current time
+        '''
+        _received = time.time()
+        if stamps is None:
+            stamps = _received
+
+        with self._write_lock:
+            self.sequence[slots] += 1
+            self.position[slots] = positions
+            self.timestamp[slots] = stamps
+            self.receive_time[slots] = _received
+            self.sequence[slots] += 1
+
+    def read(self, slot: int):
+        '''Consistent read of a single slot.
+
+        Parameters:
+            slot(int): Slot index
+
+        Returns:
+            tuple: (position, velocity, timestamp, receive_time, sequence)
+        '''
+        while True:
+            _sequence = int(self.sequence[slot])
+            if _sequence & 1:
+                continue
+
+            _position = self.position[slot].copy()
+            _velocity = self.velocity[slot].copy()
+            _timestamp = float(self.timestamp[slot])
+            _receive_time = float(self.receive_time[slot])
+
+            if int(self.sequence[slot]) == _sequence:
+                return _position, _velocity, _timestamp, _receive_time, _sequence
+
+    def snapshot(self) -> Position_Snapshot:
+        '''Consistent copy of all slots in use. Called from the GUI thread once per frame.
+
+        The returned arrays are reused by the next call.
+
+        Returns:
+            Position_Snapshot: Snapshot of slots ``0..count``
+        '''
+        _count = self.count
+        _snap = self._snapshot
+        _snap.resize(_count)
+
+        np.copyto(_snap.sequence, self.sequence[:_count])
+        np.copyto(_snap.position, self.position[:_count])
+        np.copyto(_snap.velocity, self.velocity[:_count])
+        np.copyto(_snap.timestamp, self.timestamp[:_count])
+        np.copyto(_snap.receive_time, self.receive_time[:_count])
+
+        # Slots written during the copy (or mid-write when it started) are re-read
+        _torn = (_snap.sequence != self.sequence[:_count]) | ((_snap.sequence & 1) == 1)
+        for _slot in np.flatnonzero(_torn).tolist():
+            (_snap.position[_slot], _snap.velocity[_slot], _snap.timestamp[_slot],
+                _snap.receive_time[_slot], _snap.sequence[_slot]) = self.read(_slot)
+
+        return _snap
+
+
+class Shared_Position_Buffer(Position_Buffer):
+    ''':obj:`Position_Buffer` whose table lives in a ``multiprocessing.shared_memory`` block.
+
+    The process that creates the buffer owns the block (and the slot allocation). Other
+    processes attach to it by ``name`` and write slots in place, eg. the tracker process of
+    :obj:`Ingest_Process`. Readers see the writes without any copy or message; ``snapshot``
+    uses the same seqlock as in a single process. Each slot should have a single writing process.
+
+    Parameters:
+        capacity(int): Number of slots. Default: 16384
+        name(str): Shared memory block to attach to. Default: None (create a new block)
+
+    Attributes:
+        name(str): Name of the shared memory block. Pass it to the other processes.
+    '''
+    # (column, dtype, shape per slot) of the shared table
+    _COLUMNS = (("position", np.float64, (2,)),
+                ("velocity", np.float64, (2,)),
+                ("timestamp", np.float64, ()),
+                ("receive_time", np.float64, ()),
+                ("sequence", np.uint64, ()))
+
+    def __init__(self, capacity: int = 16384, name: str = None):
+
+        _size = sum(capacity * int(np.prod(shape, dtype=int)) * np.dtype(dtype).itemsize
+                    for _, dtype, shape in self._COLUMNS)
+        self._owner = name is None
+        self._shared_memory = shared_memory.SharedMemory(name=name, create=self._owner, size=_size)
+        self.name = self._shared_memory.name
+
+        super().__init__(capacity)
+
+    def _create_table(self, capacity: int) -> None:
+        _offset = 0
+        for _column, _dtype, _shape in self._COLUMNS:
+            _array = np.ndarray((capacity,) + _shape, dtype=_dtype, buffer=self._shared_memory.buf, offset=_offset)
+            if self._owner:
+                _array[:] = 0
+            setattr(self, _column, _array)
+            _offset += _array.nbytes
+
+    def unlink(self) -> None:
+        '''Remove the shared memory block (owner only). Mappings stay usable until ``close``, no new process can attach.
+        '''
+        if self._owner:
+            self._owner = False
+            self._shared_memory.unlink()
+
+    def close(self) -> None:
+        '''Detach from the shared memory block. The owner also removes the block.
+
+        The buffer can not be used afterwards.
+        '''
+        for _column, _, _ in self._COLUMNS:
+            setattr(self, _column, None)
+        self._snapshot = None
+
+        self._shared_memory.close()
+        self.unlink()
@@ -0,0 +1,159 @@
+import time
+import numpy as np
+
+
+class Position_Predictor:
+    '''Latency compensation for tracked positions.
+
+    Extrapolates every predicted slot of a :obj:`Position_Snapshot` to the time the
+    frame is expected to reach the projector::
+
+        display_time = now + render_latency + display_latency
+        position = position + velocity * (display_time - sample_time)
+
+    All slots are predicted in one vectorized pass per frame.
+
+    Modes (per slot):
+        * ``None``: No prediction.
+        * ``"constant_velocity"``: Uses the VRPN velocity (``enable_velocity=True`` in ``set_vicon_tracker``).
+        * ``"alpha_beta"``: Estimates velocity from the position samples with an alpha-beta filter.
+
+    Parameters:
+        capacity(int): Number of slots. Same as the :obj:`Position_Buffer`.
+        display_latency(float): Fixed latency after the frame is rendered (projector input lag), in seconds. Default: 0.0
+        max_horizon(float): Largest extrapolation, in seconds. Guards against stale samples and clock skew. Default: 0.1
+        latency_smoothing(float): Weight of a new render latency measurement (exponential moving average). Default: 0.1
+
+    Attributes:
+        render_latency(float): Measured latency from frame start to paint completion, in seconds.
+    '''
+    MODES = {None: 0, "constant_velocity": 1, "alpha_beta": 2}
+
+    def __init__(self, capacity: int,
+                display_latency: float = 0.0,
+                max_horizon: float = 0.1,
+                latency_smoothing: float = 0.1):
+
+        self.display_latency = display_latency
+        self.max_horizon = max_horizon
+        self.latency_smoothing = latency_smoothing
+        self.render_latency = 0.0
+
+        self.mode = np.zeros(capacity, dtype=np.int8)
+        self.alpha = np.full(capacity, 0.85, dtype=np.float64)
+        self.beta = np.full(capacity, 0.005, dtype=np.float64)
+
+        # Alpha-beta filter state
+        self._estimate = np.zeros((capacity, 2), dtype=np.float64)
+        self._estimate_velocity = np.zeros((capacity, 2), dtype=np.float64)
+        self._estimate_time = np.zeros(capacity, dtype=np.float64)
+
+        self._frame = 0
+
+    def configure(self, slots, mode: str = None, alpha: float = 0.85, beta: float = 0.005) -> None:
+        '''Set the prediction mode of slots.
+
+        Parameters:
+            slots(numpy.ndarray): Slot indices
+            mode(str): None, "constant_velocity" or "alpha_beta"
+            alpha(float): Alpha-beta position gain. Default: 0.85
+            beta(float): Alpha-beta velocity gain. Default: 0.005
+        '''
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown prediction mode '{mode}'. Use one of {list(self.MODES)}")
+
+        self.mode[slots] = self.MODES[mode]
+        self.alpha[slots] = alpha
+        self.beta[slots] = beta
+
+        # Restart the filter from the next sample
+        self._estimate_time[slots] = 0.0
+
+    def record_render_latency(self, latency: float) -> None:
+        '''Add a render latency measurement.
+
+        Parameters:
+            latency(float): Time from frame start to paint completion, in seconds.
+        '''
+        self.render_latency += self.latency_smoothing * (latency - self.render_latency)
+
+    def display_time(self, now: float = None) -> float:
+        '''Expected time the current frame is shown.
+
+        Parameters:
+            now(float): Frame start time (seconds since epoch). Default: current time
+
+        Returns:
+            float: Display time (seconds since epoch)
+        '''
+        if now is None:
+            now = time.time()
+        return now + self.render_latency + self.display_latency
+
+    def predict(self, snapshot: 'Position_Snapshot', display_time: float) -> None:
+        '''Extrapolate predicted slots of a snapshot, in place.
+
+        Moving slots get a new ``sequence`` every frame, so the render tick redraws them, until
+        their sample is ``max_horizon`` old (the prediction no longer moves).
+
+        Parameters:
+            snapshot(Position_Snapshot): Snapshot taken by the render tick
+            display_time(float): Target time (seconds since epoch). Check ``display_time``.
+        '''
+        _count = len(snapshot.sequence)
+        _mode = self.mode[:_count]
+        _active = np.flatnonzero(_mode)
+        if not len(_active):
+            return
+
+        self._frame += 1
+        _velocity = snapshot.velocity[_active].copy()
+
+        # Alpha-beta: update filter for slots with a new sample, then use its velocity
+        _is_filtered = _mode[_active] == self.MODES["alpha_beta"]
+        _filtered = _active[_is_filtered]
+        if len(_filtered):
+            self._update_filter(_filtered, snapshot)
+            _velocity[_is_filtered] = self._estimate_velocity[_filtered]
+
+            # Slots without a sample yet keep the measured position
+            _ready = _filtered[self._estimate_time[_filtered] > 0.0]
+            snapshot.position[_ready] = self._estimate[_ready]
+
+        _age = display_time - snapshot.timestamp[_active]
+        _horizon = np.clip(_age, 0.0, self.max_horizon)
+        snapshot.position[_active] += _velocity * _horizon[:, None]
+
+        # Force a redraw of slots whose prediction still moves. Past max_horizon the position is
+        # frozen and the slot falls back to its buffer sequence (one last redraw)
+        _moving = _active[np.any(_velocity != 0.0, axis=1) & (_age < self.max_horizon)]
+        snapshot.sequence[_moving] += np.uint64(2 * self._frame)
+
+    def _update_filter(self, slots: np.ndarray, snapshot: 'Position_Snapshot') -> None:
+        _stamp = snapshot.timestamp[slots]
+        _new = _stamp > self._estimate_time[slots]
+        if not np.any(_new):
+            return
+
+        slots = slots[_new]
+        _stamp = _stamp[_new]
+        _measured = snapshot.position[slots]
+
+        # First sample (or restarted filter): initialise from the measurement
+        _first = self._estimate_time[slots] == 0.0
+        if np.any(_first):
+            self._estimate[slots[_first]] = _measured[_first]
+            self._estimate_velocity[slots[_first]] = 0.0
+            self._estimate_time[slots[_first]] = _stamp[_first]
+
+        _update = ~_first
+        if np.any(_update):
+            _slots = slots[_update]
+            _dt = (_stamp[_update] - self._estimate_time[_slots])[:, None]
+
+            _predicted = self._estimate[_slots] + self._estimate_velocity[_slots] * _dt
+            _residual = _measured[_update] - _predicted
+
+            self._estimate[_slots] = _predicted + self.alpha[_slots, None] * _residual
+            self._estimate_velocity[_slots] += (self.beta[_slots, None] / _dt) * _residual
+            self._estimate_time[_slots] = _stamp[_update]
@@ -1,11 +1,20 @@
+import json
+
 from werkzeug.wrappers import Request, Response
 from werkzeug.serving import run_simple
 
-from jsonrpc import JSONRPCResponseManager, dispatcher
+from jsonrpc import JSONRPCResponseManager, Dispatcher
+from jsonrpc.exceptions import JSONRPCInvalidRequest, JSONRPCInvalidRequestException, JSONRPCParseError
+from jsonrpc.jsonrpc import JSONRPCRequest
+from jsonrpc.jsonrpc2 import JSONRPC20BatchResponse, JSONRPC20Response
 
 class JSON_RPC_Server:
     """ JSON RPC Server to expose canvas server methods.
 
+    Methods are registered once, in the constructor, into a dispatcher owned by this server.
+    JSON-RPC 2.0 batch requests are supported: each entry gets its own response (an invalid
+    entry gets an error, the others still run), notifications get none.
+
     """
 
     def __init__(self,projection_server, hostname:str,
@@ -20,21 +29,100 @@ class JSON_RPC_Server:
         # WSGI Server Port
         self.port       = 4000 if port is None else port
 
+        # Per server dispatcher. Read-only once registered, so safe to share between request threads
+        self.dispatcher = Dispatcher()
+        self.register_methods()
+
+    def register_methods(self):
+        """ Register projection server methods with the dispatcher. Called in constructor.
+        """
+        for method in (self.projection_server.test_connection,
+                    self.projection_server.remove_item,
+                    self.projection_server.hide_item,
+                    self.projection_server.add_items,
+                    self.projection_server.remove_items,
+                    self.projection_server.hide_items,
+                    self.projection_server.set_positions,
+                    self.projection_server.set_z_values,
+                    self.projection_server.get_all_plot_items,
+                    self.projection_server.get_scene_changes,
+                    self.projection_server.get_items_in_rect,
+                    self.projection_server.get_items_in_radius,
+                    self.projection_server.get_nearest_items,
+                    self.projection_server.add_rect_zone,
+                    self.projection_server.add_polygon_zone,
+                    self.projection_server.add_proximity_rule,
+                    self.projection_server.remove_trigger,
+                    self.projection_server.get_triggers,
+                    self.projection_server.get_trigger_events,
+                    self.projection_server.set_group_positions,
+                    self.projection_server.set_prediction,
+                    self.projection_server.set_udp_source,
+                    self.projection_server.get_udp_stats,
+                    self.projection_server.get_frame_stats,
+                    self.projection_server.grab_frame,
+                    self.projection_server.get_canvas_tiles,
+                    self.projection_server.get_subscription_stats,
+                    self.projection_server.get_texture_cache_stats,
+                    self.projection_server.get_ingest_stats,
+                    self.projection_server.enable_latency_tracing,
+                    self.projection_server.get_latency_stats,
+                    self.projection_server.dump_latency_stats,
+                    self.projection_server.reset_latency_stats,
+                    self.projection_server.start_tracker_recording,
+                    self.projection_server.stop_tracker_recording):
+            self.dispatcher.add_method(method)
+
+    def handle(self, request_data) -> str:
+        """ Handle a JSON-RPC request (single or batch).
+
+        Parameters:
+            request_data(str|bytes): JSON-RPC request payload
 
+        Returns:
+            str: JSON-RPC response payload. None if the request only contained notifications.
+        """
+        if isinstance(request_data, bytes):
+            request_data = request_data.decode("utf-8")
+        try:
+            _data = json.loads(request_data)
+        except (TypeError, ValueError):
+            return JSONRPC20Response(error=JSONRPCParseError()._data).json
+
+        # Batch. An empty batch is an invalid request
+        if isinstance(_data, list) and _data:
+            try:
+                _response = JSONRPCResponseManager.handle_request(JSONRPCRequest.from_data(_data), self.dispatcher)
+            except JSONRPCInvalidRequestException:
+                # Invalid entries: answer each entry on its own
+                _responses = [r for r in map(self._handle_entry, _data) if r is not None]
+                _response = JSONRPC20BatchResponse(*_responses) if _responses else None
+            return None if _response is None else _response.json
+
+        _response = self._handle_entry(_data)
+        return None if _response is None else _response.json
+
+    def _handle_entry(self, data):
+        ''' Response to a single request (a JSON object). None for notifications.
+        '''
+        try:
+            if not isinstance(data, dict):
+                raise JSONRPCInvalidRequestException()
+            _request = JSONRPCRequest.from_data(data)
+        except JSONRPCInvalidRequestException:
+            return JSONRPC20Response(error=JSONRPCInvalidRequest()._data)
+        return JSONRPCResponseManager.handle_request(_request, self.dispatcher)
     
     @Request.application
     def application(self,request):
 
-        response = JSONRPCResponseManager.handle(
-            request.data, dispatcher)
+        response = self.handle(request.data)
 
-        dispatcher.add_method(self.projection_server.test_connection)
-        dispatcher.add_method(self.projection_server.remove_item)
-        dispatcher.add_method(self.projection_server.hide_item)
-        dispatcher.add_method(self.projection_server.get_all_plot_items)
-        
+        # Notifications only. Nothing to return
+        if response is None:
+            return Response(status=204)
 
-        return Response(response.json, mimetype='application/json')
+        return Response(response, mimetype='application/json')
     
     # To start RPC Server
     def run(self):
@@ -42,4 +130,3 @@ class JSON_RPC_Server:
                 port = self.port, 
                 application = self.application,
                 threaded=True)
-
@@ -0,0 +1,95 @@
+from collections import deque
+
+
+class Scene_Change_Log:
+    '''Scene version and a bounded log of structural scene changes.
+
+    Every change gets the next scene version. Structural changes (``add``, ``remove``, ``hide``,
+    ``z``) are kept in a ring of ``max_changes`` entries. Moves happen every frame, so they are
+    coalesced instead: only the version of the last move of each item is kept (``moved``).
+
+    Used from the GUI thread only.
+
+    Parameters:
+        max_changes(int): Structural changes kept. Older versions get a full snapshot. Default: 10000
+
+    Attributes:
+        version(int): Current scene version. Starts at 0.
+        moved(dict): Item name -> version of its last move.
+    '''
+    def __init__(self, max_changes: int = 10000):
+
+        self.version = 0
+        self.moved = {}
+
+        self._changes = deque(maxlen=max_changes)
+
+        # Changes up to this version were dropped from the ring
+        self._truncated_version = 0
+
+    def record(self, op: str, name: str, **data) -> int:
+        ''' Record a structural change.
+
+        Parameters:
+            op(str): "add", "remove", "hide" or "z"
+            name(str): Item name
+            **data: Change details. Eg: ``visible=False``
+
+        Returns:
+            int: Version of the change
+        '''
+        self.version += 1
+
+        if len(self._changes) == self._changes.maxlen:
+            self._truncated_version = self._changes[0]["version"]
+
+        self._changes.append({"version": self.version, "op": op, "name": name, **data})
+
+        if op == "remove":
+            self.moved.pop(name, None)
+        return self.version
+
+    def next_version(self) -> int:
+        ''' New version for the moves of a frame. Check ``record_move``.
+
+        Returns:
+            int: New scene version
+        '''
+        self.version += 1
+        return self.version
+
+    def record_move(self, name: str, version: int) -> None:
+        ''' Record that an item moved in the frame of ``version``.
+
+        Parameters:
+            name(str): Item name
+            version(int): Version from ``next_version``
+        '''
+        self.moved[name] = version
+
+    def is_available(self, since_version: int) -> bool:
+        ''' True if every change after ``since_version`` is still in the log.
+
+        Parameters:
+            since_version(int): Version the client has
+        '''
+        return self._truncated_version <= since_version <= self.version
+
+    def changes_since(self, since_version: int) -> tuple:
+        ''' Changes after ``since_version``. Check ``is_available`` first.
+
+        Parameters:
+            since_version(int): Version the client has
+
+        Returns:
+            tuple: (structural changes (list[dict]) in version order, names of items moved since then (list[str]))
+        '''
+        _changes = []
+        for change in reversed(self._changes):
+            if change["version"] <= since_version:
+                break
+            _changes.append(change)
+        _changes.reverse()
+
+        _moved = [name for name, version in self.moved.items() if version > since_version]
+        return _changes, _moved
@@ -0,0 +1,257 @@
+import numpy as np
+
+
+class Spatial_Index:
+    '''Uniform grid over the slots of a :obj:`Position_Buffer`. Answers region queries and culls off-canvas items.
+
+    Every slot is a point (an item, or a member of a group) at its last measured position.
+    ``update`` is called by the render tick with the frame snapshot and only recomputes the
+    cells of the slots written since the previous frame. The cell table (slots sorted by cell)
+    is rebuilt lazily, on the first query after a change. Queries only visit the cells
+    overlapping the query region: cost grows with the points nearby, not with the number of items.
+
+    Points outside ``world`` are kept in the border cells, so queries outside the canvas stay exact.
+
+    Parameters:
+        world(tuple): Canvas rectangle (xmin, xmax, ymin, ymax)
+        capacity(int): Number of slots of the position buffer
+        cell_size(float): Side of a grid cell, in world units. Default: None (1/64 of the larger canvas side)
+
+    Attributes:
+        position(numpy.ndarray): Indexed position of each slot. Shape (capacity,2)
+        names(numpy.ndarray): Item name of each slot (None for free slots)
+        members(numpy.ndarray): Index of each slot in its item's slots
+        version(int): Changes on every indexed move, registration and removal
+        generation(int): Changes on every registration and removal
+    '''
+    def __init__(self, world: tuple, capacity: int, cell_size: float = None):
+
+        self.xmin, self.xmax, self.ymin, self.ymax = (float(v) for v in world)
+        if cell_size is None:
+            cell_size = max(self.xmax - self.xmin, self.ymax - self.ymin) / 64
+        self.cell_size = float(cell_size)
+        self.columns = max(1, int(np.ceil((self.xmax - self.xmin) / self.cell_size)))
+        self.rows = max(1, int(np.ceil((self.ymax - self.ymin) / self.cell_size)))
+
+        self.names = np.full(capacity, None, dtype=object)
+        self.members = np.zeros(capacity, dtype=np.intp)
+
+        self._active = np.zeros(capacity, dtype=bool)
+        self.position = np.zeros((capacity, 2), dtype=np.float64)
+        self._cell = np.zeros(capacity, dtype=np.intp)
+        self._sequence = np.zeros(capacity, dtype=np.uint64)
+        self._count = 0
+        self.version = 0
+        self.generation = 0
+
+        # Cell table: slots sorted by cell, and the start of each cell in it
+        self._sorted = np.zeros(0, dtype=np.intp)
+        self._starts = np.zeros(self.columns * self.rows + 1, dtype=np.intp)
+        self._dirty = False
+
+        # Drawn geometry of single slot items, for culling: position at the last
+        # position_updater and bounding rectangle offsets (left, right, bottom, top) from it
+        self._drawn = np.zeros((capacity, 2), dtype=np.float64)
+        self._extent = np.zeros((capacity, 4), dtype=np.float64)
+        self._has_extent = np.zeros(capacity, dtype=bool)
+
+    # Bookkeeping
+
+    def register(self, name: str, slots: np.ndarray) -> None:
+        ''' Add the slots of an item. Indexed on the next ``update``.
+
+        Parameters:
+            name(str): Item name
+            slots(numpy.ndarray): Item slots
+        '''
+        self.names[slots] = name
+        self.members[slots] = np.arange(len(slots))
+        self._active[slots] = True
+        self._has_extent[slots] = False
+        self._sequence[slots] = np.iinfo(np.uint64).max      # Never a written sequence: re-read
+        self._count = max(self._count, int(np.max(slots, initial=-1)) + 1)
+        self._dirty = True
+        self.version += 1
+        self.generation += 1
+
+    def unregister(self, slots: np.ndarray) -> None:
+        ''' Remove the slots of an item.
+
+        Parameters:
+            slots(numpy.ndarray): Item slots
+        '''
+        self.names[slots] = None
+        self._active[slots] = False
+        self._dirty = True
+        self.version += 1
+        self.generation += 1
+
+    def update(self, snapshot) -> int:
+        ''' Move the slots written since the previous call. Called by the render tick.
+
+        Parameters:
+            snapshot(Position_Snapshot): Snapshot of the frame, before prediction
+
+        Returns:
+            int: Number of slots whose position was updated
+        '''
+        _count = min(self._count, len(snapshot.sequence))
+        _changed = np.flatnonzero(snapshot.sequence[:_count] != self._sequence[:_count])
+        if not len(_changed):
+            return 0
+
+        self._sequence[_changed] = snapshot.sequence[_changed]
+        _position = snapshot.position[_changed]
+        self.position[_changed] = _position
+
+        _cell = self._cells(_position[:, 0], _position[:, 1])
+        if not self._dirty:
+            self._dirty = bool(np.any(_cell != self._cell[_changed]))
+        self._cell[_changed] = _cell
+        self.version += 1
+        return len(_changed)
+
+    def _cells(self, x, y) -> np.ndarray:
+        _column = np.clip(((x - self.xmin) // self.cell_size).astype(np.intp), 0, self.columns - 1)
+        _row = np.clip(((y - self.ymin) // self.cell_size).astype(np.intp), 0, self.rows - 1)
+        return _row * self.columns + _column
+
+    def _table(self) -> tuple:
+        if self._dirty:
+            _slots = np.flatnonzero(self._active[:self._count])
+            _order = np.argsort(self._cell[_slots], kind="stable")
+            self._sorted = _slots[_order]
+            self._starts = np.searchsorted(self._cell[self._sorted], np.arange(self.columns * self.rows + 1))
+            self._dirty = False
+        return self._sorted, self._starts
+
+    def _candidates(self, xmin: float, xmax: float, ymin: float, ymax: float) -> np.ndarray:
+        ''' Slots in the cells overlapping a rectangle.
+        '''
+        _sorted, _starts = self._table()
+        _c0, _c1 = np.clip(((np.array([xmin, xmax]) - self.xmin) // self.cell_size).astype(np.intp), 0, self.columns - 1)
+        _r0, _r1 = np.clip(((np.array([ymin, ymax]) - self.ymin) // self.cell_size).astype(np.intp), 0, self.rows - 1)
+
+        # Cells of a row are contiguous in the table
+        _rows = np.arange(_r0, _r1 + 1) * self.columns
+        _begin, _end = _starts[_rows + _c0], _starts[_rows + _c1 + 1]
+        if not len(_rows):
+            # Empty rectangle (eg. negative radius)
+            return np.zeros(0, dtype=np.intp)
+        if len(_rows) == 1:
+            return _sorted[_begin[0]:_end[0]]
+        return np.concatenate([_sorted[b:e] for b, e in zip(_begin.tolist(), _end.tolist())])
+
+    def active_slots(self) -> np.ndarray:
+        ''' Slots of the registered items.
+
+        Returns:
+            numpy.ndarray: Slot indices, sorted
+        '''
+        return np.flatnonzero(self._active[:self._count])
+
+    # Queries
+
+    def query_rect(self, xmin: float, xmax: float, ymin: float, ymax: float) -> np.ndarray:
+        ''' Slots inside a rectangle (edges included).
+
+        Returns:
+            numpy.ndarray: Slot indices
+        '''
+        _slots = self._candidates(xmin, xmax, ymin, ymax)
+        _position = self.position[_slots]
+        _inside = ((_position[:, 0] >= xmin) & (_position[:, 0] <= xmax)
+                    & (_position[:, 1] >= ymin) & (_position[:, 1] <= ymax))
+        return _slots[_inside]
+
+    def query_radius(self, x: float, y: float, radius: float) -> tuple:
+        ''' Slots within ``radius`` of a point, nearest first.
+
+        Returns:
+            tuple: (slots, distances)
+        '''
+        _slots = self._candidates(x - radius, x + radius, y - radius, y + radius)
+        _distance = np.hypot(self.position[_slots, 0] - x, self.position[_slots, 1] - y)
+        _inside = _distance <= radius
+        _slots, _distance = _slots[_inside], _distance[_inside]
+        _order = np.argsort(_distance, kind="stable")
+        return _slots[_order], _distance[_order]
+
+    def query_nearest(self, x: float, y: float, k: int = 1) -> tuple:
+        ''' The ``k`` slots nearest to a point, nearest first.
+
+        Rings of cells around the point are added until they hold ``k`` slots, then the
+        exact answer is found among the slots within the k-th candidate distance.
+
+        Returns:
+            tuple: (slots, distances)
+        '''
+        _sorted, _ = self._table()
+        if k <= 0 or not len(_sorted):
+            return np.zeros(0, dtype=np.intp), np.zeros(0)
+        if k >= len(_sorted):
+            _distance = np.hypot(self.position[_sorted, 0] - x, self.position[_sorted, 1] - y)
+            _order = np.argsort(_distance, kind="stable")
+            return _sorted[_order], _distance[_order]
+
+        _row, _column = divmod(int(self._cells(np.array([x]), np.array([y]))[0]), self.columns)
+        _cx = self.xmin + (_column + 0.5) * self.cell_size
+        _cy = self.ymin + (_row + 0.5) * self.cell_size
+        _ring = 0
+        while True:
+            _half = (_ring + 0.5) * self.cell_size
+            _slots = self._candidates(_cx - _half, _cx + _half, _cy - _half, _cy + _half)
+            if len(_slots) >= k:
+                break
+            _ring += 1
+
+        _distance = np.hypot(self.position[_slots, 0] - x, self.position[_slots, 1] - y)
+        _radius = np.partition(_distance, k - 1)[k - 1]
+        _slots, _distance = self.query_radius(x, y, _radius)
+        return _slots[:k], _distance[:k]
+
+    # Culling
+
+    def set_drawn(self, slot: int, position, rect) -> None:
+        ''' Record where a single slot item was drawn. Check ``is_culled``.
+
+        Parameters:
+            slot(int): Item slot
+            position(numpy.ndarray): Item position when drawn
+            rect(QtCore.QRectF): Drawn bounding rectangle, in world coordinates
+        '''
+        self._drawn[slot] = position
+        self._extent[slot] = (rect.left() - position[0], rect.right() - position[0],
+                            rect.top() - position[1], rect.bottom() - position[1])
+        self._has_extent[slot] = True
+
+    def is_culled(self, slot: int, position) -> bool:
+        ''' True if a single slot item was drawn outside the canvas and stays outside at ``position``.
+
+        Its graphic item does not need to be updated. Unknown until ``set_drawn`` was called once.
+
+        Parameters:
+            slot(int): Item slot
+            position(numpy.ndarray): New position
+
+        Returns:
+            bool: Skip the update
+        '''
+        if not self._has_extent[slot]:
+            return False
+        _left, _right, _bottom, _top = self._extent[slot].tolist()
+        for _x, _y in (self._drawn[slot].tolist(), (float(position[0]), float(position[1]))):
+            if (_x + _right >= self.xmin and _x + _left <= self.xmax
+                    and _y + _top >= self.ymin and _y + _bottom <= self.ymax):
+                return False
+        return True
+
+    def get_stats(self) -> dict:
+        ''' Index size.
+
+        Returns:
+            dict: ``slots`` indexed, ``cells`` (columns x rows) and ``cell_size``
+        '''
+        return {"slots": int(np.count_nonzero(self._active[:self._count])),
+                "cells": [self.columns, self.rows],
+                "cell_size": self.cell_size}
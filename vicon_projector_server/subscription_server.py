@@ -0,0 +1,304 @@
+import asyncio
+import json
+import time
+from threading import Event
+
+
+class _Subscriber:
+    '''State of one subscription connection.
+    '''
+    def __init__(self, writer, rate_hz: float):
+        self.writer = writer
+        self.names = set()
+        self.all_items = False
+        self.rate_hz = rate_hz
+
+        # Trigger events: None (off), True (all triggers) or a set of trigger names
+        self.events = None
+
+        # Last state sent to the client. Only differences are sent
+        self.sent = {}
+        self.next_send = 0.0
+        self.dropped = 0
+        self.wake = asyncio.Event()
+
+
+class Subscription_Server:
+    '''Push stream of item positions, visibility and timestamps.
+
+    Newline delimited JSON over TCP. A client sends commands, one per line:
+
+        * ``{"subscribe": ["name", ...], "rate_hz": 30}``. Use ``"*"`` instead of the list for all items.
+        * ``{"unsubscribe": ["name", ...]}`` (or ``"*"``)
+        * ``{"rate_hz": 10}``
+        * ``{"events": true}`` to receive trigger events (``false`` to stop, or a list of trigger names)
+
+    and receives updates, one per line, at most ``rate_hz`` times per second::
+
+        {"time": 1700000000.1, "items": {"name": {"position": [x,y], "visible": true, "timestamp": 1700000000.09}}, "removed": ["name"]}
+
+    Trigger events (check :obj:`Trigger_Engine`) are sent as soon as they happen, without rate limit::
+
+        {"events": [{"id": 1, "time": 1700000000.1, "trigger": "door", "event": "enter", "item": "name", "member": null}]}
+
+    Updates are delta encoded: an item (and each of its fields) is only sent when it changed since
+    the last update sent to that client. The render tick calls ``publish`` with the latest scene
+    state. Clients whose socket buffer is above ``high_water`` have updates dropped (counted in
+    ``get_stats``) instead of blocking the render loop; the next update sent to them carries every
+    change they missed.
+
+    Parameters:
+        hostname(str): Hostname. Default: "localhost"
+        port(int): TCP port. Default: 4001
+        default_rate_hz(float): Update rate of new subscriptions. Default: 30
+        max_rate_hz(float): Highest accepted update rate. Default: 240
+        high_water(int): Pending bytes above which a client's updates are dropped. Default: 256 KiB
+
+    Attributes:
+        interest_changed(bool): Subscriptions changed since the last ``publish``. The render tick publishes even if nothing moved.
+        on_interest_changed(function): Called (from the subscription thread) when subscriptions change. Default: None
+    '''
+    def __init__(self, hostname: str = None,
+                port: int = None,
+                default_rate_hz: float = 30.0,
+                max_rate_hz: float = 240.0,
+                high_water: int = 256*1024):
+
+        self.hostname = "localhost" if hostname is None else hostname
+        self.port = 4001 if port is None else port
+        self.default_rate_hz = default_rate_hz
+        self.max_rate_hz = max_rate_hz
+        self.high_water = high_water
+
+        self.loop = None
+        self.started = Event()
+
+        self._subscribers = set()
+        self._state = {}
+        self._state_time = 0.0
+
+        # Read by the render tick without locking. Replaced, never mutated
+        self._subscribed_names = frozenset()
+        self._all_items = False
+        self.interest_changed = False
+        self.on_interest_changed = None
+
+    @property
+    def has_subscribers(self) -> bool:
+        '''bool: True if any client subscribed to at least one item.
+        '''
+        return self._all_items or bool(self._subscribed_names)
+
+    def wants(self, name: str) -> bool:
+        ''' True if any client subscribed to the item. Called by the render tick.
+
+        Parameters:
+            name(str): Item name
+        '''
+        return self._all_items or name in self._subscribed_names
+
+    def publish(self, state: dict, publish_time: float = None) -> None:
+        ''' Hand the latest scene state to the subscription loop. Thread safe, never blocks.
+
+        Parameters:
+            state(dict): Item name -> ``{"position": list, "visible": bool, "timestamp": float}``.
+                        Items of interest only, check ``wants``.
+            publish_time(float): Time of the state (seconds since epoch). Default: current time
+        '''
+        if self.loop is None:
+            return
+        if publish_time is None:
+            publish_time = time.time()
+        self.interest_changed = False
+        self.loop.call_soon_threadsafe(self._on_publish, state, publish_time)
+
+    def publish_events(self, events: list) -> None:
+        ''' Send trigger events to the clients that asked for them. Thread safe, never blocks.
+
+        Parameters:
+            events(list): Events. Check :obj:`Trigger_Engine.get_events`
+        '''
+        if self.loop is None:
+            return
+        self.loop.call_soon_threadsafe(self._on_events, events)
+
+    def get_stats(self) -> dict:
+        '''Subscriber statistics.
+
+        Returns:
+            dict: ``clients`` and, per client, subscribed item count, rate and dropped updates.
+        '''
+        return {
+            "clients": len(self._subscribers),
+            "subscribers": [{"items": "*" if s.all_items else len(s.names),
+                            "rate_hz": s.rate_hz,
+                            "events": s.events is not None,
+                            "dropped": s.dropped} for s in list(self._subscribers)],
+        }
+
+    # To start Subscription Server
+    def run(self) -> None:
+        asyncio.run(self.serve())
+
+    async def serve(self) -> None:
+        ''' Serve subscriptions until the task is cancelled.
+        '''
+        self.loop = asyncio.get_running_loop()
+        _server = await asyncio.start_server(self._connection, self.hostname, self.port)
+        self.started.set()
+        async with _server:
+            await _server.serve_forever()
+
+    def _on_publish(self, state: dict, publish_time: float) -> None:
+        self._state = state
+        self._state_time = publish_time
+        for subscriber in self._subscribers:
+            subscriber.wake.set()
+
+    def _on_events(self, events: list) -> None:
+        for subscriber in self._subscribers:
+            if subscriber.events is None:
+                continue
+            _events = events if subscriber.events is True else [e for e in events if e["trigger"] in subscriber.events]
+            if not _events:
+                continue
+
+            if subscriber.writer.transport.get_write_buffer_size() > self.high_water:
+                # Slow consumer. Events are not resent, get_trigger_events has them
+                subscriber.dropped += 1
+                continue
+            subscriber.writer.write(json.dumps({"events": _events}).encode("utf-8") + b"\n")
+
+    def _update_interest(self) -> None:
+        self._all_items = any(s.all_items for s in self._subscribers)
+        self._subscribed_names = frozenset().union(*(s.names for s in self._subscribers))
+        self.interest_changed = True
+        if self.on_interest_changed is not None:
+            self.on_interest_changed()
+
+    async def _connection(self, reader, writer) -> None:
+        _subscriber = _Subscriber(writer, self.default_rate_hz)
+        self._subscribers.add(_subscriber)
+        _sender = asyncio.ensure_future(self._send_updates(_subscriber))
+
+        try:
+            while True:
+                _line = await reader.readline()
+                if not _line:
+                    break
+                if _line.strip():
+                    self._command(_subscriber, _line)
+        except ConnectionError:
+            pass
+        finally:
+            self._subscribers.discard(_subscriber)
+            self._update_interest()
+            _sender.cancel()
+            writer.close()
+
+    def _command(self, subscriber: _Subscriber, line: bytes) -> None:
+        try:
+            _command = json.loads(line)
+            if not isinstance(_command, dict):
+                raise ValueError("Expected a JSON object")
+
+            if "rate_hz" in _command:
+                _rate = float(_command["rate_hz"])
+                if _rate <= 0:
+                    raise ValueError("rate_hz must be positive")
+                subscriber.rate_hz = min(_rate, self.max_rate_hz)
+
+            if "events" in _command:
+                _events = _command["events"]
+                if isinstance(_events, bool):
+                    subscriber.events = True if _events else None
+                elif isinstance(_events, list):
+                    subscriber.events = set(_events)
+                else:
+                    raise ValueError("events must be a boolean or a list of trigger names")
+
+            if "subscribe" in _command:
+                if _command["subscribe"] == "*":
+                    subscriber.all_items = True
+                else:
+                    subscriber.names.update(_command["subscribe"])
+
+            if "unsubscribe" in _command:
+                if _command["unsubscribe"] == "*":
+                    subscriber.all_items = False
+                    subscriber.names.clear()
+                else:
+                    subscriber.names.difference_update(_command["unsubscribe"])
+
+                # Resend everything if subscribed again
+                for name in list(subscriber.sent):
+                    if not (subscriber.all_items or name in subscriber.names):
+                        del subscriber.sent[name]
+
+        except (ValueError, TypeError) as e:
+            subscriber.writer.write(json.dumps({"error": str(e)}).encode("utf-8") + b"\n")
+            return
+
+        self._update_interest()
+        subscriber.wake.set()
+
+    async def _send_updates(self, subscriber: _Subscriber) -> None:
+        try:
+            while True:
+                await subscriber.wake.wait()
+                subscriber.wake.clear()
+
+                # Rate limit. Changes published in the meantime are merged into the next update
+                _wait = subscriber.next_send - self.loop.time()
+                if _wait > 0:
+                    await asyncio.sleep(_wait)
+
+                _update = self._delta(subscriber)
+                if _update is None:
+                    continue
+
+                if subscriber.writer.transport.get_write_buffer_size() > self.high_water:
+                    # Slow consumer. Keep the changes for the next update
+                    subscriber.dropped += 1
+                    subscriber.next_send = self.loop.time() + 1.0/subscriber.rate_hz
+                    subscriber.wake.set()
+                    continue
+
+                self._commit(subscriber, _update)
+                subscriber.writer.write(json.dumps(_update).encode("utf-8") + b"\n")
+                subscriber.next_send = self.loop.time() + 1.0/subscriber.rate_hz
+        except (asyncio.CancelledError, ConnectionError):
+            pass
+
+    def _delta(self, subscriber: _Subscriber) -> dict:
+        ''' Changes since the last update sent to the subscriber. None if nothing changed.
+        '''
+        _items = {}
+        for name, item in self._state.items():
+            if not (subscriber.all_items or name in subscriber.names):
+                continue
+
+            _sent = subscriber.sent.get(name)
+            if _sent is None:
+                _items[name] = item
+                continue
+
+            _fields = {key: value for key, value in item.items() if _sent.get(key) != value}
+            if _fields:
+                _items[name] = _fields
+
+        _removed = [name for name in subscriber.sent if name not in self._state]
+
+        if not _items and not _removed:
+            return None
+
+        _update = {"time": self._state_time, "items": _items}
+        if _removed:
+            _update["removed"] = _removed
+        return _update
+
+    def _commit(self, subscriber: _Subscriber, update: dict) -> None:
+        for name, fields in update["items"].items():
+            subscriber.sent.setdefault(name, {}).update(fields)
+        for name in update.get("removed", ()):
+            del subscriber.sent[name]
@@ -0,0 +1,303 @@
+import hashlib
+import os
+import weakref
+from collections import OrderedDict
+from threading import Lock
+import numpy as np
+import pyqtgraph as pg
+from PyQt6 import QtCore, QtGui, QtWidgets
+
+# QImage format of 8 bit images, by number of channels
+_FORMATS = {1: QtGui.QImage.Format.Format_Grayscale8,
+            3: QtGui.QImage.Format.Format_RGB888,
+            4: QtGui.QImage.Format.Format_RGBA8888}
+
+
+def normalize_image(image: np.ndarray, zero_copy: bool = False) -> tuple:
+    '''Convert an image array to a QImage once, ready to blit.
+
+    Arrays are column-major (``image[x, y]``), like ``pg.ImageItem``. Integer images with values
+    in 0-255 (grayscale, RGB, RGBA of any integer dtype, eg. int32 from JSON or PIL) use fixed
+    levels: the values are the 8 bit colors. Other images (float, wider range) are scaled once
+    with their min/max, as ``pg.ImageItem`` auto levels do.
+
+    Parameters:
+        image(numpy.ndarray): Image array
+        zero_copy(bool): Wrap the array instead of converting it. Requires uint8 grayscale/RGB/RGBA
+            with rows (``image[:, y]``) contiguous in memory. Eg: ``np.asarray(Image.open(f)).transpose(1, 0, 2)``. Default: False
+
+    Returns:
+        tuple: (QImage, buffer). ``buffer`` is the array the QImage reads from when ``zero_copy`` is set (keep it alive), else None.
+            The QImage is premultiplied ARGB32 unless ``zero_copy`` is set.
+    '''
+    _image = np.asarray(image)
+    if _image.ndim == 3 and _image.shape[2] == 1:
+        _image = _image[..., 0]
+    _channels = 1 if _image.ndim == 2 else _image.shape[2]
+
+    _fixed_levels = (_image.ndim in (2, 3) and _channels in _FORMATS and _image.size
+                    and _image.dtype.kind in "iu"
+                    and (_image.dtype == np.uint8 or (_image.min() >= 0 and _image.max() <= 255)))
+
+    _rows = _image.swapaxes(0, 1)       # QImage rows are y
+    if zero_copy:
+        if not (_fixed_levels and _image.dtype == np.uint8 and _rows.flags.c_contiguous):
+            raise ValueError(f"Zero copy needs uint8 grayscale/RGB/RGBA with contiguous rows (shape: {_image.shape}, dtype: {_image.dtype})")
+        return pg.functions.ndarray_to_qimage(_rows, _FORMATS[_channels]), _rows
+
+    if _fixed_levels:
+        _rows = np.ascontiguousarray(_rows, dtype=np.uint8)
+        _qimage = pg.functions.ndarray_to_qimage(_rows, _FORMATS[_channels])
+    else:
+        # Scaled by pyqtgraph (auto levels, NaN as transparent)
+        _item = pg.ImageItem(image=_image)
+        _item.render()
+        if _item.qimage is None:
+            raise ValueError(f"Unable to convert image (shape: {_image.shape}, dtype: {_image.dtype})")
+        _qimage = _item.qimage
+
+    # Copies: detached from the array and the conversion buffers
+    return _qimage.convertToFormat(QtGui.QImage.Format.Format_ARGB32_Premultiplied), None
+
+
+class Texture:
+    '''Converted image shared by every item showing the same pixels. Created by :obj:`Texture_Cache`.
+
+    The image is converted once (check :obj:`normalize_image`). Paints only blit it.
+
+    Attributes:
+        key(str): Content hash. None for zero copy textures.
+        qimage(QtGui.QImage): Converted image
+        buffer(numpy.ndarray): Array wrapped by ``qimage`` (zero copy), else None
+        size(tuple): (columns, rows) of the image, in pixels
+        nbytes(int): Memory used by the converted image
+    '''
+    def __init__(self, key: str, qimage: QtGui.QImage, buffer: np.ndarray = None):
+
+        self.key = key
+        self.qimage = qimage
+        self.buffer = buffer
+        self.size = (qimage.width(), qimage.height())
+        self.nbytes = qimage.sizeInBytes()
+
+
+class Texture_Cache:
+    '''Process wide cache of converted images, keyed by image content.
+
+    Items showing the same pixels share one :obj:`Texture`: images are keyed by their converted
+    pixels (check :obj:`normalize_image`), so the same picture sent as uint8, int64 (JSON) or
+    read from a file shares a texture. Arrays already seen are found by a hash of their raw
+    content (dtype, shape, bytes) without converting them again, so memory and conversion time
+    scale with the number of unique images instead of the number of items. Least recently
+    used textures are dropped when the cache is over ``max_bytes``; textures still shown by an
+    item stay shared until the last item is removed.
+
+    Parameters:
+        max_bytes(int): Size bound of the cached textures. Default: 256 MiB
+
+    Attributes:
+        hits(int): Lookups served from the cache
+        misses(int): Lookups that converted a new image
+        evictions(int): Textures dropped to stay under ``max_bytes``
+    '''
+    def __init__(self, max_bytes: int = 256*1024*1024):
+
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._textures = OrderedDict()               # key -> Texture, least recently used first
+        self._live = weakref.WeakValueDictionary()   # key -> Texture, still held by an item
+        self._files = {}                             # (path, mtime, size) -> key
+        self._raw = {}                               # raw key -> key
+        self._bytes = 0
+        self._lock = Lock()
+
+    @staticmethod
+    def raw_key(image: np.ndarray) -> str:
+        ''' Hash of the image array as sent: dtype, shape and pixels (in C order).
+
+        Parameters:
+            image(numpy.ndarray): Image array
+
+        Returns:
+            str: Raw key
+        '''
+        _image = np.ascontiguousarray(image)
+        _hash = hashlib.blake2b(digest_size=16)
+        _hash.update(f"{_image.dtype.str}{_image.shape}".encode("ascii"))
+        _hash.update(_image.data)
+        return _hash.hexdigest()
+
+    @staticmethod
+    def content_key(qimage: QtGui.QImage) -> str:
+        ''' Hash of the converted pixels (what paints blit) and their size.
+
+        Parameters:
+            qimage(QtGui.QImage): Image converted by :obj:`normalize_image`
+
+        Returns:
+            str: Cache key
+        '''
+        _bits = qimage.constBits()
+        _bits.setsize(qimage.sizeInBytes())
+        _hash = hashlib.blake2b(digest_size=16)
+        _hash.update(f"{qimage.width()}x{qimage.height()}x{qimage.bytesPerLine()}".encode("ascii"))
+        _hash.update(_bits)
+        return _hash.hexdigest()
+
+    def get(self, image: np.ndarray) -> Texture:
+        ''' Texture of an image. Converts the image on a miss.
+
+        Parameters:
+            image(numpy.ndarray): Image array. Same formats as ``pg.ImageItem``.
+
+        Returns:
+            Texture: Shared texture
+        '''
+        _raw = self.raw_key(image)
+        _key = self._raw.get(_raw)
+        _texture = self._lookup(_key, count_miss=False) if _key is not None else None
+        if _texture is None:
+            _qimage = normalize_image(image)[0]
+            _key = self.content_key(_qimage)
+            _texture = self._lookup(_key)
+            if _texture is None:
+                _texture = self._insert(_key, _qimage)
+            self._raw[_raw] = _key
+        return _texture
+
+    @staticmethod
+    def wrap(image: np.ndarray) -> Texture:
+        ''' Texture reading the array directly (zero copy). Not cached or shared.
+
+        Changes to the array show on the next repaint of the item.
+
+        Parameters:
+            image(numpy.ndarray): uint8 image. Check ``zero_copy`` in :obj:`normalize_image`.
+
+        Returns:
+            Texture: Texture of the array
+        '''
+        return Texture(None, *normalize_image(image, zero_copy=True))
+
+    def get_file(self, filename: str, loader) -> Texture:
+        ''' Texture of an image file. The file is only read again if it changed.
+
+        Parameters:
+            filename(str): Image file
+            loader(function): Loads the file as an array. Eg: :obj:`load_image`
+
+        Returns:
+            Texture: Shared texture
+        '''
+        _stat = os.stat(filename)
+        _file = (os.path.abspath(filename), _stat.st_mtime_ns, _stat.st_size)
+
+        _key = self._files.get(_file)
+        _texture = self._lookup(_key, count_miss=False) if _key is not None else None
+        if _texture is None:
+            _texture = self.get(loader(filename))
+            self._files[_file] = _texture.key
+        return _texture
+
+    def _lookup(self, key: str, count_miss: bool = True) -> Texture:
+        with self._lock:
+            _texture = self._textures.get(key)
+            if _texture is not None:
+                self._textures.move_to_end(key)
+            else:
+                _texture = self._live.get(key)
+                if _texture is None:
+                    self.misses += count_miss
+                    return None
+                self._store(_texture)
+
+            self.hits += 1
+            return _texture
+
+    def _insert(self, key: str, qimage: QtGui.QImage) -> Texture:
+        with self._lock:
+            # Converted concurrently by another thread
+            _texture = self._textures.get(key) or self._live.get(key)
+            if _texture is None:
+                _texture = Texture(key, qimage)
+                self._live[key] = _texture
+            self._store(_texture)
+            return _texture
+
+    def _store(self, texture: Texture) -> None:
+        if texture.key not in self._textures:
+            self._textures[texture.key] = texture
+            self._bytes += texture.nbytes
+
+        # Keep at least the newest texture
+        while self._bytes > self.max_bytes and len(self._textures) > 1:
+            _, _evicted = self._textures.popitem(last=False)
+            self._bytes -= _evicted.nbytes
+            self.evictions += 1
+            for _raw in [k for k, v in self._raw.items() if v == _evicted.key]:
+                del self._raw[_raw]
+
+    def clear(self) -> None:
+        ''' Drop every cached texture. Items keep theirs.
+        '''
+        with self._lock:
+            self._textures.clear()
+            self._files.clear()
+            self._raw.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> dict:
+        ''' Cache counters.
+
+        Returns:
+            dict: ``hits``, ``misses``, ``evictions``, ``textures`` (cached), ``live`` (held by items), ``bytes`` and ``max_bytes``
+        '''
+        with self._lock:
+            return {"hits": self.hits,
+                    "misses": self.misses,
+                    "evictions": self.evictions,
+                    "textures": len(self._textures),
+                    "live": len(self._live),
+                    "bytes": self._bytes,
+                    "max_bytes": self.max_bytes}
+
+
+class Texture_Item(QtWidgets.QGraphicsObject):
+    '''Graphics item drawing a shared :obj:`Texture` into a rectangle.
+
+    Stands in for ``pg.ImageItem`` in :obj:`image_item`: same ``setRect`` and same orientation,
+    without a per-item copy of the pixels. A plain ``QGraphicsObject``: moves skip the view
+    bounds bookkeeping of pyqtgraph items (the canvas range is fixed).
+
+    Parameters:
+        texture(Texture): Shared texture
+    '''
+    def __init__(self, texture: Texture):
+
+        super().__init__()
+        self.texture = texture
+        self._rect = QtCore.QRectF(0, 0, *texture.size)      # Item coordinates are image pixels
+
+    def setRect(self, *args) -> None:
+        ''' Place the image. Accepts ``QRectF`` or ``x, y, width, height``.
+        '''
+        _rect = args[0] if len(args) == 1 else QtCore.QRectF(*args)
+
+        # Same transform as pg.ImageItem.setRect
+        _transform = QtGui.QTransform()
+        _transform.translate(_rect.left(), _rect.top())
+        _transform.scale(_rect.width()/self._rect.width(), _rect.height()/self._rect.height())
+        self.setTransform(_transform)
+
+    def boundingRect(self) -> QtCore.QRectF:
+        return QtCore.QRectF(self._rect)
+
+    def paint(self, painter, *args) -> None:
+        painter.drawImage(self._rect, self.texture.qimage)
+
+
+# Process wide cache used by image_item
+default_texture_cache = Texture_Cache()
@@ -0,0 +1,291 @@
+import json
+import os
+import time
+from threading import Lock
+from typing import Callable
+import numpy as np
+
+from .position_buffer import sample_time
+from .tracking_source import Tracking_Source, create_source
+
+# File layout: HEADER_SIZE bytes of header, then ``capacity`` records
+HEADER_SIZE = 4096
+MAGIC = b"VPSTRK01"
+
+KINDS = ("position", "velocity")
+
+RECORD_DTYPE = np.dtype([
+    ("tracker", "<u2"),         # Index in the tracker name table of the header
+    ("kind", "u1"),             # Index in KINDS
+    ("sensor", "<i4"),
+    ("timestamp", "<f8"),       # Sample time (seconds since epoch)
+    ("receive_time", "<f8"),    # Time the callback ran (seconds since epoch)
+    ("position", "<f8", (3,)),
+    ("quaternion", "<f8", (4,)),
+    ("velocity", "<f8", (3,)),
+])
+
+
+class Tracker_Recorder:
+    '''Records every tracker sample into a preallocated memory-mapped file.
+
+    Set as ``recorder`` of a :obj:`Tracker_Pool` (check ``Tracker_Pool.set_recorder``) to capture
+    what the server received, before any item callback runs. Each sample is one fixed-size
+    record (:obj:`RECORD_DTYPE`). Samples past ``capacity`` are counted in ``dropped``.
+
+    Header (``HEADER_SIZE`` bytes): ``MAGIC``, record count (u8), capacity (u8), length of the
+    tracker name table (u4) and the table itself (JSON list).
+
+    Parameters:
+        filename(str): Output file. Overwritten.
+        capacity(int): Number of records preallocated. Default: 3600000 (1 hour at 1 kHz, ~400 MB)
+
+    Attributes:
+        count(int): Records written.
+        dropped(int): Samples not recorded because the file was full.
+    '''
+    def __init__(self, filename: str, capacity: int = 3600000):
+
+        self.filename = filename
+        self.capacity = capacity
+        self.count = 0
+        self.dropped = 0
+
+        self._file = np.memmap(filename, dtype=np.uint8, mode="w+",
+                            shape=(HEADER_SIZE + capacity*RECORD_DTYPE.itemsize,))
+        self._file[:len(MAGIC)] = np.frombuffer(MAGIC, dtype=np.uint8)
+        self._count = self._file[8:16].view("<u8")
+        self._file[16:24].view("<u8")[0] = capacity
+        self.records = self._file[HEADER_SIZE:].view(RECORD_DTYPE)
+
+        self._trackers = {}
+        self._lock = Lock()
+
+    def record(self, tracker_name: str, kind: str, data: dict) -> None:
+        ''' Append a sample. Called from ``Pooled_Tracker`` dispatch.
+
+        Parameters:
+            tracker_name(str): Name of the tracker
+            kind(str): "position" or "velocity"
+            data(dict): Sample
+        '''
+        _received = time.time()
+        with self._lock:
+            _index = self.count
+            if _index >= self.capacity:     # Full, or closed
+                self.dropped += 1
+                return
+
+            _tracker = self._trackers.get(tracker_name)
+            if _tracker is None:
+                _tracker = self._add_tracker(tracker_name)
+
+            _record = self.records[_index]
+            _record["tracker"] = _tracker
+            _record["kind"] = KINDS.index(kind) if kind in KINDS else 255
+            _record["sensor"] = data.get("sensor", 0)
+            _record["timestamp"] = sample_time(data)
+            _record["receive_time"] = _received
+            if "position" in data:
+                _record["position"] = data["position"]
+            if "quaternion" in data:
+                _record["quaternion"] = data["quaternion"]
+            if "velocity" in data:
+                _record["velocity"] = data["velocity"]
+
+            self.count = _index + 1
+            self._count[0] = self.count
+
+    def _add_tracker(self, tracker_name: str) -> int:
+        _names = list(self._trackers) + [tracker_name]
+        _table = json.dumps(_names).encode("utf-8")
+        if 28 + len(_table) > HEADER_SIZE:
+            raise ValueError("Too many trackers for the log header")
+
+        self._file[24:28].view("<u4")[0] = len(_table)
+        self._file[28:28 + len(_table)] = np.frombuffer(_table, dtype=np.uint8)
+        self._trackers[tracker_name] = len(_names) - 1
+        return self._trackers[tracker_name]
+
+    def flush(self) -> None:
+        ''' Write pending pages to disk.
+        '''
+        self._file.flush()
+
+    def close(self) -> None:
+        ''' Flush and shrink the file to the records written.
+        '''
+        with self._lock:
+            _size = HEADER_SIZE + self.count*RECORD_DTYPE.itemsize
+            self._file.flush()
+            _mmap = self._file._mmap
+            self.records = None
+            self._count = None
+            self._file = None
+            if _mmap is not None:
+                _mmap.close()
+            os.truncate(self.filename, _size)
+            self.capacity = 0
+
+
+def load_tracker_log(filename: str) -> tuple:
+    '''Open a log written by :obj:`Tracker_Recorder` (read only, memory mapped).
+
+    Parameters:
+        filename(str): Log file
+
+    Returns:
+        tuple: (tracker names (list[str]), records (numpy.ndarray of :obj:`RECORD_DTYPE`))
+    '''
+    _file = np.memmap(filename, dtype=np.uint8, mode="r")
+    if bytes(_file[:len(MAGIC)]) != MAGIC:
+        raise ValueError(f"'{filename}' is not a tracker log")
+
+    _count = int(_file[8:16].view("<u8")[0])
+    _table = int(_file[24:28].view("<u4")[0])
+    _names = json.loads(bytes(_file[28:28 + _table]).decode("utf-8")) if _table else []
+    _records = _file[HEADER_SIZE:HEADER_SIZE + _count*RECORD_DTYPE.itemsize].view(RECORD_DTYPE)
+    return _names, _records
+
+
+class Replay_Source(Tracking_Source):
+    '''Recorded samples of one tracker. Created by :obj:`Tracker_Replayer`.
+    '''
+    def __init__(self, replayer: 'Tracker_Replayer', tracker_name: str, records: np.ndarray):
+
+        self.replayer = replayer
+        self.tracker_name = tracker_name
+        self.records = records
+        self.position = 0
+        self._handlers = {kind: [] for kind in KINDS}
+
+    def register_change_handler(self, userdata, callback: Callable, kind: str, sensor: int = None) -> None:
+        if kind in self._handlers:
+            self._handlers[kind].append((userdata, callback, sensor))
+
+    @property
+    def finished(self) -> bool:
+        '''bool: All records were delivered.
+        '''
+        return self.position >= len(self.records)
+
+    def mainloop(self) -> None:
+        _end = self.replayer.due(self.records, self.position)
+        if _end <= self.position:
+            return
+
+        _batch = self.records[self.position:_end]
+        self.position = _end
+
+        for _kind, _sensor, _time, _position, _quaternion, _velocity in zip(
+                _batch["kind"].tolist(), _batch["sensor"].tolist(), _batch["timestamp"].tolist(),
+                _batch["position"].tolist(), _batch["quaternion"].tolist(), _batch["velocity"].tolist()):
+
+            if _kind == 0:
+                _kind = "position"
+                _data = {"sensor": _sensor, "position": tuple(_position),
+                        "quaternion": tuple(_quaternion), "time": _time}
+            elif _kind == 1:
+                _kind = "velocity"
+                _data = {"sensor": _sensor, "velocity": tuple(_velocity),
+                        "quaternion": tuple(_quaternion), "quat_dt": 0.0, "time": _time}
+            else:
+                continue
+
+            for userdata, callback, sensor in self._handlers[_kind]:
+                if sensor is None or sensor == _sensor:
+                    callback(userdata, _data)
+
+
+class Tracker_Replayer:
+    '''Feeds a tracker log back through the tracker pool.
+
+    ``install`` replaces the pool factory: trackers found in the log are served from the log
+    (:obj:`Replay_Source`), others are created by the previous factory. Items are added as
+    usual (``set_vicon_tracker`` with the recorded tracker names).
+
+    Records are released on the recorded receive-time axis, scaled by ``speed``. The replay
+    clock starts at the first ``mainloop()`` of any of its sources.
+
+    Parameters:
+        filename(str): Log written by :obj:`Tracker_Recorder`
+        speed(float): Playback speed. 1 = real time, 2 = twice as fast. None or 0 = as fast as possible. Default: 1.0
+        batch(int): Most records delivered by one ``mainloop()`` when replaying as fast as possible. Default: 1000
+        loop(bool): Restart from the beginning once every source finished, at any speed. Default: False
+    '''
+    def __init__(self, filename: str, speed: float = 1.0, batch: int = 1000, loop: bool = False):
+
+        self.filename = filename
+        self.speed = speed
+        self.batch = batch
+        self.loop = loop
+
+        self.tracker_names, self.records = load_tracker_log(filename)
+        self.sources = {}
+
+        self._origin = float(self.records["receive_time"][0]) if len(self.records) else 0.0
+        self._start = None
+        self._previous_factory = None
+
+    def install(self, pool: 'Tracker_Pool' = None) -> None:
+        ''' Serve recorded trackers from the log.
+
+        Parameters:
+            pool(Tracker_Pool): Default: process wide pool
+        '''
+        if pool is None:
+            from .tracker_pool import default_tracker_pool as pool
+
+        self._previous_factory = pool.factory
+        pool.factory = self.create_source
+
+    def create_source(self, tracker_name: str) -> Tracking_Source:
+        ''' Source factory. Recorded trackers replay from the log.
+
+        Parameters:
+            tracker_name(str): Name of the tracker
+
+        Returns:
+            Tracking_Source: :obj:`Replay_Source` or a source of the previous factory
+        '''
+        if tracker_name not in self.tracker_names:
+            _factory = create_source if self._previous_factory is None else self._previous_factory
+            return _factory(tracker_name)
+
+        _index = self.tracker_names.index(tracker_name)
+        _records = self.records[self.records["tracker"] == _index]
+        _source = Replay_Source(self, tracker_name, _records)
+        self.sources[tracker_name] = _source
+        return _source
+
+    @property
+    def finished(self) -> bool:
+        '''bool: Every replay source delivered all its records.
+        '''
+        return bool(self.sources) and all(s.finished for s in self.sources.values())
+
+    def due(self, records: np.ndarray, position: int) -> int:
+        ''' Index after the last record due now. Called by :obj:`Replay_Source`.
+        '''
+        if position >= len(records):
+            # Loop once every source delivered its last record. Nothing is due until the next call
+            if self.loop and self.finished:
+                self.restart()
+                return 0
+            return position
+
+        if self._start is None:
+            self._start = time.time()
+
+        if not self.speed:
+            return min(position + self.batch, len(records))
+
+        _replay_time = self._origin + (time.time() - self._start)*self.speed
+        return int(np.searchsorted(records["receive_time"], _replay_time, side="right"))
+
+    def restart(self) -> None:
+        ''' Replay from the beginning.
+        '''
+        self._start = None
+        for source in self.sources.values():
+            source.position = 0
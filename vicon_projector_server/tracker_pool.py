@@ -0,0 +1,168 @@
+from threading import Lock
+from typing import Callable
+from .tracking_source import create_source
+
+
+class Pooled_Tracker:
+    '''Shared VRPN receiver.
+
+    One receiver is opened per tracker name (``tracker@host``). Callbacks of every
+    subscribed item are dispatched from that single connection, optionally
+    filtered by sensor id. Exposes the same ``register_change_handler``/``mainloop``
+    surface as ``vrpn.receiver.Tracker``.
+
+    Attributes:
+        tracker_name(str): Name of the tracker. Eg: tracker@ip_address
+        receiver(Tracking_Source): Underlying receiver. Eg: :obj:`VRPN_Source`, :obj:`Simulated_Source`
+        ref_count(int): Number of items holding this tracker.
+        recorder(Tracker_Recorder): Receives every sample before the callbacks. Default: None
+    '''
+    def __init__(self, tracker_name: str, receiver, recorder=None):
+
+        self.tracker_name = tracker_name
+        self.receiver = receiver
+        self.ref_count = 0
+        self.recorder = recorder
+
+        # kind -> {sensor: ((userdata, callback), ...)}. Sensor None receives all sensors
+        self._handlers = {}
+        self._lock = Lock()
+
+    def register_change_handler(self, userdata, callback: Callable, kind: str, sensor: int = None) -> None:
+        ''' Subscribe a callback to the shared receiver.
+
+        Parameters:
+            userdata: Passed back as the first argument of the callback.
+            callback(function): Function format: fn(userdata, data)
+            kind(str): VRPN callback type. Eg: "position", "velocity"
+            sensor(int): Only dispatch data from this sensor id. Default: None (all sensors)
+        '''
+        with self._lock:
+            if kind not in self._handlers:
+                self._handlers[kind] = {}
+                self.receiver.register_change_handler(kind, self._dispatch, kind)
+
+            _by_sensor = self._handlers[kind]
+            _by_sensor[sensor] = _by_sensor.get(sensor, ()) + ((userdata, callback),)
+
+    def unregister_change_handler(self, userdata, callback: Callable, kind: str, sensor: int = None) -> None:
+        ''' Remove a callback added with ``register_change_handler``.
+        '''
+        with self._lock:
+            _by_sensor = self._handlers.get(kind, {})
+            _remaining = tuple(h for h in _by_sensor.get(sensor, ())
+                            if not (h[0] is userdata and h[1] == callback))
+            if _remaining:
+                _by_sensor[sensor] = _remaining
+            else:
+                _by_sensor.pop(sensor, None)
+
+    def mainloop(self) -> None:
+        ''' Run the receiver mainloop once. No-op once the connection is closed.
+        '''
+        receiver = self.receiver
+        if receiver is not None:
+            receiver.mainloop()
+
+    def fileno(self):
+        ''' File descriptor of the receiver connection, or None if the binding does not expose one.
+        '''
+        _fileno = getattr(self.receiver, "fileno", None)     # None once the connection is closed
+        return _fileno() if _fileno is not None else None
+
+    def _dispatch(self, kind, data) -> None:
+        _recorder = self.recorder
+        if _recorder is not None:
+            _recorder.record(self.tracker_name, kind, data)
+
+        _by_sensor = self._handlers.get(kind)
+        if not _by_sensor:
+            return
+
+        for userdata, callback in _by_sensor.get(data.get("sensor"), ()):
+            callback(userdata, data)
+
+        for userdata, callback in _by_sensor.get(None, ()):
+            callback(userdata, data)
+
+
+class Tracker_Pool:
+    '''Reference counted pool of shared VRPN receivers, keyed by tracker name.
+
+    Parameters:
+        factory(function): Creates a receiver from a tracker name. Default: :obj:`create_source` (VRPN or ``sim://``)
+
+    Attributes:
+        recorder(Tracker_Recorder): Recorder of every pooled tracker. Check ``set_recorder``.
+    '''
+    def __init__(self, factory: Callable = None):
+
+        self.factory = create_source if factory is None else factory
+        self.recorder = None
+
+        self._trackers = {}
+        self._lock = Lock()
+
+    def acquire(self, tracker_name: str) -> Pooled_Tracker:
+        ''' Get the shared receiver for a tracker name. Opens the connection on first use.
+
+        Parameters:
+            tracker_name(str): Name of the tracker. Eg: tracker@ip_address
+
+        Returns:
+            Pooled_Tracker: Shared receiver. Call ``release`` when done.
+        '''
+        with self._lock:
+            tracker = self._trackers.get(tracker_name)
+            if tracker is None:
+                tracker = Pooled_Tracker(tracker_name, self.factory(tracker_name), self.recorder)
+                self._trackers[tracker_name] = tracker
+
+            tracker.ref_count += 1
+            return tracker
+
+    def release(self, tracker: Pooled_Tracker) -> bool:
+        ''' Release a receiver obtained with ``acquire``.
+
+        Parameters:
+            tracker(Pooled_Tracker): Shared receiver.
+
+        Returns:
+            bool: True if this was the last reference and the connection was closed.
+        '''
+        with self._lock:
+            tracker.ref_count -= 1
+            if tracker.ref_count > 0:
+                return False
+
+            if self._trackers.get(tracker.tracker_name) is tracker:
+                del self._trackers[tracker.tracker_name]
+
+            _close = getattr(tracker.receiver, "close", None)
+            tracker.receiver = None
+            if _close is not None:
+                _close()
+            return True
+
+    def set_recorder(self, recorder) -> None:
+        ''' Record the samples of open and future trackers.
+
+        Parameters:
+            recorder(Tracker_Recorder): Recorder, or None to stop recording.
+        '''
+        with self._lock:
+            self.recorder = recorder
+            for tracker in self._trackers.values():
+                tracker.recorder = recorder
+
+    def get_tracker_names(self) -> list:
+        ''' Names of the open connections.
+
+        Returns:
+            list: Tracker names.
+        '''
+        return list(self._trackers.keys())
+
+
+# Process wide pool used by tracked_item.set_vicon_tracker
+default_tracker_pool = Tracker_Pool()
@@ -0,0 +1,342 @@
+import socket
+import time
+from threading import Event, Thread
+from typing import Callable
+from urllib.parse import urlparse, parse_qsl
+import numpy as np
+
+
+class Tracking_Source:
+    '''Interface of a tracking source. Same surface as ``vrpn.receiver.Tracker``.
+
+    Sources deliver samples as VRPN style dicts, from ``mainloop()``, to the handlers registered
+    with ``register_change_handler``:
+
+        * ``"position"``: ``{"sensor": int, "position": (x,y,z), "quaternion": (x,y,z,w), "time": float}``
+        * ``"velocity"``: ``{"sensor": int, "velocity": (vx,vy,vz), "quaternion": (x,y,z,w), "quat_dt": float, "time": float}``
+
+    Check :obj:`create_source` to get a source from a tracker name.
+    '''
+    def register_change_handler(self, userdata, callback: Callable, kind: str, sensor: int = None) -> None:
+        ''' Subscribe to samples.
+
+        Parameters:
+            userdata: Passed back as the first argument of the callback.
+            callback(function): Function format: fn(userdata, data)
+            kind(str): "position" or "velocity"
+            sensor(int): Only this sensor id. Default: None (all sensors)
+        '''
+        raise NotImplementedError()
+
+    def mainloop(self) -> None:
+        ''' Deliver pending samples to the handlers.
+        '''
+        raise NotImplementedError()
+
+    def fileno(self):
+        ''' File descriptor that becomes readable when samples are pending, or None (polled).
+        '''
+        return None
+
+    def close(self) -> None:
+        ''' Release the source. Called when the last item stops using it.
+        '''
+        pass
+
+
+class VRPN_Source(Tracking_Source):
+    '''VRPN tracker (``tracker@host``). Imports ``vrpn`` on first use.
+
+    Parameters:
+        tracker_name(str): Name of the tracker. Eg: tracker@ip_address
+    '''
+    def __init__(self, tracker_name: str):
+        import vrpn
+
+        self.tracker_name = tracker_name
+        self.receiver = vrpn.receiver.Tracker(tracker_name)
+
+    def register_change_handler(self, userdata, callback: Callable, kind: str, sensor: int = None) -> None:
+        if sensor is None:
+            self.receiver.register_change_handler(userdata, callback, kind)
+        else:
+            self.receiver.register_change_handler(userdata, callback, kind, sensor)
+
+    def mainloop(self) -> None:
+        self.receiver.mainloop()
+
+    def fileno(self):
+        _fileno = getattr(self.receiver, "fileno", None)
+        return _fileno() if _fileno is not None else None
+
+
+class Simulated_Source(Tracking_Source):
+    '''Simulated tracker. Generates ``bodies`` sensors (ids ``0..bodies-1``) at ``rate_hz``.
+
+    ``mainloop()`` delivers every sample due since the previous call (up to ``max_catch_up``
+    seconds), like a VRPN connection draining its socket.
+
+    Trajectories:
+        * ``"circle"``: Bodies evenly spaced on a circle of ``radius`` around ``center``, moving at ``speed`` (rad/s).
+        * ``"random_walk"``: Gaussian steps (``speed`` m/s rms), reflected at ``bounds``.
+        * ``"replay"``: Positions from ``replay_file`` (``.npy`` of shape (T, bodies, 2) or (T, 2), or ``.csv``
+          with ``x0,y0,x1,y1,...`` per row), looped.
+
+    Parameters:
+        bodies(int): Number of bodies (sensors). Default: 1
+        rate_hz(float): Samples per body per second. Default: 100
+        trajectory(str): "circle", "random_walk" or "replay". Default: "circle"
+        center(list[float]): Circle center / random walk start. Default: [0,0]
+        radius(float): Circle radius. Default: 1.0
+        speed(float): Angular speed (circle) or rms speed (random walk). Default: 1.0
+        bounds(list[float]): Random walk bounds [xmin, xmax, ymin, ymax]. Default: None (unbounded)
+        replay_file(str): Recording for "replay". Default: None
+        jitter(float): Standard deviation of Gaussian position noise. Default: 0.0
+        dropout(float): Probability that a sample is lost. Default: 0.0
+        seed(int): Random seed. Default: None
+        pollable(bool): Expose ``fileno()``. A timer thread makes it readable when samples are due. Default: False
+        max_catch_up(float): Longest backlog delivered by one ``mainloop()`` (seconds). Default: 0.25
+
+    Attributes:
+        samples(int): Position samples generated (including dropped ones).
+        dropped(int): Position samples lost to ``dropout``.
+    '''
+    TRAJECTORIES = ("circle", "random_walk", "replay")
+
+    def __init__(self, bodies: int = 1,
+                rate_hz: float = 100.0,
+                trajectory: str = "circle",
+                center: 'list[float]' = (0.0, 0.0),
+                radius: float = 1.0,
+                speed: float = 1.0,
+                bounds: 'list[float]' = None,
+                replay_file: str = None,
+                jitter: float = 0.0,
+                dropout: float = 0.0,
+                seed: int = None,
+                pollable: bool = False,
+                max_catch_up: float = 0.25):
+
+        if trajectory not in self.TRAJECTORIES:
+            raise ValueError(f"Unknown trajectory '{trajectory}'. Use one of {self.TRAJECTORIES}")
+
+        self.bodies = int(bodies)
+        self.rate_hz = float(rate_hz)
+        self.trajectory = trajectory
+        self.center = np.asarray(center, dtype=np.float64)
+        self.radius = float(radius)
+        self.speed = float(speed)
+        self.bounds = None if bounds is None else np.asarray(bounds, dtype=np.float64)
+        self.jitter = float(jitter)
+        self.dropout = float(dropout)
+        self.max_catch_up = float(max_catch_up)
+
+        self.samples = 0
+        self.dropped = 0
+
+        self._rng = np.random.default_rng(seed)
+        self._handlers = {"position": [], "velocity": []}
+
+        self._phase = 2*np.pi*np.arange(self.bodies)/max(self.bodies, 1)
+        self._walk = np.tile(self.center, (self.bodies, 1))
+        self._replay = None
+        if trajectory == "replay":
+            self._replay = self._load_replay(replay_file)
+
+        self._start = time.time()
+        self._tick = 0
+
+        self._stop = Event()
+        self._rx = self._tx = None
+        if pollable:
+            self._rx, self._tx = socket.socketpair()
+            self._rx.setblocking(False)
+            self._tx.setblocking(False)
+            Thread(target=self._timer, daemon=True).start()
+
+    @classmethod
+    def from_url(cls, url: str) -> 'Simulated_Source':
+        '''Create from a tracker name. Eg: ``sim://circle?bodies=10&rate_hz=200&jitter=0.002``
+
+        The host part is the trajectory. Query values are parsed as numbers or comma separated lists.
+        The path is the replay file: ``sim://replay/relative.npy`` or ``sim://replay//absolute/path.npy``.
+
+        Parameters:
+            url(str): Tracker name
+
+        Returns:
+            Simulated_Source: New source
+        '''
+        _url = urlparse(url)
+        _params = {}
+        for key, value in parse_qsl(_url.query):
+            _params[key] = cls._parse_value(value) if key != "replay_file" else value
+        if _url.netloc:
+            _params.setdefault("trajectory", _url.netloc)
+        if _url.path[1:] and "replay_file" not in _params:
+            _params["replay_file"] = _url.path[1:]
+        return cls(**_params)
+
+    @staticmethod
+    def _parse_value(value: str):
+        if "," in value:
+            return [float(v) for v in value.split(",")]
+        if value.lower() in ("true", "false"):
+            return value.lower() == "true"
+        try:
+            return int(value)
+        except ValueError:
+            try:
+                return float(value)
+            except ValueError:
+                return value
+
+    def _load_replay(self, replay_file: str) -> np.ndarray:
+        if replay_file is None:
+            raise ValueError("Replay trajectory needs a replay_file")
+        if replay_file.endswith(".npy"):
+            _data = np.load(replay_file)
+        else:
+            _data = np.loadtxt(replay_file, delimiter=",", ndmin=2)
+        _data = np.asarray(_data, dtype=np.float64).reshape(len(_data), -1, 2)
+        if _data.shape[1] == 1 and self.bodies > 1:
+            _data = np.repeat(_data, self.bodies, axis=1)
+        self.bodies = _data.shape[1]
+        return _data
+
+    def register_change_handler(self, userdata, callback: Callable, kind: str, sensor: int = None) -> None:
+        if kind in self._handlers:
+            self._handlers[kind].append((userdata, callback, sensor))
+
+    def fileno(self):
+        return None if self._rx is None else self._rx.fileno()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._rx is not None:
+            self._rx.close()
+            self._tx.close()
+            self._rx = self._tx = None
+
+    def mainloop(self) -> None:
+        # close() may run on another thread: keep a reference, a closed socket raises OSError
+        _rx = self._rx
+        if _rx is not None:
+            try:
+                while _rx.recv(4096):
+                    pass
+            except (BlockingIOError, OSError):
+                pass
+
+        _due = int((time.time() - self._start) * self.rate_hz)
+        _skip = _due - int(self.max_catch_up * self.rate_hz)
+        if _skip > self._tick:
+            # Fell behind. Samples older than max_catch_up are lost, like a full socket buffer
+            self._tick = _skip
+
+        while self._tick < _due:
+            self._tick += 1
+            self._emit(self._tick)
+
+    def _emit(self, tick: int) -> None:
+        _time = self._start + tick/self.rate_hz
+        _position, _velocity = self._sample(tick, _time)
+
+        if self.jitter:
+            _position = _position + self._rng.normal(0.0, self.jitter, _position.shape)
+
+        _delivered = np.ones(self.bodies, dtype=bool)
+        if self.dropout:
+            _delivered = self._rng.random(self.bodies) >= self.dropout
+
+        self.samples += self.bodies
+        self.dropped += int(self.bodies - np.count_nonzero(_delivered))
+
+        _positions = _position.tolist()
+        _velocities = _velocity.tolist()
+        for _sensor in np.flatnonzero(_delivered).tolist():
+            _x, _y = _positions[_sensor]
+            self._dispatch("position", _sensor, {"sensor": _sensor, "position": (_x, _y, 0.0),
+                                                "quaternion": (0.0, 0.0, 0.0, 1.0), "time": _time})
+            if self._handlers["velocity"]:
+                _vx, _vy = _velocities[_sensor]
+                self._dispatch("velocity", _sensor, {"sensor": _sensor, "velocity": (_vx, _vy, 0.0),
+                                                    "quaternion": (0.0, 0.0, 0.0, 1.0), "quat_dt": 1.0/self.rate_hz,
+                                                    "time": _time})
+
+    def _dispatch(self, kind: str, sensor: int, data: dict) -> None:
+        for userdata, callback, _sensor in self._handlers[kind]:
+            if _sensor is None or _sensor == sensor:
+                callback(userdata, data)
+
+    def _sample(self, tick: int, sample_time: float) -> tuple:
+        ''' Positions and velocities of all bodies. Shape (bodies, 2) each.
+        '''
+        if self.trajectory == "circle":
+            _angle = self.speed*(sample_time - self._start) + self._phase
+            _unit = np.column_stack((np.cos(_angle), np.sin(_angle)))
+            _position = self.center + self.radius*_unit
+            _velocity = self.radius*self.speed*np.column_stack((-_unit[:, 1], _unit[:, 0]))
+            return _position, _velocity
+
+        if self.trajectory == "random_walk":
+            _step = self._rng.normal(0.0, self.speed/self.rate_hz, (self.bodies, 2))
+            _previous = self._walk
+            self._walk = self._walk + _step
+            if self.bounds is not None:
+                self._walk = self._reflect(self._walk)
+            return self._walk, (self._walk - _previous)*self.rate_hz
+
+        _frames = len(self._replay)
+        _position = self._replay[tick % _frames]
+        _velocity = (_position - self._replay[(tick - 1) % _frames])*self.rate_hz
+        return _position, _velocity
+
+    def _reflect(self, position: np.ndarray) -> np.ndarray:
+        _low = self.bounds[[0, 2]]
+        _high = self.bounds[[1, 3]]
+        _span = _high - _low
+        _folded = np.mod(position - _low, 2*_span)
+        return _low + np.where(_folded > _span, 2*_span - _folded, _folded)
+
+    def _timer(self) -> None:
+        _period = 1.0/self.rate_hz
+        _next = time.perf_counter()
+        while not self._stop.is_set():
+            _next += _period
+            _wait = _next - time.perf_counter()
+            if _wait > 0:
+                self._stop.wait(_wait)
+            _tx = self._tx
+            if _tx is None:
+                return
+            try:
+                _tx.send(b"\0")
+            except (BlockingIOError, OSError):
+                # Reader behind (buffer full) or closed
+                if self._stop.is_set():
+                    return
+
+
+# Tracker name scheme -> source factory. Names without a registered scheme are VRPN trackers
+source_schemes = {
+    "sim": Simulated_Source.from_url,
+}
+
+
+def create_source(tracker_name: str) -> Tracking_Source:
+    '''Create a tracking source from a tracker name. Default factory of :obj:`Tracker_Pool`.
+
+        * ``sim://<trajectory>?bodies=..&rate_hz=..``: :obj:`Simulated_Source`
+        * ``tracker@host``: :obj:`VRPN_Source`
+
+    Parameters:
+        tracker_name(str): Name of the tracker
+
+    Returns:
+        Tracking_Source: New source
+    '''
+    _scheme = tracker_name.split("://", 1)[0] if "://" in tracker_name else None
+    if _scheme in source_schemes:
+        return source_schemes[_scheme](tracker_name)
+    return VRPN_Source(tracker_name)
@@ -0,0 +1,489 @@
+import time
+from collections import Counter, deque
+import numpy as np
+
+
+def close_pairs(position: np.ndarray, radius: float) -> tuple:
+    '''Pairs of points closer than ``radius``, with a spatial hash.
+
+    Points are hashed to cells of side ``radius``. Each cell is only compared with itself and
+    four of its neighbours (the other four see it from their side), so the cost grows with the
+    number of points and of close pairs instead of N².
+
+    Parameters:
+        position(numpy.ndarray): Points. Shape (N,2)
+        radius(float): Distance threshold
+
+    Returns:
+        tuple: (i, j, distance) arrays, ``i < j`` indices into ``position``
+    '''
+    _n = len(position)
+    if _n < 2 or radius <= 0:
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp), np.zeros(0)
+
+    _cell = np.floor(position / radius).astype(np.int64)
+    _cell -= _cell.min(axis=0)
+    # Shifted by one so neighbours of border cells do not wrap around
+    _width = int(_cell[:, 1].max()) + 3
+    _key = (_cell[:, 0] + 1) * _width + (_cell[:, 1] + 1)
+
+    _order = np.argsort(_key)
+    _sorted = _key[_order]
+    _index = np.arange(_n)
+
+    # Occupied cells, their run in the sorted points and the cell of each point
+    _new = np.ones(_n, dtype=bool)
+    _new[1:] = _sorted[1:] != _sorted[:-1]
+    _cells = _sorted[_new]
+    _starts = np.append(np.flatnonzero(_new), _n)
+    _point_cell = np.cumsum(_new) - 1
+
+    _i, _j = [], []
+    for _dx, _dy in ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1)):
+        if _dx == 0 and _dy == 0:
+            _begin = _index + 1             # Same cell: later points only
+            _end = _starts[_point_cell + 1]
+        else:
+            _target = _cells + _dx * _width + _dy
+            _found = np.minimum(np.searchsorted(_cells, _target), len(_cells) - 1)
+            _occupied = _cells[_found] == _target
+            _begin = np.where(_occupied, _starts[_found], 0)[_point_cell]
+            _end = np.where(_occupied, _starts[_found + 1], 0)[_point_cell]
+
+        _counts = np.maximum(_end - _begin, 0)
+        _total = int(_counts.sum())
+        if not _total:
+            continue
+
+        # Expand each point's run of candidates
+        _first = np.repeat(_index, _counts)
+        _offset = np.arange(_total) - np.repeat(np.cumsum(_counts) - _counts, _counts)
+        _i.append(_first)
+        _j.append(_begin[_first] + _offset)
+
+    if not _i:
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp), np.zeros(0)
+
+    _a, _b = _order[np.concatenate(_i)], _order[np.concatenate(_j)]
+    _distance = np.hypot(*(position[_a] - position[_b]).T)
+    _close = _distance <= radius
+    _a, _b, _distance = _a[_close], _b[_close], _distance[_close]
+    return np.minimum(_a, _b), np.maximum(_a, _b), _distance
+
+
+def points_in_polygon(position: np.ndarray, vertices: np.ndarray) -> np.ndarray:
+    '''Even-odd (ray casting) point in polygon test, one pass per polygon edge.
+
+    Parameters:
+        position(numpy.ndarray): Points. Shape (N,2)
+        vertices(numpy.ndarray): Polygon vertices, in order. Shape (M,2)
+
+    Returns:
+        numpy.ndarray: True for points inside. Shape (N,)
+    '''
+    _x, _y = position[:, 0], position[:, 1]
+    _inside = np.zeros(len(position), dtype=bool)
+    for (_x0, _y0), (_x1, _y1) in zip(vertices.tolist(), np.roll(vertices, -1, axis=0).tolist()):
+        if _y0 == _y1:
+            continue
+        _crosses = (_y0 > _y) != (_y1 > _y)
+        _inside ^= _crosses & (_x < _x0 + (_y - _y0) * (_x1 - _x0) / (_y1 - _y0))
+    return _inside
+
+
+class _Trigger:
+    '''Common state of zones and proximity rules.
+    '''
+    def __init__(self, name: str, items: list, opacity: float):
+
+        self.name = name
+        self.items = None if items is None else set(items)
+        self.opacity = opacity
+
+        # Selected slots, cached per Spatial_Index generation
+        self._selection = None
+        self._generation = None
+
+    def selection(self, index) -> np.ndarray:
+        if self._generation != index.generation:
+            _slots = index.active_slots()
+            if self.items is not None:
+                _slots = _slots[[_name in self.items for _name in index.names[_slots].tolist()]]
+            self._selection = _slots
+            self._generation = index.generation
+        return self._selection
+
+
+class _Zone(_Trigger):
+
+    def __init__(self, name: str, vertices: np.ndarray, is_rect: bool, items: list, opacity: float):
+
+        super().__init__(name, items, opacity)
+        self.vertices = vertices
+        self.is_rect = is_rect
+        (self.xmin, self.ymin), (self.xmax, self.ymax) = vertices.min(axis=0), vertices.max(axis=0)
+
+        # Slots inside, sorted
+        self.inside = np.zeros(0, dtype=np.intp)
+
+    def evaluate(self, index) -> tuple:
+        _candidates = index.query_rect(self.xmin, self.xmax, self.ymin, self.ymax)
+        if self.items is not None:
+            _candidates = _candidates[np.isin(_candidates, self.selection(index), assume_unique=True)]
+        if not self.is_rect and len(_candidates):
+            _candidates = _candidates[points_in_polygon(index.position[_candidates], self.vertices)]
+
+        _inside = np.sort(_candidates)
+        _entered = np.setdiff1d(_inside, self.inside, assume_unique=True)
+        _exited = np.setdiff1d(self.inside, _inside, assume_unique=True)
+        self.inside = _inside
+        return _entered, _exited
+
+    def forget(self, slots: np.ndarray) -> np.ndarray:
+        _gone = np.isin(self.inside, slots)
+        _exited = self.inside[_gone]
+        self.inside = self.inside[~_gone]
+        return _exited
+
+    def describe(self) -> dict:
+        return {"type": "rect" if self.is_rect else "polygon", "vertices": self.vertices.tolist(),
+                "items": None if self.items is None else sorted(self.items), "opacity": self.opacity,
+                "inside": len(self.inside)}
+
+
+class _Proximity(_Trigger):
+
+    def __init__(self, name: str, distance: float, items: list, others: list, hysteresis: float, opacity: float):
+
+        super().__init__(name, items, opacity)
+        self.distance = distance
+        self.hysteresis = hysteresis
+        self.others = None if others is None else _Trigger(name, others, None)
+
+        # Close pairs (slot a < slot b) and their distance, sorted by pair key
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.pairs = np.zeros((0, 2), dtype=np.intp)
+        self.distances = np.zeros(0)
+
+    def evaluate(self, index) -> tuple:
+        _capacity = len(index.names)
+        _slots = self.selection(index)
+        if self.others is not None:
+            _others = self.others.selection(index)
+            _slots = np.union1d(_slots, _others)
+
+        _i, _j, _distance = close_pairs(index.position[_slots], self.distance + self.hysteresis)
+        _a, _b = _slots[_i], _slots[_j]
+
+        if self.others is not None:
+            # One end in items, the other in others
+            _in_items = np.isin(_a, self.selection(index)), np.isin(_b, self.selection(index))
+            _in_others = np.isin(_a, _others), np.isin(_b, _others)
+            _keep = (_in_items[0] & _in_others[1]) | (_in_others[0] & _in_items[1])
+            _a, _b, _distance = _a[_keep], _b[_keep], _distance[_keep]
+
+        _keys = _a.astype(np.int64) * _capacity + _b
+        # Pairs already close stay close up to distance + hysteresis
+        _close = (_distance <= self.distance) | np.isin(_keys, self.keys, assume_unique=True)
+        _keys, _a, _b, _distance = _keys[_close], _a[_close], _b[_close], _distance[_close]
+
+        _order = np.argsort(_keys)
+        _keys, _pairs, _distance = _keys[_order], np.stack((_a[_order], _b[_order]), axis=1), _distance[_order]
+
+        _entered = ~np.isin(_keys, self.keys, assume_unique=True)
+        _exited = ~np.isin(self.keys, _keys, assume_unique=True)
+        _result = ((_pairs[_entered], _distance[_entered]), (self.pairs[_exited], self.distances[_exited]))
+
+        self.keys, self.pairs, self.distances = _keys, _pairs, _distance
+        return _result
+
+    def forget(self, slots: np.ndarray) -> tuple:
+        _gone = np.isin(self.pairs, slots).any(axis=1)
+        _exited = (self.pairs[_gone], self.distances[_gone])
+        self.keys, self.pairs, self.distances = self.keys[~_gone], self.pairs[~_gone], self.distances[~_gone]
+        return _exited
+
+    def describe(self) -> dict:
+        return {"type": "proximity", "distance": self.distance, "hysteresis": self.hysteresis,
+                "items": None if self.items is None else sorted(self.items),
+                "others": None if self.others is None else sorted(self.others.items),
+                "opacity": self.opacity, "pairs": len(self.keys)}
+
+
+class Trigger_Engine:
+    '''Zone and proximity triggers, evaluated by the render tick against every indexed position.
+
+    Triggers:
+        * Zones (rectangles and polygons): ``enter``/``exit`` events when a point (an item or a
+          group member) moves in or out. Candidates come from the :obj:`Spatial_Index`.
+        * Proximity rules: ``enter``/``exit`` events when two points get within ``distance`` of each
+          other and when they separate (beyond ``distance + hysteresis``). Pairs are found with a
+          spatial hash (check :obj:`close_pairs`), not by comparing all N² pairs.
+
+    Triggers are only evaluated when indexed positions changed. Events get increasing ids and
+    are kept in a ring of ``max_events``; they are also passed to the callbacks (GUI thread).
+    A trigger with ``opacity`` changes the opacity of the points in it, on the frame of the
+    event, and restores it once they left every such trigger. A point in several of them takes
+    the lowest opacity of those still holding it. For group members the alpha of the member
+    color is scaled.
+
+    Used from the GUI thread only.
+
+    Parameters:
+        max_events(int): Events kept for ``get_events``. Default: 10000
+
+    Attributes:
+        callbacks(list): Called with the list of new events after each evaluation that produced events.
+            Function format: fn(events)
+    '''
+    def __init__(self, max_events: int = 10000):
+
+        self.callbacks = []
+        self.last_id = 0
+
+        self._triggers = {}
+        self._events = deque(maxlen=max_events)
+        self._version = None
+
+        # (item name, member index) -> [triggers holding the style (Counter, a point is held once
+        # per close pair it is in), original opacity/alpha]
+        self._styled = {}
+
+    def __len__(self) -> int:
+        return len(self._triggers)
+
+    def _add(self, trigger: _Trigger) -> None:
+        if trigger.name in self._triggers:
+            raise NameError(f"Trigger with same name ('{trigger.name}') already exist.")
+        self._triggers[trigger.name] = trigger
+        self._version = None
+
+    def add_polygon_zone(self, name: str, vertices, items: list = None, opacity: float = None) -> None:
+        ''' Add a polygon zone.
+
+        Parameters:
+            name(str): Unique trigger name
+            vertices(list): Polygon vertices [[x,y], ...], in order
+            items(list): Item names to watch. Default: None (all items)
+            opacity(float): Opacity of points inside the zone. Default: None (no change)
+        '''
+        _vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 2)
+        if len(_vertices) < 3:
+            raise ValueError("A polygon zone needs at least 3 vertices")
+        self._add(_Zone(name, _vertices, False, items, opacity))
+
+    def add_rect_zone(self, name: str, xmin: float, xmax: float, ymin: float, ymax: float,
+                    items: list = None, opacity: float = None) -> None:
+        ''' Add a rectangular zone. Edges are inside.
+
+        Parameters:
+            name(str): Unique trigger name
+            xmin(float): Left edge
+            xmax(float): Right edge
+            ymin(float): Bottom edge
+            ymax(float): Top edge
+            items(list): Item names to watch. Default: None (all items)
+            opacity(float): Opacity of points inside the zone. Default: None (no change)
+        '''
+        _vertices = np.array([[xmin, ymin], [xmax, ymin], [xmax, ymax], [xmin, ymax]], dtype=np.float64)
+        self._add(_Zone(name, _vertices, True, items, opacity))
+
+    def add_proximity_rule(self, name: str, distance: float, items: list = None, others: list = None,
+                    hysteresis: float = 0.0, opacity: float = None) -> None:
+        ''' Add a pairwise distance rule.
+
+        Parameters:
+            name(str): Unique trigger name
+            distance(float): Pairs closer than this enter
+            items(list): Item names to watch. Default: None (all items)
+            others(list): Only pairs between ``items`` and these item names. Default: None (pairs within ``items``)
+            hysteresis(float): Pairs exit beyond ``distance + hysteresis``. Default: 0
+            opacity(float): Opacity of points in a close pair. Default: None (no change)
+        '''
+        if distance <= 0 or hysteresis < 0:
+            raise ValueError("distance must be positive and hysteresis not negative")
+        self._add(_Proximity(name, float(distance), items, others, float(hysteresis), opacity))
+
+    def remove(self, name: str, items: dict = None) -> None:
+        ''' Remove a trigger. Styles it applied are restored, no exit events are sent.
+
+        Parameters:
+            name(str): Trigger name
+            items(dict): Item name -> item, to restore styles. Default: None
+        '''
+        if name not in self._triggers:
+            raise NameError(f"Trigger (Name: '{name}') does not exist")
+        del self._triggers[name]
+
+        for _key in [k for k, v in self._styled.items() if v[0][name]]:
+            self._release_style(_key, name, items, every = True)
+
+    def get_triggers(self) -> dict:
+        ''' Registered triggers.
+
+        Returns:
+            dict: Trigger name -> description (type, geometry, items, opacity and current members)
+        '''
+        return {name: trigger.describe() for name, trigger in self._triggers.items()}
+
+    def get_events(self, since_id: int = None) -> list:
+        ''' Events kept in the ring.
+
+        Parameters:
+            since_id(int): Only events with a larger id. Default: None (all kept events)
+
+        Returns:
+            list: Events, oldest first
+        '''
+        if since_id is None:
+            return list(self._events)
+        return [event for event in self._events if event["id"] > since_id]
+
+    def evaluate(self, index, items: dict) -> set:
+        ''' Evaluate every trigger. Called by the render tick after the index was updated.
+
+        Parameters:
+            index(Spatial_Index): Server spatial index
+            items(dict): Item name -> item
+
+        Returns:
+            set: Names of the items whose style changed. They need to be redrawn.
+        '''
+        if not self._triggers or index.version == self._version:
+            return set()
+        self._version = index.version
+
+        _time = time.time()
+        _events = []
+        _restyled = set()
+        for trigger in list(self._triggers.values()):
+            _entered, _exited = trigger.evaluate(index)
+            self._report(trigger, index, items, _entered, _exited, _time, _events, _restyled)
+
+        self._publish(_events)
+        return _restyled
+
+    def forget_slots(self, index, items: dict, slots: np.ndarray) -> None:
+        ''' Exit events for the slots of an item being removed. Call before ``Spatial_Index.unregister``.
+
+        Parameters:
+            index(Spatial_Index): Server spatial index
+            items(dict): Item name -> item
+            slots(numpy.ndarray): Slots of the removed item
+        '''
+        _time = time.time()
+        _events = []
+        for trigger in self._triggers.values():
+            _empty = (np.zeros((0, 2), dtype=np.intp), np.zeros(0)) if isinstance(trigger, _Proximity) else np.zeros(0, dtype=np.intp)
+            self._report(trigger, index, items, _empty, trigger.forget(slots), _time, _events, set())
+
+        _name = index.names[slots[0]] if len(slots) else None
+        for _key in [k for k in self._styled if k[0] == _name]:
+            del self._styled[_key]
+        self._publish(_events)
+
+    def _report(self, trigger, index, items, entered, exited, event_time, events, restyled) -> None:
+        _proximity = isinstance(trigger, _Proximity)
+        for _kind, _change in (("exit", exited), ("enter", entered)):
+            _slots = _change[0] if _proximity else _change
+            if not len(_slots):
+                continue
+
+            _first = self._labels(index, items, _slots[:, 0] if _proximity else _slots)
+            if _proximity:
+                _second = self._labels(index, items, _slots[:, 1])
+                for (_name, _member), (_other, _other_member), _distance in zip(_first, _second, _change[1].tolist()):
+                    self.last_id += 1
+                    events.append({"id": self.last_id, "time": event_time, "trigger": trigger.name, "event": _kind,
+                                "item": _name, "member": _member,
+                                "other": _other, "other_member": _other_member, "distance": _distance})
+            else:
+                for _name, _member in _first:
+                    self.last_id += 1
+                    events.append({"id": self.last_id, "time": event_time, "trigger": trigger.name, "event": _kind,
+                                "item": _name, "member": _member})
+
+            if trigger.opacity is not None:
+                self._style(trigger, _kind, index, items, _slots.reshape(-1), restyled)
+
+    @staticmethod
+    def _labels(index, items: dict, slots: np.ndarray) -> list:
+        ''' (item name, member name) of slots. Member name is None for single items.
+        '''
+        _member_names = {}
+        _labels = []
+        for _name, _member in zip(index.names[slots].tolist(), index.members[slots].tolist()):
+            if _name not in _member_names:
+                _member_names[_name] = getattr(items.get(_name), "member_names", None)
+            _names = _member_names[_name]
+            _labels.append((_name, None if _names is None else _names[_member]))
+        return _labels
+
+    def _publish(self, events: list) -> None:
+        if not events:
+            return
+        self._events.extend(events)
+        for callback in self.callbacks:
+            callback(events)
+
+    # Appearance
+
+    def _style(self, trigger, kind: str, index, items: dict, slots: np.ndarray, restyled: set) -> None:
+        for _slot in slots.tolist():
+            _key = (index.names[_slot], int(index.members[_slot]))
+            if kind == "enter":
+                self._hold_style(_key, trigger, items, restyled)
+            else:
+                self._release_style(_key, trigger.name, items, restyled)
+
+    def _hold_style(self, key: tuple, trigger, items: dict, restyled: set) -> None:
+        _item = items.get(key[0])
+        if _item is None:
+            return
+
+        _state = self._styled.get(key)
+        if _state is None:
+            _state = self._styled[key] = [Counter(), self._get_opacity(_item, key[1])]
+        _state[0][trigger.name] += 1
+        self._apply_style(key, _state, _item, restyled)
+
+    def _release_style(self, key: tuple, trigger_name: str, items: dict, restyled: set = None, every: bool = False) -> None:
+        _state = self._styled.get(key)
+        if _state is None or not _state[0][trigger_name]:
+            return
+
+        _state[0][trigger_name] = 0 if every else _state[0][trigger_name] - 1
+        if not _state[0][trigger_name]:
+            del _state[0][trigger_name]
+        if not _state[0]:
+            del self._styled[key]
+
+        _item = items.get(key[0]) if items is not None else None
+        if _item is not None:
+            self._apply_style(key, _state, _item, restyled)
+
+    def _apply_style(self, key: tuple, state: list, item, restyled: set) -> None:
+        ''' Set the style of a point from the triggers still holding it. Original once none does.
+        '''
+        _value = state[1]
+        if state[0]:
+            _opacity = min(self._triggers[_name].opacity for _name in state[0])
+            _value = state[1] * _opacity if hasattr(item, "colors") else _opacity
+        self._set_opacity(item, key[1], _value)
+        if restyled is not None:
+            restyled.add(key[0])
+
+    @staticmethod
+    def _get_opacity(item, member: int) -> float:
+        if hasattr(item, "colors"):
+            return float(item.colors[member, 3])
+        return item.handle.opacity()
+
+    @staticmethod
+    def _set_opacity(item, member: int, value: float) -> None:
+        if hasattr(item, "colors"):
+            _color = item.colors[member].copy()
+            _color[3] = int(round(min(max(value, 0), 255)))
+            item.set_colors(_color, [member])
+        else:
+            item.handle.setOpacity(value)
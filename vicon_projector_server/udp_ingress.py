@@ -0,0 +1,293 @@
+import select
+import socket
+import time
+from threading import Event, Lock
+import numpy as np
+
+# One record per tracked body. A datagram carries one or more records
+PACKET_DTYPE = np.dtype([
+    ("id", "<u4"),          # Body id. Mapped to item slots with UDP_Ingress.register
+    ("seq", "<u4"),         # Per body sequence number. Wraps around
+    ("x", "<f8"),
+    ("y", "<f8"),
+    ("yaw", "<f8"),         # Radians
+    ("timestamp", "<f8"),   # Sample time (seconds since epoch)
+])
+
+
+class UDP_Ingress:
+    '''Binary UDP position ingress. Alternative to VRPN tracking.
+
+    Datagrams are arrays of :obj:`PACKET_DTYPE` records (40 bytes each, little endian).
+    Pending datagrams are received in batches and decoded with one ``numpy.frombuffer``.
+    Records go to the slots of the registered items in the server's :obj:`Position_Buffer`
+    (same path as the Vicon callbacks, ``tracking_offset`` applied).
+
+    Each body id keeps the last accepted sequence number. Records with an older or equal
+    sequence number (compared modulo 2**32, so wrap around is handled) are dropped as stale
+    or reordered. Within a batch only the newest record of each body is written.
+
+    A record that is more than ``restart_gap`` behind, or not ahead but with a newer timestamp,
+    is taken as a restarted sender: the body resyncs on it (counted in ``restarts``).
+
+    Parameters:
+        position_buffer(Position_Buffer): Server position buffer
+        hostname(str): Address to bind. Default: "localhost"
+        port(int): UDP port. Default: 4002
+        batch(int): Most datagrams decoded at once. Default: 256
+        max_datagram(int): Largest datagram accepted (bytes). Default: 65507
+        restart_gap(int): Sequence numbers a record can be behind before it is taken as a sender restart. Default: 1000
+
+    Attributes:
+        yaw(dict): Body id -> latest yaw.
+        on_data(function): Called (from the ingress thread) after a batch was written. Default: None
+    '''
+    def __init__(self, position_buffer: 'Position_Buffer',
+                hostname: str = None,
+                port: int = None,
+                batch: int = 256,
+                max_datagram: int = 65507,
+                restart_gap: int = 1000):
+
+        self.position_buffer = position_buffer
+        self.hostname = "localhost" if hostname is None else hostname
+        self.port = 4002 if port is None else port
+        self.batch = batch
+        self.max_datagram = max_datagram
+        self.restart_gap = restart_gap
+
+        self.on_data = None
+        self.yaw = {}
+
+        self.stats = {"datagrams": 0, "records": 0, "written": 0,
+                    "stale": 0, "restarts": 0, "unknown": 0, "malformed": 0}
+
+        # Registered bodies, sorted by id. Replaced (not mutated) on registration
+        self._ids = np.zeros(0, dtype=np.uint32)
+        self._slots = np.zeros(0, dtype=np.intp)
+        self._offsets = np.zeros((0, 2), dtype=np.float64)
+        self._names = []
+        self._last_seq = np.zeros(0, dtype=np.uint32)
+        self._last_time = np.zeros(0, dtype=np.float64)
+        self._seen = np.zeros(0, dtype=bool)
+        self._lock = Lock()
+
+        self._stop = Event()
+        self.socket = None
+
+    def register(self, name: str, ids, slots, tracking_offset = (0.0, 0.0)) -> None:
+        ''' Route body ids to item slots. Replaces the previous ids of the item.
+
+        Parameters:
+            name(str): Item name
+            ids(list[int]): Body id of each slot
+            slots(numpy.ndarray): Item slots in the position buffer
+            tracking_offset(list[float]): Added to received positions. Default: [0,0]
+        '''
+        _ids = np.atleast_1d(np.asarray(ids, dtype=np.uint32))
+        _slots = np.atleast_1d(np.asarray(slots, dtype=np.intp))
+        if len(_ids) != len(_slots):
+            raise ValueError(f"Got {len(_ids)} ids for {len(_slots)} slots of item '{name}'")
+        if len(np.unique(_ids)) != len(_ids):
+            raise ValueError(f"Duplicate ids for item '{name}'")
+
+        with self._lock:
+            _keep = np.array([n != name for n in self._names], dtype=bool)
+            _taken = np.intersect1d(self._ids[_keep], _ids)
+            if len(_taken):
+                raise ValueError(f"Ids {_taken.tolist()} are already used by other items")
+
+            self._set(np.concatenate([self._ids[_keep], _ids]),
+                    np.concatenate([self._slots[_keep], _slots]),
+                    np.concatenate([self._offsets[_keep], np.tile(np.asarray(tracking_offset, dtype=np.float64), (len(_ids), 1))]),
+                    [n for n, k in zip(self._names, _keep) if k] + [name]*len(_ids),
+                    np.concatenate([self._last_seq[_keep], np.zeros(len(_ids), dtype=np.uint32)]),
+                    np.concatenate([self._last_time[_keep], np.zeros(len(_ids), dtype=np.float64)]),
+                    np.concatenate([self._seen[_keep], np.zeros(len(_ids), dtype=bool)]))
+
+    def unregister(self, name: str) -> None:
+        ''' Stop routing ids to an item.
+
+        Parameters:
+            name(str): Item name
+        '''
+        with self._lock:
+            _keep = np.array([n != name for n in self._names], dtype=bool)
+            if _keep.all():
+                return
+            self._set(self._ids[_keep], self._slots[_keep], self._offsets[_keep],
+                    [n for n, k in zip(self._names, _keep) if k],
+                    self._last_seq[_keep], self._last_time[_keep], self._seen[_keep])
+
+    def _set(self, ids, slots, offsets, names, last_seq, last_time, seen) -> None:
+        _order = np.argsort(ids, kind="stable")
+        self._ids = ids[_order]
+        self._slots = slots[_order]
+        self._offsets = offsets[_order]
+        self._names = [names[i] for i in _order]
+        self._last_seq = last_seq[_order]
+        self._last_time = last_time[_order]
+        self._seen = seen[_order]
+
+    def get_stats(self) -> dict:
+        '''Ingress counters.
+
+        Returns:
+            dict: ``datagrams``, ``records``, ``written``, ``stale``, ``restarts`` (sender resyncs), ``unknown`` (unregistered id), ``malformed`` (datagrams)
+        '''
+        return dict(self.stats)
+
+    def open(self) -> None:
+        ''' Bind the socket. Called by ``run``.
+        '''
+        if self.socket is not None:
+            return
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4*1024*1024)
+        self.socket.bind((self.hostname, self.port))
+        self.socket.setblocking(False)
+
+    def stop(self) -> None:
+        ''' Stop ``run()`` at the next wake up.
+        '''
+        self._stop.set()
+
+    def run(self) -> None:
+        ''' Receive loop. Blocks until ``stop()`` is called.
+
+        This function needs to run in a seperate thread.
+        '''
+        self.open()
+        self._stop.clear()
+
+        _buffer = bytearray(self.max_datagram)
+        _view = memoryview(_buffer)
+        _batch = bytearray()
+
+        while not self._stop.is_set():
+            _ready, _, _ = select.select([self.socket], [], [], 0.1)
+            if not _ready:
+                continue
+
+            # Drain pending datagrams into one buffer
+            _batch.clear()
+            for _ in range(self.batch):
+                try:
+                    _size = self.socket.recv_into(_buffer)
+                except OSError:
+                    # Nothing pending (BlockingIOError) or socket closed
+                    break
+
+                self.stats["datagrams"] += 1
+                if _size == 0 or _size % PACKET_DTYPE.itemsize:
+                    self.stats["malformed"] += 1
+                    continue
+                _batch += _view[:_size]
+
+            if _batch and self.process(np.frombuffer(bytes(_batch), dtype=PACKET_DTYPE)):
+                if self.on_data is not None:
+                    self.on_data()
+
+        self.socket.close()
+        self.socket = None
+
+    def process(self, records: np.ndarray) -> int:
+        ''' Write a batch of records into the position buffer.
+
+        Parameters:
+            records(numpy.ndarray): Records of :obj:`PACKET_DTYPE`, in arrival order
+
+        Returns:
+            int: Number of slots written
+        '''
+        self.stats["records"] += len(records)
+
+        with self._lock:
+            _ids = self._ids
+            if not len(_ids):
+                self.stats["unknown"] += len(records)
+                return 0
+
+            # Registered bodies
+            _index = np.searchsorted(_ids, records["id"])
+            _index[_index == len(_ids)] = 0
+            _known = _ids[_index] == records["id"]
+            self.stats["unknown"] += int(np.count_nonzero(~_known))
+            records = records[_known]
+            _index = _index[_known]
+            if not len(records):
+                return 0
+
+            # Bodies seen for the first time start from their first record in the batch
+            _unseen = np.flatnonzero(~self._seen[_index])
+            if len(_unseen):
+                _rows, _first = np.unique(_index[_unseen], return_index=True)
+                self._last_seq[_rows] = records["seq"][_unseen[_first]] - np.uint32(1)
+
+            # Sequence distance from the last accepted record (modulo 2**32)
+            _delta = (records["seq"] - self._last_seq[_index]).view(np.int32)
+
+            # Restarted senders: far behind, or not ahead with a newer sample. The body resyncs on
+            # its last restart record of the batch. Its earlier records in the batch are stale
+            _restart = np.flatnonzero((_delta < -self.restart_gap) |
+                                    ((_delta <= 0) & (records["timestamp"] > self._last_time[_index])))
+            _arrival = np.arange(len(records))
+            if len(_restart):
+                _cut = np.full(len(_ids), -1)
+                np.maximum.at(_cut, _index[_restart], _restart)
+                _rows = np.flatnonzero(_cut >= 0)
+                self._last_seq[_rows] = records["seq"][_cut[_rows]] - np.uint32(1)
+                self.stats["restarts"] += len(_rows)
+                _delta = (records["seq"] - self._last_seq[_index]).view(np.int32)
+                _delta[_arrival < _cut[_index]] = 0
+
+            _fresh = _delta > 0
+            self.stats["stale"] += int(np.count_nonzero(~_fresh))
+
+            # Newest record of each body: sort by body, then by distance, keep the last per body
+            _candidates = np.flatnonzero(_fresh)
+            _order = _candidates[np.lexsort((_delta[_candidates], _index[_candidates]))]
+            _bodies = _index[_order]
+            _newest = _order[np.append(_bodies[1:] != _bodies[:-1], True)] if len(_order) else _order
+            self.stats["stale"] += len(_candidates) - len(_newest)
+            if not len(_newest):
+                return 0
+
+            _records = records[_newest]
+            _rows = _index[_newest]
+
+            self._last_seq[_rows] = _records["seq"]
+            self._last_time[_rows] = _records["timestamp"]
+            self._seen[_rows] = True
+
+            _positions = np.column_stack((_records["x"], _records["y"])) + self._offsets[_rows]
+            self.position_buffer.write_positions(self._slots[_rows], _positions, _records["timestamp"])
+
+            self.yaw.update(zip(_records["id"].tolist(), _records["yaw"].tolist()))
+
+        self.stats["written"] += len(_newest)
+        return len(_newest)
+
+
+def pack_records(ids, positions, seq, yaw = 0.0, timestamp = None) -> bytes:
+    ''' Encode positions as a datagram. For senders and tests.
+
+    Parameters:
+        ids(list[int]): Body ids
+        positions(numpy.ndarray): Positions. Shape (N,2)
+        seq(int|list[int]): Sequence number(s)
+        yaw(float|list[float]): Yaw(s). Default: 0
+        timestamp(float|list[float]): Sample time(s). Default: current time
+
+    Returns:
+        bytes: Datagram
+    '''
+    _positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+    _records = np.zeros(len(_positions), dtype=PACKET_DTYPE)
+    _records["id"] = ids
+    _records["seq"] = np.asarray(seq, dtype=np.int64) % 2**32
+    _records["x"] = _positions[:, 0]
+    _records["y"] = _positions[:, 1]
+    _records["yaw"] = yaw
+    _records["timestamp"] = time.time() if timestamp is None else timestamp
+    return _records.tobytes()
@@ -1,12 +1,213 @@
-from PyQt6 import QtWidgets, QtGui
+from PyQt6 import QtWidgets, QtGui, QtCore
 import pyqtgraph as pg
 from pyqtgraph import PlotWidget, plot
+from .texture_cache import Texture_Item, default_texture_cache
 import os
 import json
+import time
 import numpy as np
 
+class _Plot_Widget(pg.PlotWidget):
+    '''PlotWidget that reports completed paints. Used for latency tracing.
+
+    Attributes:
+        paint_time(float): Duration of the last paint, in seconds.
+    '''
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.paint_callbacks = []
+        self.paint_time = 0.0
+
+    def paintEvent(self, ev):
+        _start = time.perf_counter()
+        super().paintEvent(ev)
+        self.paint_time = time.perf_counter() - _start
+        for callback in self.paint_callbacks:
+            callback()
+
+
+class _Fixed_View(QtWidgets.QGraphicsView):
+    '''Bare graphics view with a fixed world-to-screen transform. Used by the "fixed" canvas backend.
+
+    Skips the ViewBox of ``pg.PlotWidget`` (bounds tracking, child group updates, auto range).
+    Same ``addItem``/``removeItem``/``setBackground`` surface as ``pg.PlotWidget``.
+
+    Parameters:
+        world(QtCore.QRectF): Visible world rectangle. Y axis points up.
+        bsp_threshold(int): Use a BSP tree index from this number of items on, no index below. Default: 2000
+        minimal_update_limit(int): Repaint only the changed areas up to this number of items. Above it, one
+            bounding rectangle of all changes is repainted (cheaper with many moving items). Default: 100
+        scene(QtWidgets.QGraphicsScene): Scene to show. Tiles of a canvas share one scene. Default: None (new scene)
+
+    Attributes:
+        paint_time(float): Duration of the last paint, in seconds.
+        blend(tuple): Edge blend widths (left, right, bottom, top), in world units. Check ``set_blend``.
+    '''
+    # Same signals as pg.GraphicsView. pyqtgraph items connect to them
+    sigDeviceRangeChanged = QtCore.pyqtSignal(object, object)
+    sigDeviceTransformChanged = QtCore.pyqtSignal(object)
+
+    def __init__(self, world: QtCore.QRectF, bsp_threshold: int = 2000, minimal_update_limit: int = 100,
+                scene: QtWidgets.QGraphicsScene = None, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.paint_callbacks = []
+        self.paint_time = 0.0
+        self.bsp_threshold = bsp_threshold
+        self.minimal_update_limit = minimal_update_limit
+        self.blend = (0.0, 0.0, 0.0, 0.0)
+        self._blend_strips = []
+
+        if scene is None:
+            scene = QtWidgets.QGraphicsScene(self)
+            scene.setItemIndexMethod(QtWidgets.QGraphicsScene.ItemIndexMethod.NoIndex)
+        self.setScene(scene)
+
+        self.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setVerticalScrollBarPolicy(QtCore.Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setFrameShape(QtWidgets.QFrame.Shape.NoFrame)
+        self.setAlignment(QtCore.Qt.AlignmentFlag.AlignLeft | QtCore.Qt.AlignmentFlag.AlignTop)
+        self.setTransformationAnchor(QtWidgets.QGraphicsView.ViewportAnchor.NoAnchor)
+        self.setResizeAnchor(QtWidgets.QGraphicsView.ViewportAnchor.NoAnchor)
+        self.setViewportUpdateMode(QtWidgets.QGraphicsView.ViewportUpdateMode.MinimalViewportUpdate)
+        self.setOptimizationFlag(QtWidgets.QGraphicsView.OptimizationFlag.DontSavePainterState, True)
+        self.setOptimizationFlag(QtWidgets.QGraphicsView.OptimizationFlag.DontAdjustForAntialiasing, True)
+        self.setInteractive(False)
+        self.setBackground(pg.getConfigOption("background"))
+
+        self.set_world(world)
+
+    def set_world(self, world: QtCore.QRectF) -> None:
+        ''' Set the visible world rectangle.
+        '''
+        self.world = QtCore.QRectF(world)
+        self.setSceneRect(self.world)
+        self._update_transform()
+
+    def _update_transform(self) -> None:
+        _width, _height = self.viewport().width(), self.viewport().height()
+        if _width <= 0 or _height <= 0 or self.world.width() == 0 or self.world.height() == 0:
+            return
+        self.setTransform(QtGui.QTransform.fromScale(_width/self.world.width(), -_height/self.world.height()))
+        self.sigDeviceRangeChanged.emit(self, self.world)
+        self.sigDeviceTransformChanged.emit(self)
+
+    def resizeEvent(self, ev):
+        super().resizeEvent(ev)
+        self._update_transform()
+
+    def viewRect(self) -> QtCore.QRectF:
+        ''' Visible world rectangle. Used by pyqtgraph items (check ``GraphicsItem.viewRect``).
+        '''
+        return QtCore.QRectF(self.world)
+
+    def addItem(self, item) -> None:
+        self.scene().addItem(item)
+        self._update_modes()
+
+    def removeItem(self, item) -> None:
+        self.scene().removeItem(item)
+        self._update_modes()
+
+    def _update_modes(self) -> None:
+        ''' Item index and viewport update mode (of every view of the scene) for the current number of items.
+        '''
+        _scene = self.scene()
+        _count = len(_scene.items())
+
+        _method = (QtWidgets.QGraphicsScene.ItemIndexMethod.BspTreeIndex if _count >= self.bsp_threshold
+                    else QtWidgets.QGraphicsScene.ItemIndexMethod.NoIndex)
+        if _scene.itemIndexMethod() != _method:
+            _scene.setItemIndexMethod(_method)
+
+        _mode = (QtWidgets.QGraphicsView.ViewportUpdateMode.MinimalViewportUpdate if _count <= self.minimal_update_limit
+                else QtWidgets.QGraphicsView.ViewportUpdateMode.BoundingRectViewportUpdate)
+        for _view in _scene.views():
+            if _view.viewportUpdateMode() != _mode:
+                _view.setViewportUpdateMode(_mode)
+
+    def set_blend(self, left: float = 0.0, right: float = 0.0, bottom: float = 0.0, top: float = 0.0,
+                gamma: float = 2.2, steps: int = 16) -> None:
+        ''' Fade the edges of the view out, for projectors with overlapping images.
+
+        In an overlap of width ``w``, each projector's light falls off with a smoothstep ramp so
+        the light of both projectors adds up to one. The ramp is applied to pixel values through
+        the projector ``gamma``. Corners covered by two ramps get both.
+
+        Parameters:
+            left(float): Width of the left overlap, in world units. Default: 0 (no blend)
+            right(float): Width of the right overlap. Default: 0
+            bottom(float): Width of the bottom overlap. Default: 0
+            top(float): Width of the top overlap. Default: 0
+            gamma(float): Projector gamma. Default: 2.2
+            steps(int): Gradient stops per ramp. Default: 16
+        '''
+        self.blend = (left, right, bottom, top)
+        _world = self.world
+
+        # (strip, ramp start (full light), ramp end (edge)) in world coordinates
+        _edges = ((QtCore.QRectF(_world.left(), _world.top(), left, _world.height()),
+                    QtCore.QPointF(_world.left() + left, 0), QtCore.QPointF(_world.left(), 0)),
+                (QtCore.QRectF(_world.right() - right, _world.top(), right, _world.height()),
+                    QtCore.QPointF(_world.right() - right, 0), QtCore.QPointF(_world.right(), 0)),
+                (QtCore.QRectF(_world.left(), _world.top(), _world.width(), bottom),
+                    QtCore.QPointF(0, _world.top() + bottom), QtCore.QPointF(0, _world.top())),
+                (QtCore.QRectF(_world.left(), _world.bottom() - top, _world.width(), top),
+                    QtCore.QPointF(0, _world.bottom() - top), QtCore.QPointF(0, _world.bottom())))
+
+        self._blend_strips = []
+        for _width, (_strip, _start, _end) in zip(self.blend, _edges):
+            if _width <= 0:
+                continue
+
+            _gradient = QtGui.QLinearGradient(_start, _end)
+            for _t in np.linspace(0.0, 1.0, steps):
+                _light = 1.0 - (3*_t**2 - 2*_t**3)              # Smoothstep. Sums to 1 with the other projector
+                _gain = _light ** (1.0/gamma)                   # Pixel value giving that light
+                _gradient.setColorAt(float(_t), QtGui.QColor(0, 0, 0, int(round(255*(1.0 - _gain)))))
+            self._blend_strips.append((_strip, QtGui.QBrush(_gradient)))
+
+        self.viewport().update()
+
+    def drawForeground(self, painter, rect) -> None:
+        if not self._blend_strips:
+            return
+
+        painter.save()
+        painter.setPen(QtCore.Qt.PenStyle.NoPen)
+        for _strip, _brush in self._blend_strips:
+            if _strip.intersects(rect):
+                painter.fillRect(_strip, _brush)
+        painter.restore()
+
+    def setBackground(self, background) -> None:
+        self.setBackgroundBrush(pg.mkBrush(pg.mkColor(background)))
+
+    def paintEvent(self, ev):
+        _start = time.perf_counter()
+        super().paintEvent(ev)
+        self.paint_time = time.perf_counter() - _start
+        for callback in self.paint_callbacks:
+            callback()
+
+
 class Vicon_Canvas(QtWidgets.QMainWindow):
-    
+    '''Projection canvas. Maps the world rectangle ``config["x"]``, ``config["y"]`` onto a projector.
+
+    Tiled mode (``config["tiles"]``, "fixed" backend) spans the canvas over several projectors.
+    Each tile is a view of one shared scene covering a sub-rectangle of the world, so items
+    exist once and each projector only paints the items inside its region. Tiles are dicts:
+
+        * ``"x"``, ``"y"``: World range of the tile. Tiles may overlap.
+        * ``"display_monitor"``: Monitor of the tile. Default: tile index
+        * ``"blend"``: Edge blend widths [left, right, bottom, top] in world units. Default: the overlaps with the other tiles
+
+    The first tile is shown in this window, the others in their own windows (``tiles``).
+    ``config["blend_gamma"]`` sets the projector gamma of the blends (default: 2.2).
+
+    Attributes:
+        window: Canvas widget (first tile when tiled). Items are added to it.
+        tiles(list): Widget of each tile. ``[window]`` when not tiled.
+    '''
     def __init__(self, config_data:dict, *args, **kwargs):
         super(Vicon_Canvas, self).__init__(*args, **kwargs)
 
@@ -31,65 +232,213 @@ class Vicon_Canvas(QtWidgets.QMainWindow):
             * Set Axis Range
             * Disable Mouse interaction
             * Move the canvas to preferred monitor/projector
+
+        ``config["canvas_backend"]`` selects the widget: "plot" (default, ``pg.PlotWidget``) or
+        "fixed" (bare graphics view with a fixed transform, no axes).
         '''
-        self.window = pg.PlotWidget()
-        self.setCentralWidget(self.window)
-        self.hide_axis()
-        
-        self.set_axis_range()
+        self.backend = self.config_data.get("canvas_backend","plot")
 
-        self.window.setMouseEnabled(x=False, y=False)           # Prevent Mouse interactions (panning/zooming)
+        if self.backend == "fixed":
+            self.tiles = []
+            _scene = None
+            for _world in self._tile_rects():
+                _tile = _Fixed_View(_world,
+                                    bsp_threshold = self.config_data.get("canvas_bsp_threshold",2000),
+                                    minimal_update_limit = self.config_data.get("canvas_minimal_update_limit",100),
+                                    scene = _scene)
+                _scene = _tile.scene()
+
+                # Callbacks run after the paint of any tile
+                if self.tiles:
+                    _tile.paint_callbacks = self.tiles[0].paint_callbacks
+                self.tiles.append(_tile)
+
+            self.window = self.tiles[0]
+            self.setCentralWidget(self.window)
+            self._set_blends()
+        elif self.backend == "plot":
+            if "tiles" in self.config_data:
+                raise ValueError("Tiled canvas needs canvas_backend 'fixed'")
+            self.window = _Plot_Widget()
+            self.setCentralWidget(self.window)
+            self.hide_axis()
+            
+            self.set_axis_range()
+
+            self.window.setMouseEnabled(x=False, y=False)       # Prevent Mouse interactions (panning/zooming)
+            self.tiles = [self.window]
+        else:
+            raise ValueError(f"Unknown canvas backend '{self.backend}'. Use 'plot' or 'fixed'")
 
         monitors = QtGui.QScreen.virtualSiblings(self.screen())
 
-        if "display_monitor" in self.config_data.keys():
+        if "tiles" in self.config_data:
+            self.monitor = monitors[self._tile_monitor(0, len(monitors))].availableGeometry()
+        elif "display_monitor" in self.config_data.keys():
             self.monitor = monitors[self.config_data["display_monitor"]].availableGeometry()
         else:
             self.monitor = monitors[0].availableGeometry()
 
         self.move(self.monitor.left(), self.monitor.top())
 
+    def _tile_rects(self) -> list:
+        ''' World rectangle of each tile. The whole world when not tiled.
+        '''
+        if "tiles" not in self.config_data:
+            return [self._world_rect()]
+
+        _rects = []
+        for _tile in self.config_data["tiles"]:
+            (_xmin, _xmax), (_ymin, _ymax) = _tile["x"], _tile["y"]
+            _rects.append(QtCore.QRectF(_xmin, _ymin, _xmax-_xmin, _ymax-_ymin))
+        return _rects
+
+    def _tile_monitor(self, index: int, monitor_count: int) -> int:
+        _monitor = self.config_data["tiles"][index].get("display_monitor", index)
+        # Fewer screens than tiles (Eg: offscreen platform). Stack them on the last one
+        return min(_monitor, monitor_count - 1)
+
+    def _set_blends(self) -> None:
+        ''' Edge blends of the tiles. Default widths are the overlaps with the other tiles.
+        '''
+        _rects = [tile.world for tile in self.tiles]
+        for _index, (_tile, _rect) in enumerate(zip(self.tiles, _rects)):
+            _blend = self.config_data["tiles"][_index].get("blend") if "tiles" in self.config_data else None
+            if _blend is None:
+                _blend = [0.0, 0.0, 0.0, 0.0]
+                for _other in _rects[:_index] + _rects[_index+1:]:
+                    _overlap = _rect.intersected(_other)
+                    if _overlap.isEmpty():
+                        continue
+                    # Neighbour extending past an edge: the overlap along that edge is blended
+                    if _other.left() < _rect.left():
+                        _blend[0] = max(_blend[0], _overlap.width())
+                    if _other.right() > _rect.right():
+                        _blend[1] = max(_blend[1], _overlap.width())
+                    if _other.top() < _rect.top():
+                        _blend[2] = max(_blend[2], _overlap.height())
+                    if _other.bottom() > _rect.bottom():
+                        _blend[3] = max(_blend[3], _overlap.height())
+
+            if any(_blend):
+                _tile.set_blend(*_blend, gamma = self.config_data.get("blend_gamma",2.2))
+
+    def show_tiles(self, resolution: 'list[int]' = None) -> None:
+        ''' Show the windows of the tiles after the first one, full screen on their monitors.
+
+        Parameters:
+            resolution(list[int]): Show them as windows of this size instead (headless). Default: None
+        '''
+        if len(self.tiles) < 2:
+            return
+
+        monitors = QtGui.QScreen.virtualSiblings(self.screen())
+        for _index, _tile in enumerate(self.tiles[1:], start=1):
+            _tile.setWindowTitle(f"{self.windowTitle()} ({_index})")
+            if resolution is not None:
+                _tile.resize(*resolution)
+                _tile.show()
+                continue
+
+            _monitor = monitors[self._tile_monitor(_index, len(monitors))].availableGeometry()
+            _tile.move(_monitor.left(), _monitor.top())
+            _tile.showFullScreen()
+
+    def close_tiles(self) -> None:
+        ''' Close the windows of the tiles after the first one.
+        '''
+        for _tile in self.tiles[1:]:
+            _tile.close()
+
+    def get_tiles(self) -> list:
+        ''' World rectangle and edge blends of each tile.
+
+        Returns:
+            list: ``{"x": [xmin, xmax], "y": [ymin, ymax], "blend": [left, right, bottom, top], "items": items in the tile}``
+                per tile. ``items`` is None with the "plot" backend.
+        '''
+        _tiles = []
+        for _tile in self.tiles:
+            if self.backend != "fixed":
+                _tiles.append({"x": [self.xmin, self.xmax], "y": [self.ymin, self.ymax],
+                            "blend": [0.0, 0.0, 0.0, 0.0], "items": None})
+                continue
+
+            _world = _tile.viewRect()
+            _tiles.append({"x": [_world.left(), _world.right()],
+                        "y": [_world.top(), _world.bottom()],
+                        "blend": list(_tile.blend),
+                        "items": len(_tile.items(_tile.viewport().rect()))})
+        return _tiles
+
+    def add_paint_callback(self, callback) -> None:
+        ''' Call a function every time the canvas finished painting.
+
+        Parameters:
+            callback(function): Function format: fn()
+        '''
+        self.window.paint_callbacks.append(callback)
+
+    def _world_rect(self) -> QtCore.QRectF:
+        return QtCore.QRectF(self.xmin, self.ymin, self.xmax-self.xmin, self.ymax-self.ymin)
+
     def set_axis_range(self):
         ''' Set Axis Range
         '''
+        if self.backend == "fixed":
+            for _tile, _world in zip(self.tiles, self._tile_rects()):
+                _tile.set_world(_world)
+            self._set_blends()
+            return
+
         self.window.setXRange(self.xmin, self.xmax, padding=0)  # Set X Range
         self.window.setYRange(self.ymin, self.ymax, padding=0)  # Set Y Range
 
     def hide_axis(self):
         ''' Hide Axis
         '''
+        if self.backend == "fixed":
+            return      # No axes
+
         self.window.getPlotItem().hideAxis('top')
         self.window.getPlotItem().hideAxis('bottom')
         self.window.getPlotItem().hideAxis('left')
         self.window.getPlotItem().hideAxis('right')
 
     def show_axis(self):
-        '''Show Axis
+        '''Show Axis. Not available with the "fixed" canvas backend.
         '''
+        if self.backend == "fixed":
+            raise NotImplementedError("The 'fixed' canvas backend has no axes")
+
         self.window.getPlotItem().showAxis('bottom')
         self.window.getPlotItem().showAxis('left')
 
     def set_background(self,color: tuple = None,
-                            image: np.ndarray = None):
+                            image: np.ndarray = None,
+                            zero_copy: bool = False):
         '''Set Canvas Background
 
         Parameters:
             color(tuple): RGB/RGBA Tuple of the background color
-            image(np.ndarray): Image array
+            image(np.ndarray): Image array. Converted once (check :obj:`normalize_image`)
+            zero_copy(bool): Draw straight from a uint8 ``image`` without converting or copying it. Default: False
         '''
         if self._bg:
             print("yess")
 
         if color is not None:
             assert image is None, "Cannot specify background image along with background color"
-            self.window.setBackground(color)
+            for _tile in self.tiles:
+                _tile.setBackground(color)
         
         if image is not None:
             assert color is None, "Cannot specify background color along with background image"
 
             
-            # Image Item
-            self._bg = pg.ImageItem(image=image)
+            # Image Item. Pre-converted, paints only blit
+            _texture = default_texture_cache.wrap(image) if zero_copy else default_texture_cache.get(image)
+            self._bg = Texture_Item(_texture)
             self._bg.setRect(self.xmin,             # x
                         self.ymin,                  # y
                         self.xmax-self.xmin,        # width
@@ -0,0 +1,158 @@
+import select
+import time
+from threading import Event, Lock
+
+
+class Vicon_Ingest:
+    '''Event driven VRPN ingest engine.
+
+    Replaces the busy-spinning vicon loop. Trackers are only pumped
+    (``mainloop()``) when data is pending on their sockets. Trackers that do not
+    expose a file descriptor (``fileno()``) are polled with a bounded adaptive
+    sleep: the wait is reset to ``min_sleep`` whenever a pump produced callbacks
+    and backs off up to ``max_sleep`` while the trackers are quiet.
+
+    Parameters:
+        min_sleep(float): Shortest wait between polls (in seconds). Default: 0.0005
+        max_sleep(float): Longest wait between polls (in seconds). Bounds the added latency. Default: 0.005
+        backoff(float): Multiplier applied to the wait after an idle poll. Default: 2.0
+
+    Attributes:
+        callback_count(int): Number of tracker callbacks seen since start.
+        pump_count(int): Number of ``mainloop()`` calls made since start.
+        on_data(function): Called (from the ingest thread) after a pump that produced callbacks. Default: None
+    '''
+    def __init__(self, min_sleep: float = 0.0005,
+                max_sleep: float = 0.005,
+                backoff: float = 2.0):
+
+        self.min_sleep = min_sleep
+        self.max_sleep = max_sleep
+        self.backoff = backoff
+
+        self.callback_count = 0
+        self.pump_count = 0
+        self.on_data = None
+
+        self._trackers = ()
+        self._lock = Lock()
+        self._stop = Event()
+
+    def add_tracker(self, tracker) -> None:
+        ''' Add a tracker to the ingest loop. Adding the same tracker twice is a no-op.
+
+        Parameters:
+            tracker: VRPN receiver (or any object with ``mainloop()`` and ``register_change_handler()``).
+        '''
+        with self._lock:
+            if tracker in self._trackers:
+                return
+
+            # Count callbacks so quiet trackers can be backed off
+            tracker.register_change_handler(None, self._on_sample, "position")
+            self._trackers = self._trackers + (tracker,)
+
+    def remove_tracker(self, tracker) -> None:
+        ''' Remove a tracker from the ingest loop.
+
+        Parameters:
+            tracker: Tracker previously added with ``add_tracker``.
+        '''
+        with self._lock:
+            if tracker not in self._trackers:
+                return
+            self._trackers = tuple(t for t in self._trackers if t is not tracker)
+
+            # Re-added later (eg. Ingest_Process item churn): count samples once
+            _unregister = getattr(tracker, "unregister_change_handler", None)
+            if _unregister is not None:
+                _unregister(None, self._on_sample, "position")
+
+    @property
+    def trackers(self) -> tuple:
+        '''tuple: Trackers currently pumped by the ingest loop.
+        '''
+        return self._trackers
+
+    def stop(self) -> None:
+        ''' Stop ``run()`` at the next wake up.
+        '''
+        self._stop.set()
+
+    def run(self) -> None:
+        ''' Ingest loop. Blocks until ``stop()`` is called.
+
+        This function needs to run in a seperate thread.
+        '''
+        self._stop.clear()
+        sleep = self.min_sleep
+
+        while not self._stop.is_set():
+            trackers = self._trackers
+
+            if not trackers:
+                self._stop.wait(self.max_sleep)
+                continue
+
+            selectable = {}
+            polled = []
+            for tracker in trackers:
+                fd = self._fileno(tracker)
+                if fd is None:
+                    polled.append(tracker)
+                else:
+                    selectable[fd] = tracker
+
+            # Without pollable trackers the select timeout doubles as the adaptive sleep.
+            # VRPN still needs a periodic mainloop() to keep connections alive, so ready
+            # trackers are pumped along with the ones that have no fd.
+            timeout = sleep if polled else self.max_sleep
+
+            if selectable:
+                try:
+                    ready, _, _ = select.select(list(selectable), [], [], timeout)
+                except (OSError, ValueError):
+                    # Closed descriptor. Pump everything and let the tracker recover.
+                    ready = list(selectable)
+            else:
+                ready = []
+                self._stop.wait(timeout)
+
+            _count = self.callback_count
+
+            for fd in ready:
+                self._pump(selectable[fd])
+            for tracker in polled:
+                self._pump(tracker)
+
+            if not ready and not polled:
+                # Select timed out. Keep connections serviced.
+                for tracker in selectable.values():
+                    self._pump(tracker)
+
+            if self.callback_count != _count:
+                sleep = self.min_sleep
+                if self.on_data is not None:
+                    self.on_data()
+            else:
+                sleep = min(sleep * self.backoff, self.max_sleep)
+
+    def _pump(self, tracker) -> None:
+        tracker.mainloop()
+        self.pump_count += 1
+
+    def _on_sample(self, custom_data, data) -> None:
+        self.callback_count += 1
+
+    @staticmethod
+    def _fileno(tracker):
+        ''' File descriptor of the tracker connection, if exposed by the binding.
+        '''
+        fileno = getattr(tracker, "fileno", None)
+        if fileno is None:
+            return None
+        try:
+            fd = fileno()
+        except (OSError, ValueError):
+            return None
+        return fd if fd is not None and fd >= 0 else None